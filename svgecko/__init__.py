@@ -4,8 +4,21 @@ This library provides tools for applying arbitrary geometric transformations to
 supporting both path commands and coordinate attributes.
 """
 
+from svgecko.batch import (
+    DocumentScan,
+    scan,
+    transform_batch,
+    transform_path_command_strings,
+)
+from svgecko.cache import TransformCache
 from svgecko.svg import SVG
 from svgecko.svg_path import Path, PathCommand
+from svgecko.transformations import (
+    AffineTransform,
+    GridApproximation,
+    parse_transform_list,
+    vectorized,
+)
 from svgecko.utils import load_python_logo
 
 __version__ = "0.4.0"
@@ -16,5 +29,14 @@ __all__ = [
     "SVG",
     "Path", 
     "PathCommand",
+    "AffineTransform",
+    "parse_transform_list",
+    "vectorized",
+    "GridApproximation",
+    "DocumentScan",
+    "scan",
+    "transform_batch",
+    "transform_path_command_strings",
+    "TransformCache",
     "load_python_logo",
 ]
\ No newline at end of file
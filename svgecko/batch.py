@@ -0,0 +1,758 @@
+"""Cost estimation, size-aware scheduling and batched transformation of many SVGs."""
+
+from __future__ import annotations
+
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+import gzip
+import os
+import queue
+import threading
+from copy import deepcopy
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+from lxml import etree
+
+from svgecko.cache import TransformCache
+from svgecko.coordinates import DocumentCoordinates, format_path_data
+from svgecko.geometry import DEFAULT_ARC_TOLERANCE
+from svgecko.parallel import transform_points_shared
+from svgecko.render import CULL_MODES, DEFAULT_CULL_MARGIN, cull_elements
+from svgecko.selection import select_elements
+from svgecko.svg import SVG
+from svgecko.svg_path import _NUMBER_RE, Path, transform_path_command_string
+from svgecko.transformations import transform_points
+
+TransformationFunction = Callable[[Tuple[float, float]], Tuple[float, float]]
+
+# Approximate number of line segments an arc is flattened into
+_POINTS_PER_ARC = 16
+# Approximate lxml tree memory per byte of SVG text
+_TREE_BYTES_PER_FILE_BYTE = 6
+# Approximate memory of the Python objects created per transformed point
+_BYTES_PER_POINT = 400
+# Approximate number of path data characters per coordinate pair
+_PATH_BYTES_PER_POINT = 8
+# Documents with more points than this are split across workers by default
+DEFAULT_SPLIT_POINTS = 2_000_000
+# Marks the end of the work items of a pipeline stage
+_END_OF_STAGE = object()
+
+
+class DocumentScan(NamedTuple):
+    """Cheap size estimates of an SVG document.
+
+    Attributes:
+        path: Path of the scanned file.
+        file_bytes: Size of the (decompressed) XML text in bytes.
+        element_count: Number of XML elements.
+        path_data_bytes: Total length of all path d attributes.
+        point_count: Estimated number of coordinate pairs in d and points
+            attributes.
+        arc_count: Estimated number of arc commands in path data.
+        width: Document width if it can be resolved, otherwise None.
+        height: Document height if it can be resolved, otherwise None.
+    """
+
+    path: str
+    file_bytes: int
+    element_count: int
+    path_data_bytes: int
+    point_count: int
+    arc_count: int
+    width: Optional[float]
+    height: Optional[float]
+
+    @property
+    def cost(self) -> int:
+        """Estimated transformation cost in processed points."""
+        return self.point_count + self.arc_count * _POINTS_PER_ARC + self.element_count
+
+    @property
+    def memory(self) -> int:
+        """Estimated peak memory in bytes needed to transform the document."""
+        return (
+            self.file_bytes * _TREE_BYTES_PER_FILE_BYTE + self.cost * _BYTES_PER_POINT
+        )
+
+    def render_memory(self, scale: float = 1.0) -> int:
+        """Estimated peak memory in bytes needed to rasterize the document.
+
+        Args:
+            scale: Scale factor of the rendering.
+        """
+        pixels = (self.width or 0.0) * (self.height or 0.0) * scale * scale
+        return self.file_bytes * _TREE_BYTES_PER_FILE_BYTE + int(pixels) * 4
+
+
+def scan(path: str) -> DocumentScan:
+    """Estimate the size of an SVG document without building its tree.
+
+    The file is streamed through lxml's iterparse and every element is
+    discarded as soon as it has been counted, so memory stays constant.
+    Gzip-compressed SVGZ files are supported.
+
+    Args:
+        path: Path to the SVG or SVGZ file.
+
+    Returns:
+        A DocumentScan with the estimates.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        etree.XMLSyntaxError: If the file contains invalid XML.
+    """
+    with open(path, 'rb') as file:
+        is_compressed = file.read(2) == b'\x1f\x8b'
+    opener = gzip.open if is_compressed else open
+
+    element_count = path_data_bytes = point_count = arc_count = 0
+    width: Optional[float] = None
+    height: Optional[float] = None
+    with opener(path, 'rb') as file:
+        for event, element in etree.iterparse(file, events=('start', 'end')):
+            if event == 'start':
+                if element_count == 0:
+                    width, height = _scan_root_shape(element)
+                element_count += 1
+                continue
+
+            path_data = element.get('d')
+            if path_data:
+                path_data_bytes += len(path_data)
+                point_count += len(_NUMBER_RE.findall(path_data)) // 2
+                arc_count += path_data.count('A') + path_data.count('a')
+            points = element.get('points')
+            if points:
+                point_count += len(_NUMBER_RE.findall(points)) // 2
+            for name in ('x', 'x1', 'x2', 'cx', 'fx'):
+                if name in element.attrib:
+                    point_count += 1
+
+            element.clear()
+            parent = element.getparent()
+            while parent is not None and element.getprevious() is not None:
+                del parent[0]
+        file_bytes = file.tell()
+
+    return DocumentScan(
+        path=str(path),
+        file_bytes=file_bytes,
+        element_count=element_count,
+        path_data_bytes=path_data_bytes,
+        point_count=point_count,
+        arc_count=arc_count,
+        width=width,
+        height=height,
+    )
+
+
+def _scan_root_shape(root: Any) -> Tuple[Optional[float], Optional[float]]:
+    """Resolve the width and height of a root element from its attributes."""
+    svg = SVG(etree.Element(root.tag, dict(root.attrib)))
+    try:
+        return svg.shape
+    except ValueError:
+        return None, None
+
+
+def schedule(
+    scans: Sequence[DocumentScan], key: Callable[[DocumentScan], int] = lambda s: s.cost
+) -> List[int]:
+    """Order documents for processing, largest first.
+
+    Starting the most expensive documents first keeps a single large file
+    from straggling at the end of a batch.
+
+    Args:
+        scans: Scans of the documents.
+        key: Cost of a document. Defaults to the estimated transformation cost.
+
+    Returns:
+        Indices into scans in processing order.
+    """
+    return sorted(range(len(scans)), key=lambda index: key(scans[index]), reverse=True)
+
+
+def transform_files(
+    input_paths: Sequence[str],
+    output_paths: Sequence[str],
+    transformation: TransformationFunction,
+    max_workers: Optional[int] = None,
+    max_in_flight_bytes: Optional[int] = None,
+    split_points: Optional[int] = DEFAULT_SPLIT_POINTS,
+    cache: Optional[TransformCache] = None,
+    fingerprint: Optional[str] = None,
+    **transform_kwargs: Any
+) -> List[Optional[DocumentScan]]:
+    """Transform many SVG files in a process pool, scheduled by estimated size.
+
+    With a cache, cached outputs are restored first; only the remaining
+    files are scanned and transformed. Documents run largest first; new
+    documents are only started while the estimated memory of all running
+    documents stays within max_in_flight_bytes. Documents with more than split_points
+    points have their path data split into chunks that are transformed by
+    different workers; they are parsed and reassembled in a thread of this
+    process, one at a time, and count against max_in_flight_bytes like the
+    other documents.
+
+    Args:
+        input_paths: Paths of the SVG files to transform.
+        output_paths: Paths the transformed files are written to.
+        transformation: The transformation function. Must be picklable
+            (e.g., a module-level function or an AffineTransform).
+        max_workers: Number of worker processes. Defaults to the CPU count.
+        max_in_flight_bytes: Optional memory budget for concurrently running
+            documents. A document larger than the budget runs alone.
+        split_points: Point count above which a document is split across
+            workers. None disables splitting.
+        cache: Optional TransformCache. Outputs of unchanged inputs are
+            copied from the cache without parsing; new outputs are stored.
+        fingerprint: Version string identifying the transformation in the
+            cache. Required with a cache unless the transformation is an
+            AffineTransform.
+        **transform_kwargs: Additional arguments passed to SVG.transform.
+
+    Returns:
+        The scans of the input files in input order; None for files whose
+        output was restored from the cache.
+
+    Raises:
+        ValueError: If the number of input and output paths differs, or a
+            cache is given without a fingerprint for a transformation other
+            than an AffineTransform.
+    """
+    if len(input_paths) != len(output_paths):
+        raise ValueError('The number of input and output paths must match.')
+
+    keys: Dict[int, str] = {}
+    if cache is not None:
+        for index, (input_path, output_path) in enumerate(
+            zip(input_paths, output_paths)
+        ):
+            key = _file_cache_key(
+                cache,
+                input_path,
+                output_path,
+                transformation,
+                fingerprint,
+                transform_kwargs,
+            )
+            if not cache.restore(key, output_path):
+                keys[index] = key
+        pending = sorted(keys)
+    else:
+        pending = list(range(len(input_paths)))
+
+    pending_scans = [scan(input_paths[index]) for index in pending]
+    scanned = dict(zip(pending, pending_scans))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor, ThreadPoolExecutor(
+        max_workers=1
+    ) as splitter:
+
+        def submit(index: int) -> Future:
+            if split_points is not None and scanned[index].point_count > split_points:
+                return splitter.submit(
+                    _transform_split_document,
+                    executor,
+                    input_paths[index],
+                    output_paths[index],
+                    transformation,
+                    split_points,
+                    transform_kwargs,
+                )
+            return executor.submit(
+                _transform_file,
+                input_paths[index],
+                output_paths[index],
+                transformation,
+                transform_kwargs,
+            )
+
+        _run_bounded(
+            executor,
+            [
+                (pending[position], pending_scans[position].memory)
+                for position in schedule(pending_scans)
+            ],
+            submit,
+            max_in_flight_bytes,
+        )
+
+    if cache is not None:
+        for index, key in keys.items():
+            cache.store_file(key, output_paths[index])
+    return [scanned.get(index) for index in range(len(input_paths))]
+
+
+def render_files(
+    input_paths: Sequence[str],
+    output_paths: Sequence[str],
+    max_workers: Optional[int] = None,
+    max_in_flight_bytes: Optional[int] = None,
+    **render_kwargs: Any
+) -> List[DocumentScan]:
+    """Render many SVG files to images in a process pool, scheduled by estimated size.
+
+    Documents run largest first (by estimated pixel memory) and new renders
+    only start while the estimated memory of running renders stays within
+    max_in_flight_bytes.
+
+    Args:
+        input_paths: Paths of the SVG files to render.
+        output_paths: Paths the images are written to; the format is derived
+            from the suffix by PIL.
+        max_workers: Number of worker processes. Defaults to the CPU count.
+        max_in_flight_bytes: Optional memory budget for concurrently running
+            renders. A render larger than the budget runs alone.
+        **render_kwargs: Additional arguments passed to SVG.to_pil_image.
+
+    Returns:
+        The scans of the input files in input order.
+
+    Raises:
+        ValueError: If the number of input and output paths differs.
+    """
+    if len(input_paths) != len(output_paths):
+        raise ValueError('The number of input and output paths must match.')
+
+    scans = [scan(path) for path in input_paths]
+    scale = float(render_kwargs.get('scale', 1.0))
+    order = schedule(
+        scans, key=lambda document_scan: document_scan.render_memory(scale)
+    )
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        _run_bounded(
+            executor,
+            [(index, scans[index].render_memory(scale)) for index in order],
+            lambda index: executor.submit(
+                _render_file, input_paths[index], output_paths[index], render_kwargs
+            ),
+            max_in_flight_bytes,
+        )
+
+    return scans
+
+
+def pipeline_files(
+    input_paths: Sequence[str],
+    output_paths: Sequence[str],
+    transformation: TransformationFunction,
+    parse_threads: int = 2,
+    transform_threads: Optional[int] = None,
+    write_threads: int = 2,
+    queue_size: int = 8,
+    cache: Optional[TransformCache] = None,
+    fingerprint: Optional[str] = None,
+    **transform_kwargs: Any
+) -> None:
+    """Transform many SVG files in threads with pipelined parse/transform/write stages.
+
+    Each stage runs in its own group of threads and hands documents to the
+    next stage through a bounded queue. A full queue blocks the stage
+    feeding it, so at most about 2 * queue_size documents plus one per
+    thread are in memory at any time. lxml releases the GIL while parsing
+    and serializing and NumPy while transforming vectorized
+    transformations, so the stages overlap without process start-up or
+    pickling costs; on free-threaded Python builds all stages run fully in
+    parallel.
+
+    Args:
+        input_paths: Paths of the SVG files to transform.
+        output_paths: Paths the transformed files are written to.
+        transformation: The transformation function. It is called from
+            several threads at once and must be thread-safe.
+        parse_threads: Number of threads loading files. Defaults to 2.
+        transform_threads: Number of threads transforming documents.
+            Defaults to the CPU count.
+        write_threads: Number of threads writing files. Defaults to 2.
+        queue_size: Capacity of the queues between the stages. Defaults to 8.
+        cache: Optional TransformCache. Outputs of unchanged inputs are
+            copied from the cache by the parse stage without parsing; new
+            outputs are stored by the write stage.
+        fingerprint: Version string identifying the transformation in the
+            cache. Required with a cache unless the transformation is an
+            AffineTransform.
+        **transform_kwargs: Additional arguments passed to SVG.transform.
+
+    Raises:
+        ValueError: If the number of input and output paths differs or a
+            thread count or the queue size is not positive.
+        Exception: The first error raised by any stage. Remaining documents
+            are skipped once an error occurred.
+    """
+    if len(input_paths) != len(output_paths):
+        raise ValueError('The number of input and output paths must match.')
+    if transform_threads is None:
+        transform_threads = os.cpu_count() or 1
+    if min(parse_threads, transform_threads, write_threads, queue_size) < 1:
+        raise ValueError('Thread counts and queue size must be positive.')
+
+    indices: queue.Queue = queue.Queue()
+    for index in range(len(input_paths)):
+        indices.put(index)
+    for _ in range(parse_threads):
+        indices.put(_END_OF_STAGE)
+    parsed: queue.Queue = queue.Queue(maxsize=queue_size)
+    transformed: queue.Queue = queue.Queue(maxsize=queue_size)
+    errors: List[Exception] = []
+    keys: Dict[int, str] = {}
+
+    def parse(index: int) -> Optional[Tuple[int, SVG]]:
+        if cache is not None:
+            keys[index] = _file_cache_key(
+                cache,
+                input_paths[index],
+                output_paths[index],
+                transformation,
+                fingerprint,
+                transform_kwargs,
+            )
+            if cache.restore(keys[index], output_paths[index]):
+                return None
+        return index, SVG.from_file(input_paths[index])
+
+    def transform(item: Tuple[int, SVG]) -> Tuple[int, SVG]:
+        index, svg = item
+        return index, svg.transform(transformation, inplace=True, **transform_kwargs)
+
+    def write(item: Tuple[int, SVG]) -> None:
+        index, svg = item
+        svg.to_file(output_paths[index])
+        if cache is not None:
+            cache.store_file(keys[index], output_paths[index])
+
+    stages = [
+        (
+            _start_stage(parse, indices, parsed, parse_threads, errors),
+            parsed,
+            transform_threads,
+        ),
+        (
+            _start_stage(transform, parsed, transformed, transform_threads, errors),
+            transformed,
+            write_threads,
+        ),
+        (_start_stage(write, transformed, None, write_threads, errors), None, 0),
+    ]
+    for threads, target, consumer_count in stages:
+        for thread in threads:
+            thread.join()
+        if target is not None:
+            for _ in range(consumer_count):
+                target.put(_END_OF_STAGE)
+
+    if errors:
+        raise errors[0]
+
+
+def transform_batch(
+    svgs: Iterable[SVG],
+    transformation: TransformationFunction,
+    inplace: bool = False,
+    arc_tolerance: float = DEFAULT_ARC_TOLERANCE,
+    processes: Optional[int] = None
+) -> List[SVG]:
+    """Transform many documents with one call of the transformation.
+
+    The coordinates of all documents are extracted into one array, which is
+    transformed at once and scattered back into the documents. Per-document
+    overhead is a single pass over each tree; vectorized transformations
+    (see transformations.vectorized) are called once for the whole batch.
+
+    Args:
+        svgs: The SVG objects to transform.
+        transformation: The transformation to apply.
+        inplace: If True, the given SVGs are modified. Defaults to False
+            (transformed copies are returned).
+        arc_tolerance: Maximum distance between an arc and the line
+            segments approximating it. Defaults to DEFAULT_ARC_TOLERANCE.
+        processes: Optional number of worker processes transforming the
+            array in shared memory (see parallel.transform_points_shared).
+            Defaults to None (transform in this process).
+
+    Returns:
+        The transformed SVG objects in input order.
+
+    Raises:
+        ValueError: If path data contains invalid commands.
+    """
+    svgs = [svg if inplace else deepcopy(svg) for svg in svgs]
+    roots = [svg._xml for svg in svgs]
+    coordinates = DocumentCoordinates.from_element(roots, arc_tolerance)
+    coordinates.apply(
+        roots, _transform_batch_points(coordinates.points, transformation, processes)
+    )
+    for svg in svgs:
+        svg.invalidate_cache()
+    return svgs
+
+
+def transform_path_command_strings(
+    path_command_strings: Sequence[str],
+    transformation: TransformationFunction,
+    arc_tolerance: float = DEFAULT_ARC_TOLERANCE,
+    processes: Optional[int] = None
+) -> List[str]:
+    """Transform many path command strings with one call of the transformation.
+
+    Args:
+        path_command_strings: SVG path command strings (d attributes).
+        transformation: The transformation to apply.
+        arc_tolerance: Maximum distance between an arc and the line
+            segments approximating it. Defaults to DEFAULT_ARC_TOLERANCE.
+        processes: Optional number of worker processes (see transform_batch).
+
+    Returns:
+        The transformed path command strings, formatted like
+        svg_path.transform_path_command_string.
+
+    Raises:
+        ValueError: If a command string contains invalid commands.
+    """
+    letters: List[str] = []
+    counts: List[int] = []
+    values: List[float] = []
+    for path_command_string in path_command_strings:
+        commands = (
+            Path.from_command_string(path_command_string)
+            ._to_absolute(arc_tolerance)
+            ._commands
+        )
+        start = len(values)
+        for command in commands:
+            values.extend(command.coordinates)
+        letters.append(''.join(command.type for command in commands))
+        counts.append((len(values) - start) // 2)
+
+    points = _transform_batch_points(
+        np.array(values, dtype=float).reshape(-1, 2), transformation, processes
+    )
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(int).tolist()
+    return [
+        format_path_data(path_letters, points[start:stop])
+        for path_letters, start, stop in zip(letters, offsets[:-1], offsets[1:])
+    ]
+
+
+def _transform_batch_points(
+    points: np.ndarray,
+    transformation: TransformationFunction,
+    processes: Optional[int]
+) -> np.ndarray:
+    """Transform the concatenated points of a batch, optionally in worker processes."""
+    if processes is None:
+        return transform_points(transformation, points)
+    return transform_points_shared(points, transformation, processes)
+
+
+def _start_stage(
+    work: Callable[[Any], Any],
+    source: queue.Queue,
+    target: Optional[queue.Queue],
+    thread_count: int,
+    errors: List[Exception],
+) -> List[threading.Thread]:
+    """Start the threads of one pipeline stage.
+
+    Every thread takes items from source until it receives _END_OF_STAGE and
+    puts the results of work other than None into target. After the first error of any
+    stage, items are drained without being processed so that no stage
+    blocks on a full queue.
+
+    Returns:
+        The started threads.
+    """
+
+    def run() -> None:
+        while True:
+            item = source.get()
+            if item is _END_OF_STAGE:
+                return
+            if errors:
+                continue
+            try:
+                result = work(item)
+            except Exception as error:
+                errors.append(error)
+                continue
+            if target is not None and result is not None:
+                target.put(result)
+
+    threads = [threading.Thread(target=run, daemon=True) for _ in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def _run_bounded(
+    executor: ProcessPoolExecutor,
+    tasks: Sequence[Tuple[int, int]],
+    submit: Callable[[int], Future],
+    max_in_flight_bytes: Optional[int],
+) -> None:
+    """Submit tasks in order while their summed memory estimate fits the budget.
+
+    Args:
+        executor: The executor running the tasks.
+        tasks: (task index, estimated memory) pairs in submission order.
+        submit: Function submitting the task with the given index.
+        max_in_flight_bytes: Memory budget, or None for no limit.
+    """
+    running: Dict[Future, int] = {}
+    in_flight = 0
+    for index, memory in tasks:
+        while (
+            running
+            and max_in_flight_bytes is not None
+            and in_flight + memory > max_in_flight_bytes
+        ):
+            done, _pending = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight -= running.pop(future)
+                future.result()
+        running[submit(index)] = memory
+        in_flight += memory
+
+    for future in running:
+        future.result()
+
+
+def _file_cache_key(
+    cache: TransformCache,
+    input_path: str,
+    output_path: str,
+    transformation: TransformationFunction,
+    fingerprint: Optional[str],
+    transform_kwargs: Dict[str, Any],
+) -> str:
+    """Compute the cache key of transforming one file into one output file."""
+    options = {
+        name: value for name, value in transform_kwargs.items() if name != 'processes'
+    }
+    compress = str(output_path).lower().endswith('.svgz')
+    return cache.file_key(
+        input_path, transformation, fingerprint, compress=compress, **options
+    )
+
+
+def _transform_split_document(
+    executor: ProcessPoolExecutor,
+    input_path: str,
+    output_path: str,
+    transformation: TransformationFunction,
+    split_points: int,
+    transform_kwargs: Dict[str, Any],
+) -> None:
+    """Transform one large document with its path data split across workers.
+
+    The path data is detached from the tree and transformed in chunks of
+    about split_points points by the workers, while the parent transforms the
+    remaining attributes. With a select option, only path data inside the
+    selected subtrees is detached. Simplification and culling run in the
+    parent once the path data is restored.
+    """
+    kwargs = dict(transform_kwargs)
+    simplify = kwargs.pop('simplify', None)
+    cull = kwargs.pop('cull', False)
+    cull_margin = kwargs.pop('cull_margin', DEFAULT_CULL_MARGIN)
+    if isinstance(cull, str) and cull not in CULL_MODES:
+        raise ValueError(f'Unknown cull mode: {cull}')
+    path_kwargs: Dict[str, Any] = {
+        name: kwargs[name] for name in ('fit_curves', 'arc_tolerance') if name in kwargs
+    }
+
+    svg = SVG.from_file(input_path)
+    if kwargs.pop('bake_transforms', False):
+        svg.bake_transforms(inplace=True)
+
+    select = kwargs.get('select')
+    roots = None if select is None else select_elements(svg.xml, select)
+    if roots is None:
+        elements = svg.xml.xpath('//*[@d]')
+    else:
+        elements = [
+            element
+            for root in roots
+            for element in root.xpath('descendant-or-self::*[@d]')
+        ]
+    path_strings = [element.attrib.pop('d') for element in elements]
+
+    futures: List[Tuple[int, Future]] = []
+    chunk: List[str] = []
+    chunk_start = chunk_points = 0
+    for index, path_string in enumerate(path_strings):
+        chunk.append(path_string)
+        chunk_points += len(path_string) // _PATH_BYTES_PER_POINT + 1
+        if chunk_points >= split_points or index == len(path_strings) - 1:
+            futures.append(
+                (
+                    chunk_start,
+                    executor.submit(
+                        _transform_path_chunk, chunk, transformation, path_kwargs
+                    ),
+                )
+            )
+            chunk, chunk_start, chunk_points = [], index + 1, 0
+
+    svg.transform(transformation, inplace=True, **kwargs)
+
+    for chunk_start, future in futures:
+        for offset, transformed in enumerate(future.result()):
+            elements[chunk_start + offset].attrib['d'] = transformed
+
+    if simplify is not None:
+        SVG._simplify_geometry(svg, simplify, roots)
+    if cull:
+        width, height = svg.shape
+        mode = 'remove' if cull is True else cull
+        cull_elements(svg.xml, width, height, cull_margin, mode)
+    svg.to_file(output_path)
+
+
+def _transform_file(
+    input_path: str,
+    output_path: str,
+    transformation: TransformationFunction,
+    transform_kwargs: Dict[str, Any],
+) -> None:
+    """Worker task transforming a single file."""
+    SVG.from_file(input_path).transform(
+        transformation, inplace=True, **transform_kwargs
+    ).to_file(output_path)
+
+
+def _transform_path_chunk(
+    path_strings: List[str],
+    transformation: TransformationFunction,
+    path_kwargs: Dict[str, Any],
+) -> List[str]:
+    """Worker task transforming a chunk of path command strings."""
+    return [
+        transform_path_command_string(path_string, transformation, **path_kwargs)
+        for path_string in path_strings
+    ]
+
+
+def _render_file(
+    input_path: str, output_path: str, render_kwargs: Dict[str, Any]
+) -> None:
+    """Worker task rendering a single file to an image."""
+    SVG.from_file(input_path).to_pil_image(**render_kwargs).save(output_path)
@@ -0,0 +1,293 @@
+"""Persistent content-addressed cache of transformation results."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from svgecko.transformations import AffineTransform
+
+TransformationFunction = Callable[[Tuple[float, float]], Tuple[float, float]]
+
+# Changed whenever cached outputs of an older version must not be reused
+_CACHE_FORMAT_VERSION = 1
+_ENTRY_SUFFIX = '.svg'
+_READ_CHUNK_BYTES = 1 << 20
+
+
+class TransformCache:
+    """Directory of transformed documents keyed by input, transformation and options.
+
+    Keys are SHA-256 digests of the input bytes, a fingerprint of the
+    transformation and the transform options, so unchanged inputs are
+    recognized across runs and processes. Reading an entry refreshes its
+    modification time; when the cache grows beyond max_bytes the least
+    recently used entries are deleted. Entries are written atomically, so
+    several processes may share one directory.
+
+    Example:
+        >>> cache = TransformCache('.svgecko-cache', max_bytes=1024 ** 3)
+        >>> svg.transform(AffineTransform.scaling(2), cache=cache)
+        >>> svg.transform(warp, cache=cache, fingerprint='warp-v2')
+    """
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None) -> None:
+        """Initialize the cache, creating its directory if needed.
+
+        Args:
+            directory: Directory holding the cache entries.
+            max_bytes: Optional size limit of all entries in bytes.
+                Defaults to None (no limit).
+
+        Raises:
+            ValueError: If max_bytes is negative.
+        """
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError('max_bytes must not be negative.')
+        self._directory = str(directory)
+        self._max_bytes = max_bytes
+        # Running size of all entries with max_bytes, counted on the first put
+        self._size: Optional[int] = None
+        os.makedirs(self._directory, exist_ok=True)
+
+    @property
+    def directory(self) -> str:
+        """Get the cache directory."""
+        return self._directory
+
+    @property
+    def max_bytes(self) -> Optional[int]:
+        """Get the size limit of the cache in bytes."""
+        return self._max_bytes
+
+    @property
+    def size(self) -> int:
+        """Get the total size of all entries in bytes."""
+        return sum(entry_size for _path, _mtime, entry_size in self._entries())
+
+    def key(
+        self,
+        data: bytes,
+        transformation: TransformationFunction,
+        fingerprint: Optional[str] = None,
+        **options: Any
+    ) -> str:
+        """Compute the key of transforming the given input bytes.
+
+        Args:
+            data: The input document bytes.
+            transformation: The transformation (see fingerprint_transformation).
+            fingerprint: Optional version string identifying the transformation.
+            **options: Options that influence the output.
+
+        Returns:
+            The hexadecimal key.
+
+        Raises:
+            ValueError: If the transformation has no fingerprint.
+        """
+        digest = hashlib.sha256(data)
+        return self._finish_key(digest, transformation, fingerprint, options)
+
+    def file_key(
+        self,
+        file_path: str,
+        transformation: TransformationFunction,
+        fingerprint: Optional[str] = None,
+        **options: Any
+    ) -> str:
+        """Compute the key of transforming a file, hashing it in chunks.
+
+        Args:
+            file_path: Path of the input file.
+            transformation: The transformation (see fingerprint_transformation).
+            fingerprint: Optional version string identifying the transformation.
+            **options: Options that influence the output.
+
+        Returns:
+            The hexadecimal key.
+
+        Raises:
+            ValueError: If the transformation has no fingerprint.
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(_READ_CHUNK_BYTES), b''):
+                digest.update(chunk)
+        return self._finish_key(digest, transformation, fingerprint, options)
+
+    @staticmethod
+    def _finish_key(
+        digest: Any,
+        transformation: TransformationFunction,
+        fingerprint: Optional[str],
+        options: Dict[str, Any]
+    ) -> str:
+        """Add the transformation fingerprint and options to an input digest."""
+        description = (
+            _CACHE_FORMAT_VERSION,
+            fingerprint_transformation(transformation, fingerprint),
+            sorted(options.items()),
+        )
+        return hashlib.sha256(
+            digest.digest() + repr(description).encode('utf-8')
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get the stored bytes of a key and mark the entry as recently used.
+
+        Args:
+            key: The entry key.
+
+        Returns:
+            The stored bytes, or None if the key is not cached.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def restore(self, key: str, output_path: str) -> bool:
+        """Copy the stored bytes of a key to a file.
+
+        Args:
+            key: The entry key.
+            output_path: Path the stored bytes are written to.
+
+        Returns:
+            True if the key was cached, False otherwise.
+        """
+        path = self._entry_path(key)
+        try:
+            shutil.copyfile(path, output_path)
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store bytes under a key and evict old entries beyond the size limit.
+
+        Args:
+            key: The entry key.
+            data: The bytes to store.
+        """
+        path = self._entry_path(key)
+        replaced = 0
+        if self._max_bytes is not None:
+            if self._size is None:
+                self._size = self.size
+            try:
+                replaced = os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), suffix='.tmp'
+        )
+        with os.fdopen(file_descriptor, 'wb') as file:
+            file.write(data)
+        os.replace(temporary_path, path)
+        if self._max_bytes is not None and self._size is not None:
+            self._size += len(data) - replaced
+            if self._size > self._max_bytes:
+                self._evict()
+
+    def store_file(self, key: str, file_path: str) -> None:
+        """Store the content of a file under a key.
+
+        Args:
+            key: The entry key.
+            file_path: Path of the file to store.
+        """
+        with open(file_path, 'rb') as file:
+            self.put(key, file.read())
+
+    def clear(self) -> None:
+        """Delete all entries."""
+        for path, _mtime, _size in self._entries():
+            _remove(path)
+        self._size = 0
+
+    def _entry_path(self, key: str) -> str:
+        """Get the path of the entry of a key."""
+        return os.path.join(self._directory, key[:2], key + _ENTRY_SUFFIX)
+
+    def _entries(self) -> List[Tuple[str, float, int]]:
+        """List (path, modification time, size) of all entries."""
+        entries = []
+        for subdirectory in os.scandir(self._directory):
+            if not subdirectory.is_dir():
+                continue
+            for entry in os.scandir(subdirectory.path):
+                if not entry.name.endswith(_ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits max_bytes.
+
+        The directory is only listed here, once the running size exceeds
+        max_bytes; the listing also picks up entries of other processes.
+        """
+        if self._max_bytes is None:
+            return
+        entries = self._entries()
+        total = sum(entry_size for _path, _mtime, entry_size in entries)
+        for path, _mtime, entry_size in sorted(entries, key=lambda entry: entry[1]):
+            if total <= self._max_bytes:
+                break
+            _remove(path)
+            total -= entry_size
+        self._size = total
+
+
+def fingerprint_transformation(
+    transformation: TransformationFunction, fingerprint: Optional[str] = None
+) -> str:
+    """Describe a transformation for cache keys.
+
+    AffineTransforms are identified by their coefficients. Any other
+    transformation needs an explicit fingerprint, e.g., a version string
+    that changes whenever the function changes.
+
+    Args:
+        transformation: The transformation.
+        fingerprint: Optional version string identifying the transformation.
+
+    Returns:
+        The fingerprint string.
+
+    Raises:
+        ValueError: If no fingerprint is given for a transformation other
+            than an AffineTransform.
+    """
+    if fingerprint is not None:
+        return f'user:{fingerprint}'
+    if isinstance(transformation, AffineTransform):
+        return 'affine:' + ','.join(
+            repr(float(coefficient)) for coefficient in transformation.coefficients
+        )
+    raise ValueError(
+        'A fingerprint is required to cache transformations other than AffineTransform.'
+    )
+
+
+def _remove(path: str) -> None:
+    """Delete a file that another process may have deleted already."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,539 @@
+"""Extraction of all transformable coordinates of an SVG document into one array."""
+
+from __future__ import annotations
+
+from copy import deepcopy
+import re
+from types import MappingProxyType
+from typing import (
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+import uuid
+
+import numpy as np
+from lxml import etree
+from lxml.etree import ElementBase
+
+from svgecko.geometry import DEFAULT_ARC_TOLERANCE
+from svgecko.geometry_cache import GeometryCache
+from svgecko.svg_path import (
+    COMMAND_CODES,
+    Path,
+    PathArrays,
+    format_path_arrays,
+    parse_numbers,
+)
+from svgecko.transformations import transform_translate_functions
+
+COORDINATE_ATTRIBUTE_PAIRS: List[Tuple[str, str]] = [
+    ('x', 'y'),
+    ('x1', 'y1'),
+    ('x2', 'y2'),
+    ('cx', 'cy'),
+    ('fx', 'fy'),
+]
+
+# Number of coordinate pairs of every absolute path command
+POINTS_PER_COMMAND = MappingProxyType(
+    {'M': 1, 'L': 1, 'C': 3, 'S': 2, 'Q': 2, 'T': 1, 'Z': 0}
+)
+
+# Escapes lxml applies to attribute values when serializing
+_ATTRIBUTE_ESCAPES = (
+    ('&', '&amp;'),
+    ('<', '&lt;'),
+    ('>', '&gt;'),
+    ('"', '&quot;'),
+    ('\n', '&#10;'),
+    ('\t', '&#9;'),
+    ('\r', '&#13;'),
+)
+
+
+class GeometryArrays(NamedTuple):
+    """Geometry of all paths, polygons and polylines of a document as NumPy arrays.
+
+    Attributes:
+        codes: Array of shape (K,) with the command codes of all elements
+            (see svg_path.COMMAND_CODES).
+        points: Array of shape (N, 2) with the coordinates of all commands.
+        offsets: Array of shape (K + 1,); the points of command k are
+            points[offsets[k]:offsets[k + 1]].
+        element_offsets: Array of shape (E + 1,); the commands of element e
+            are codes[element_offsets[e]:element_offsets[e + 1]].
+        element_indices: Array of shape (E,) with the position of every
+            element in document order (counting elements only, starting
+            with the root at 0).
+        ids: The id attribute of every element, or None.
+    """
+
+    codes: np.ndarray
+    points: np.ndarray
+    offsets: np.ndarray
+    element_offsets: np.ndarray
+    element_indices: np.ndarray
+    ids: List[Optional[str]]
+
+    def element(self, index: int) -> PathArrays:
+        """Get the arrays of a single element.
+
+        Args:
+            index: Index of the element in the arrays (not in the document).
+
+        Returns:
+            The PathArrays of the element, with offsets starting at 0.
+        """
+        first, last = self.element_offsets[index], self.element_offsets[index + 1]
+        offsets = self.offsets[first:last + 1]
+        return PathArrays(
+            self.codes[first:last],
+            self.points[offsets[0]:offsets[-1]],
+            offsets - offsets[0],
+        )
+
+
+class CoordinateSlot(NamedTuple):
+    """Location of a run of coordinates inside a document.
+
+    Attributes:
+        element_index: Index of the element in document order (counting
+            elements only, starting with the root at 0; subtrees extracted
+            together are counted one after another).
+        kind: Kind of the attribute: 'd', 'xy', 'points', 'transform' or
+            'style'.
+        names: Names of the attributes holding the coordinates.
+        structure: Absolute command letters for 'd', the original attribute
+            value for 'transform' and 'style', empty otherwise.
+        offset: Index of the first point of the slot in the points array.
+        size: Number of points of the slot.
+    """
+
+    element_index: int
+    kind: str
+    names: Tuple[str, ...]
+    structure: str
+    offset: int
+    size: int
+
+
+class DocumentCoordinates:
+    """All transformable coordinates of an SVG document in one (N, 2) array.
+
+    Covers the same attributes as SVG.transform: path data (converted to
+    absolute commands with flattened arcs), coordinate attribute pairs,
+    points attributes and translate() functions in transform and style
+    attributes. After the points have been transformed in bulk, apply()
+    writes them back into the document or into a copy of it.
+
+    Example:
+        >>> coordinates = DocumentCoordinates.from_element(svg.xml)
+        >>> coordinates.apply(svg.xml, coordinates.points + 1.0)
+    """
+
+    def __init__(self, slots: List[CoordinateSlot], points: np.ndarray) -> None:
+        """Initialize from slots and their points.
+
+        Args:
+            slots: Locations of the coordinate runs in the document.
+            points: Array of shape (N, 2) with the points of all slots.
+        """
+        self._slots = slots
+        self._points = points
+
+    @classmethod
+    def from_element(
+        cls,
+        root: Union[ElementBase, Sequence[ElementBase]],
+        arc_tolerance: float = DEFAULT_ARC_TOLERANCE,
+        geometry_cache: Optional[GeometryCache] = None
+    ) -> DocumentCoordinates:
+        """Extract the coordinates of a document.
+
+        Args:
+            root: Root element of the document, or a list of subtree roots
+                whose coordinates are extracted together.
+            arc_tolerance: Maximum deviation of flattened arcs.
+            geometry_cache: Optional pre-parsed path geometry of the
+                document (see geometry_cache.GeometryCache). Path data of
+                cached elements is not parsed again.
+
+        Returns:
+            The extracted DocumentCoordinates.
+
+        Raises:
+            ValueError: If path data contains invalid commands.
+        """
+        slots: List[CoordinateSlot] = []
+        chunks: List[np.ndarray] = []
+        chunk_points = 0
+        values: List[float] = []
+        for element_index, element in enumerate(_iter_elements(root)):
+            attributes = element.attrib
+            if 'd' in attributes:
+                d = attributes['d']
+                cached = (
+                    None
+                    if geometry_cache is None
+                    else geometry_cache.lookup(element_index, d, arc_tolerance)
+                )
+                if cached is not None:
+                    letters, points = cached
+                    if values:
+                        chunks.append(np.array(values, dtype=float).reshape(-1, 2))
+                        chunk_points += len(values) // 2
+                        values = []
+                    slots.append(
+                        CoordinateSlot(
+                            element_index,
+                            'd',
+                            ('d',),
+                            letters,
+                            chunk_points,
+                            len(points),
+                        )
+                    )
+                    chunks.append(points)
+                    chunk_points += len(points)
+                else:
+                    commands = (
+                        Path.from_command_string(d)
+                        ._to_absolute(arc_tolerance)
+                        ._commands
+                    )
+                    start = len(values)
+                    for command in commands:
+                        values.extend(command.coordinates)
+                    letters = ''.join(command.type for command in commands)
+                    slots.append(
+                        CoordinateSlot(
+                            element_index,
+                            'd',
+                            ('d',),
+                            letters,
+                            chunk_points + start // 2,
+                            (len(values) - start) // 2,
+                        )
+                    )
+
+            for x_name, y_name in COORDINATE_ATTRIBUTE_PAIRS:
+                if x_name in attributes and y_name in attributes:
+                    x_values = parse_numbers(attributes[x_name])
+                    y_values = parse_numbers(attributes[y_name])
+                    if x_values and y_values:
+                        slots.append(
+                            CoordinateSlot(
+                                element_index,
+                                'xy',
+                                (x_name, y_name),
+                                '',
+                                chunk_points + len(values) // 2,
+                                1,
+                            )
+                        )
+                        values.extend((x_values[0], y_values[0]))
+
+            if 'points' in attributes:
+                numbers = parse_numbers(attributes['points'])
+                if len(numbers) >= 2 and len(numbers) % 2 == 0:
+                    slots.append(
+                        CoordinateSlot(
+                            element_index,
+                            'points',
+                            ('points',),
+                            '',
+                            chunk_points + len(values) // 2,
+                            len(numbers) // 2,
+                        )
+                    )
+                    values.extend(numbers)
+
+            for kind in ('transform', 'style'):
+                value = attributes.get(kind)
+                if value and 'translate' in value:
+                    translations = _recorded_translations(value)
+                    if translations:
+                        slots.append(
+                            CoordinateSlot(
+                                element_index,
+                                kind,
+                                (kind,),
+                                value,
+                                chunk_points + len(values) // 2,
+                                len(translations),
+                            )
+                        )
+                        for translation in translations:
+                            values.extend(translation)
+
+        chunks.append(np.array(values, dtype=float).reshape(-1, 2))
+        return cls(slots, np.concatenate(chunks) if len(chunks) > 1 else chunks[0])
+
+    @property
+    def points(self) -> np.ndarray:
+        """Get the (N, 2) array of all extracted points."""
+        return self._points
+
+    @property
+    def slots(self) -> List[CoordinateSlot]:
+        """Get the locations of the coordinate runs in the document."""
+        return self._slots
+
+    def apply(
+        self,
+        root: Union[ElementBase, Sequence[ElementBase]],
+        points: Optional[np.ndarray] = None,
+    ) -> None:
+        """Write points back into a document.
+
+        Args:
+            root: Root element (or list of subtree roots) the coordinates
+                were extracted from, or a deep copy of it.
+            points: Array of shape (N, 2) with the new points. Defaults to
+                None, which writes the extracted points.
+        """
+        points = self._points if points is None else np.asarray(points, dtype=float)
+        elements = list(_iter_elements(root))
+        for slot in self._slots:
+            element = elements[slot.element_index]
+            slot_points = points[slot.offset:slot.offset + slot.size]
+            for name, value in format_slot(slot, slot_points):
+                element.attrib[name] = value
+
+    def serialize_many(
+        self, root: ElementBase, batch: Iterable[np.ndarray]
+    ) -> Iterator[bytes]:
+        """Serialize copies of a document with several sets of points.
+
+        The document is serialized once with placeholders in place of the
+        coordinate attributes. Every set of points then only formats those
+        attributes and joins them with the shared serialized segments.
+
+        Args:
+            root: Root element the coordinates were extracted from.
+            batch: Arrays of shape (N, 2) with the new points.
+
+        Yields:
+            The UTF-8 serialization of the document with each set of points.
+        """
+        placeholder = f'svgecko-{uuid.uuid4().hex}-'
+        template = deepcopy(root)
+        elements = list(_iter_elements(template))
+        attributes: List[Tuple[int, str]] = []
+        for slot_index, slot in enumerate(self._slots):
+            for name in slot.names:
+                elements[slot.element_index].attrib[
+                    name
+                ] = f'{placeholder}{len(attributes)}-'
+                attributes.append((slot_index, name))
+
+        parts = re.split(
+            f'{placeholder}(\\d+)-'.encode('ascii'),
+            etree.tostring(template, encoding='utf-8'),
+        )
+        segments = parts[0::2]
+        positions = [int(position) for position in parts[1::2]]
+        for points in batch:
+            values = {}
+            for slot_index, slot in enumerate(self._slots):
+                slot_points = points[slot.offset:slot.offset + slot.size]
+                for name, value in format_slot(slot, slot_points):
+                    values[slot_index, name] = _escape_attribute(value).encode('utf-8')
+            chunks = [segments[0]]
+            for position, segment in zip(positions, segments[1:]):
+                chunks.append(values[attributes[position]])
+                chunks.append(segment)
+            yield b''.join(chunks)
+
+
+def geometry_arrays(
+    root: ElementBase, tolerance: Optional[float] = None
+) -> GeometryArrays:
+    """Export the geometry of all paths, polygons and polylines of a document.
+
+    Path data is converted with Path.to_arrays; points attributes become a
+    move followed by lines, closed for polygons.
+
+    Args:
+        root: Root element of the document.
+        tolerance: Optional flattening tolerance (see Path.to_arrays).
+
+    Returns:
+        The GeometryArrays of the document.
+
+    Raises:
+        ValueError: If path data contains invalid commands.
+    """
+    element_arrays: List[PathArrays] = []
+    element_indices: List[int] = []
+    ids: List[Optional[str]] = []
+    for element_index, element in enumerate(root.iter(etree.Element)):
+        if 'd' in element.attrib:
+            arrays = Path.from_command_string(element.attrib['d']).to_arrays(tolerance)
+        elif 'points' in element.attrib:
+            numbers = parse_numbers(element.attrib['points'])
+            points = np.array(
+                numbers[: len(numbers) - len(numbers) % 2], dtype=float
+            ).reshape(-1, 2)
+            codes = np.full(len(points), COMMAND_CODES['L'], dtype=np.int8)
+            codes[:1] = COMMAND_CODES['M']
+            if etree.QName(element).localname == 'polygon' and len(points):
+                codes = np.append(codes, np.int8(COMMAND_CODES['Z']))
+            offsets = np.minimum(np.arange(len(codes) + 1), len(points))
+            arrays = PathArrays(codes, points, offsets)
+        else:
+            continue
+        element_arrays.append(arrays)
+        element_indices.append(element_index)
+        ids.append(element.get('id'))
+
+    if not element_arrays:
+        empty = np.zeros(1, dtype=np.int64)
+        return GeometryArrays(
+            codes=np.zeros(0, dtype=np.int8),
+            points=np.zeros((0, 2)),
+            offsets=empty,
+            element_offsets=empty.copy(),
+            element_indices=np.zeros(0, dtype=np.int64),
+            ids=[],
+        )
+
+    command_counts = [len(arrays.codes) for arrays in element_arrays]
+    point_counts = [len(arrays.points) for arrays in element_arrays]
+    point_starts = np.repeat(
+        np.concatenate([[0], np.cumsum(point_counts)[:-1]]), command_counts
+    ).astype(np.int64)
+    offsets = np.concatenate(
+        [[0], *[arrays.offsets[1:] for arrays in element_arrays]]
+    ).astype(np.int64)
+    offsets[1:] += point_starts
+    return GeometryArrays(
+        codes=np.concatenate(
+            [np.zeros(0, dtype=np.int8)] + [arrays.codes for arrays in element_arrays]
+        ),
+        points=np.concatenate(
+            [np.zeros((0, 2))] + [arrays.points for arrays in element_arrays]
+        ),
+        offsets=offsets,
+        element_offsets=np.concatenate([[0], np.cumsum(command_counts)]).astype(
+            np.int64
+        ),
+        element_indices=np.array(element_indices, dtype=np.int64),
+        ids=ids,
+    )
+
+
+def apply_geometry_arrays(root: ElementBase, arrays: GeometryArrays) -> None:
+    """Write geometry arrays back into the document they were exported from.
+
+    Elements with path data get a new d attribute; polygons and polylines
+    get the points of their commands as points attribute.
+
+    Args:
+        root: Root element of the document, or of a deep copy of it.
+        arrays: The geometry arrays.
+
+    Raises:
+        ValueError: If the number of points does not match the codes.
+    """
+    elements = list(root.iter(etree.Element))
+    values = arrays.points.reshape(-1).astype(str).tolist()
+    for index, element_index in enumerate(arrays.element_indices.tolist()):
+        element = elements[element_index]
+        element_arrays = arrays.element(index)
+        if 'd' in element.attrib or 'points' not in element.attrib:
+            element.attrib['d'] = format_path_arrays(
+                element_arrays.codes, element_arrays.points
+            )
+            continue
+        start = 2 * int(arrays.offsets[arrays.element_offsets[index]])
+        pairs = values[start:start + 2 * len(element_arrays.points)]
+        element.attrib['points'] = ' '.join(
+            f'{x},{y}' for x, y in zip(pairs[0::2], pairs[1::2])
+        )
+
+
+def format_slot(slot: CoordinateSlot, points: np.ndarray) -> List[Tuple[str, str]]:
+    """Format the points of a slot as attribute values.
+
+    Args:
+        slot: The slot to format.
+        points: Array of shape (slot.size, 2) with the slot's points.
+
+    Returns:
+        List of (attribute name, attribute value) pairs.
+    """
+    if slot.kind == 'xy':
+        x, y = points[0].tolist()
+        return [(slot.names[0], str(x)), (slot.names[1], str(y))]
+
+    if slot.kind == 'points':
+        return [('points', ' '.join(f'{x},{y}' for x, y in points.tolist()))]
+
+    if slot.kind == 'd':
+        return [('d', format_path_data(slot.structure, points))]
+
+    translations = iter(points.tolist())
+    value = transform_translate_functions(
+        slot.structure, lambda _point: next(translations)
+    )
+    return [(slot.names[0], value)]
+
+
+def format_path_data(letters: str, points: np.ndarray) -> str:
+    """Build a path command string from absolute command letters and points.
+
+    Args:
+        letters: Absolute command letters (M, L, C, S, Q, T, Z).
+        points: Array of shape (N, 2) with the command coordinates.
+
+    Returns:
+        The path command string.
+    """
+    flat = np.asarray(points, dtype=float).ravel().tolist()
+    parts: List[str] = []
+    index = 0
+    for letter in letters:
+        size = 2 * POINTS_PER_COMMAND[letter]
+        if size == 0:
+            parts.append(letter)
+            continue
+        values = ' '.join([str(value) for value in flat[index:index + size]])
+        parts.append(f'{letter} {values}')
+        index += size
+    return ' '.join(parts)
+
+
+def _iter_elements(
+    root: Union[ElementBase, Sequence[ElementBase]]
+) -> Iterator[ElementBase]:
+    """Iterate the elements of a tree or of several subtrees in document order."""
+    roots = [root] if isinstance(root, etree._Element) else root
+    for subtree_root in roots:
+        yield from subtree_root.iter(etree.Element)
+
+
+def _escape_attribute(value: str) -> str:
+    """Escape an attribute value the way lxml serializes it."""
+    for character, escape in _ATTRIBUTE_ESCAPES:
+        if character in value:
+            value = value.replace(character, escape)
+    return value
+
+
+def _recorded_translations(value: str) -> List[Tuple[float, float]]:
+    """Collect the points translate() functions of a value are transformed at."""
+    translations: List[Tuple[float, float]] = []
+
+    def record(point: Tuple[float, float]) -> Tuple[float, float]:
+        translations.append(point)
+        return point
+
+    transform_translate_functions(value, record)
+    return translations
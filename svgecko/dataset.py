@@ -0,0 +1,191 @@
+"""Batches of randomly transformed SVG renders for training vision models."""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import itertools
+from multiprocessing import shared_memory
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+from svgecko.render import rasterize_into
+from svgecko.svg import SVG
+
+TransformationFunction = Callable[[Tuple[float, float]], Tuple[float, float]]
+TransformationSampler = Callable[[np.random.Generator], TransformationFunction]
+
+_worker_sources: List[Union[str, bytes]] = []
+_worker_documents: Dict[int, SVG] = {}
+_worker_sampler: Optional[TransformationSampler] = None
+_worker_blocks: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def augmented_batches(
+    sources: Sequence[Union[str, SVG]],
+    sampler: TransformationSampler,
+    batch_size: int,
+    size: Tuple[int, int],
+    num_batches: Optional[int] = None,
+    seed: int = 0,
+    channels: int = 4,
+    max_workers: Optional[int] = None,
+    prefetch: int = 2
+) -> Iterator[np.ndarray]:
+    """Render batches of randomly transformed SVGs in a process pool.
+
+    Sample i of the stream transforms source i % len(sources) with a
+    transformation drawn by the sampler from a generator seeded with
+    (seed, i), so the batches are reproducible regardless of the number of
+    workers and the order in which they finish. Workers load every source
+    once and rasterize straight into shared memory batch buffers (see
+    render.rasterize_into); at most prefetch batches are rendered ahead of
+    the consumer.
+
+    Args:
+        sources: SVG file paths or SVG objects.
+        sampler: Function drawing a transformation from a NumPy random
+            generator. Must be picklable (e.g., a module-level function).
+        batch_size: Number of samples per batch.
+        size: (height, width) of the renders in pixels.
+        num_batches: Number of batches to produce. Defaults to None
+            (an endless stream).
+        seed: Seed of the sample generators. Defaults to 0.
+        channels: 4 for RGBA, 3 for RGB composited onto white. Defaults to 4.
+        max_workers: Number of worker processes. Defaults to the CPU count.
+        prefetch: Number of batches rendered ahead. Defaults to 2.
+
+    Yields:
+        uint8 arrays of shape (batch_size, height, width, channels).
+
+    Raises:
+        ValueError: If sources is empty or a size or count is invalid.
+        ModuleNotFoundError: If cairosvg is not installed.
+    """
+    if not sources:
+        raise ValueError('At least one source is required.')
+    if batch_size < 1 or prefetch < 1 or min(size) < 1:
+        raise ValueError('batch_size, prefetch and size must be positive.')
+    if channels not in (3, 4):
+        raise ValueError(f'Invalid number of channels: {channels}')
+
+    shape = (batch_size, size[0], size[1], channels)
+    payload = [
+        source._to_bytes() if isinstance(source, SVG) else str(source)
+        for source in sources
+    ]
+    batch_indices = itertools.count() if num_batches is None else range(num_batches)
+    free_blocks: List[shared_memory.SharedMemory] = []
+    pending: Deque[Tuple[shared_memory.SharedMemory, List[Future]]] = deque()
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_initialize_worker,
+        initargs=(payload, sampler),
+    )
+
+    def submit(batch_index: int) -> None:
+        block = (
+            free_blocks.pop()
+            if free_blocks
+            else shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        )
+        futures = [
+            executor.submit(
+                _render_sample,
+                block.name,
+                shape,
+                position,
+                batch_index * batch_size + position,
+                seed,
+            )
+            for position in range(batch_size)
+        ]
+        pending.append((block, futures))
+
+    def collect() -> np.ndarray:
+        block, futures = pending.popleft()
+        free_blocks.append(block)
+        for future in futures:
+            future.result()
+        batch: np.ndarray = np.ndarray(shape, dtype=np.uint8, buffer=block.buf).copy()
+        return batch
+
+    try:
+        for batch_index in batch_indices:
+            submit(batch_index)
+            if len(pending) > prefetch:
+                yield collect()
+        while pending:
+            yield collect()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        for block in free_blocks + [block for block, _futures in pending]:
+            block.close()
+            block.unlink()
+
+
+def sample_generator(seed: int, sample_index: int) -> np.random.Generator:
+    """Create the random generator of a sample of augmented_batches.
+
+    Args:
+        seed: Seed of the stream.
+        sample_index: Index of the sample in the stream.
+
+    Returns:
+        The NumPy random generator.
+    """
+    return np.random.default_rng([seed, sample_index])
+
+
+def _initialize_worker(
+    sources: List[Union[str, bytes]], sampler: TransformationSampler
+) -> None:
+    """Store the sources and the sampler once per worker process."""
+    global _worker_sources, _worker_sampler
+    _worker_sources = sources
+    _worker_sampler = sampler
+    _worker_documents.clear()
+    _worker_blocks.clear()
+
+
+def _render_sample(
+    name: str,
+    shape: Tuple[int, int, int, int],
+    position: int,
+    sample_index: int,
+    seed: int,
+) -> None:
+    """Worker task rendering one transformed sample into a shared batch buffer."""
+    source_index = sample_index % len(_worker_sources)
+    svg = _worker_documents.get(source_index)
+    if svg is None:
+        source = _worker_sources[source_index]
+        svg = (
+            SVG.from_string(source.decode('utf-8'))
+            if isinstance(source, bytes)
+            else SVG.from_file(source)
+        )
+        _worker_documents[source_index] = svg
+
+    if _worker_sampler is None:
+        raise RuntimeError('Worker process was not initialized with a sampler')
+    transformation = _worker_sampler(sample_generator(seed, sample_index))
+    document = svg.transform(transformation)._to_bytes()
+
+    block = _worker_blocks.get(name)
+    if block is None:
+        block = _worker_blocks[name] = shared_memory.SharedMemory(name=name)
+    batch = np.ndarray(shape, dtype=np.uint8, buffer=block.buf)
+    rasterize_into(document, batch[position])
+    del batch
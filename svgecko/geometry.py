@@ -0,0 +1,754 @@
+"""Vectorized geometry helpers operating on NumPy coordinate arrays."""
+
+from __future__ import annotations
+
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Default maximum distance between an arc and the line segments approximating it
+DEFAULT_ARC_TOLERANCE = 0.05
+
+# Largest angle covered by one line segment of a flattened arc
+_MAX_ARC_STEP = math.pi / 8.0
+
+# Newton-Raphson reparameterization steps tried before a Bezier fit is split
+_REPARAMETERIZATION_STEPS = 20
+
+# Gauss-Legendre nodes and weights on [-1, 1] used for arc length integrals
+_GAUSS_LEGENDRE_NODES, _GAUSS_LEGENDRE_WEIGHTS = np.polynomial.legendre.leggauss(8)
+
+# Subintervals per segment in arc length tables and Newton steps inverting them
+_ARC_LENGTH_SUBDIVISIONS = 16
+_ARC_LENGTH_NEWTON_STEPS = 3
+
+
+def point_segment_distances(
+    points: np.ndarray, start: np.ndarray, end: np.ndarray
+) -> np.ndarray:
+    """Compute distances of points to the line segment between start and end.
+
+    Args:
+        points: Array of shape (N, 2) with the query points.
+        start: Array of shape (2,) with the segment start.
+        end: Array of shape (2,) with the segment end.
+
+    Returns:
+        Array of shape (N,) with the euclidean distances. Degenerate segments
+        (start equal to end) measure the distance to that single point.
+    """
+    direction = end - start
+    length_squared = float(np.dot(direction, direction))
+    offsets = points - start
+    if length_squared == 0.0:
+        differences = offsets
+    else:
+        parameters = np.clip(offsets @ direction / length_squared, 0.0, 1.0)
+        projections = start + parameters[:, np.newaxis] * direction
+        differences = points - projections
+    distances: np.ndarray = np.hypot(differences[:, 0], differences[:, 1])
+    return distances
+
+
+def douglas_peucker_mask(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Select the vertices of a polyline kept by the Douglas-Peucker algorithm.
+
+    The first and the last vertex are always kept.
+
+    Args:
+        points: Array of shape (N, 2) with the polyline vertices.
+        tolerance: Maximum allowed distance of a dropped vertex from the
+            simplified polyline.
+
+    Returns:
+        Boolean array of shape (N,) marking the vertices to keep.
+    """
+    points = np.asarray(points, dtype=float)
+    count = len(points)
+    keep = np.zeros(count, dtype=bool)
+    if count == 0:
+        return keep
+    keep[0] = True
+    keep[-1] = True
+
+    stack: List[Tuple[int, int]] = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        inner = points[start + 1:end]
+        distances = point_segment_distances(inner, points[start], points[end])
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            split = start + 1 + index
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    return keep
+
+
+def simplify_polyline(
+    points: np.ndarray, tolerance: float, closed: bool = False
+) -> np.ndarray:
+    """Simplify a polyline or polygon with the Douglas-Peucker algorithm.
+
+    Args:
+        points: Array of shape (N, 2) with the vertices.
+        tolerance: Maximum allowed deviation of the simplified shape.
+        closed: If True, the vertices describe a polygon and the closing
+            edge back to the first vertex is taken into account.
+
+    Returns:
+        Array of shape (M, 2) with the kept vertices, M <= N.
+    """
+    points = np.asarray(points, dtype=float)
+    if len(points) < 3:
+        return points
+    if closed:
+        mask = douglas_peucker_mask(np.vstack([points, points[:1]]), tolerance)[:-1]
+    else:
+        mask = douglas_peucker_mask(points, tolerance)
+    kept: np.ndarray = points[mask]
+    return kept
+
+
+def cubic_bezier_points(
+    control_points: np.ndarray, parameters: np.ndarray
+) -> np.ndarray:
+    """Evaluate a cubic Bezier curve at the given parameters.
+
+    Args:
+        control_points: Array of shape (4, 2) with the control points.
+        parameters: Array of shape (N,) with curve parameters in [0, 1].
+
+    Returns:
+        Array of shape (N, 2) with the curve points.
+    """
+    t = np.asarray(parameters, dtype=float)[:, np.newaxis]
+    s = 1.0 - t
+    p0, p1, p2, p3 = np.asarray(control_points, dtype=float)
+    curve_points: np.ndarray = (
+        s * s * s * p0 + 3.0 * s * s * t * p1 + 3.0 * s * t * t * p2 + t * t * t * p3
+    )
+    return curve_points
+
+
+def quadratic_bezier_points(
+    control_points: np.ndarray, parameters: np.ndarray
+) -> np.ndarray:
+    """Evaluate a quadratic Bezier curve at the given parameters.
+
+    Args:
+        control_points: Array of shape (3, 2) with the control points.
+        parameters: Array of shape (N,) with curve parameters in [0, 1].
+
+    Returns:
+        Array of shape (N, 2) with the curve points.
+    """
+    t = np.asarray(parameters, dtype=float)[:, np.newaxis]
+    s = 1.0 - t
+    p0, p1, p2 = np.asarray(control_points, dtype=float)
+    curve_points: np.ndarray = s * s * p0 + 2.0 * s * t * p1 + t * t * p2
+    return curve_points
+
+
+def flatten_cubic_beziers(
+    control_points: np.ndarray, tolerance: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Approximate many cubic Bezier curves with line segments at once.
+
+    The number of segments of a curve follows from the bound on its second
+    derivative, so the chords deviate at most tolerance from the curve.
+
+    Args:
+        control_points: Array of shape (K, 4, 2) with the control points.
+        tolerance: Maximum allowed distance between a curve and its chords.
+
+    Returns:
+        Tuple (points, offsets) as returned by flatten_arcs: the segment end
+        points of curve k (excluding its start point) are
+        points[offsets[k]:offsets[k + 1]].
+
+    Raises:
+        ValueError: If tolerance is not positive.
+    """
+    if tolerance <= 0.0:
+        raise ValueError(f'Invalid tolerance: {tolerance}')
+
+    control_points = np.asarray(control_points, dtype=float).reshape(-1, 4, 2)
+    first_differences = (
+        control_points[:, 0] - 2.0 * control_points[:, 1] + control_points[:, 2]
+    )
+    second_differences = (
+        control_points[:, 1] - 2.0 * control_points[:, 2] + control_points[:, 3]
+    )
+    bound = 6.0 * np.maximum(
+        np.linalg.norm(first_differences, axis=1),
+        np.linalg.norm(second_differences, axis=1),
+    )
+    segments = np.maximum(np.ceil(np.sqrt(bound / (8.0 * tolerance))), 1).astype(int)
+
+    offsets = np.concatenate([[0], np.cumsum(segments)])
+    curve_indices = np.repeat(np.arange(len(control_points)), segments)
+    t = (
+        (np.arange(offsets[-1]) - offsets[curve_indices] + 1) / segments[curve_indices]
+    )[:, np.newaxis]
+    s = 1.0 - t
+    controls = control_points[curve_indices]
+    points = (
+        s * s * s * controls[:, 0] + 3.0 * s * s * t * controls[:, 1]
+        + 3.0 * s * t * t * controls[:, 2] + t * t * t * controls[:, 3]
+    )
+    points[offsets[1:] - 1] = control_points[:, 3]
+    return points, offsets
+
+
+def fit_cubic_beziers(
+    points: np.ndarray,
+    tolerance: float,
+    max_depth: int = 8,
+    left_tangent: Optional[np.ndarray] = None,
+    right_tangent: Optional[np.ndarray] = None,
+) -> List[np.ndarray]:
+    """Fit a sequence of sampled points with as few cubic Bezier curves as possible.
+
+    Uses Schneider's algorithm: a least-squares fit with fixed end tangents,
+    Newton reparameterization and recursive splitting at the point of the
+    largest error.
+
+    Args:
+        points: Array of shape (N, 2) with ordered samples of a smooth curve.
+        tolerance: Maximum allowed distance of a sample from the fitted curve.
+        max_depth: Maximum recursion depth of the splitting.
+        left_tangent: Optional direction of the curve at the first sample,
+            estimated from the samples if not given.
+        right_tangent: Optional direction pointing back into the curve from
+            the last sample, estimated from the samples if not given.
+
+    Returns:
+        List of arrays of shape (4, 2) with the control points of consecutive
+        curves. The first curve starts at the first sample and the last curve
+        ends at the last sample.
+    """
+    points = np.asarray(points, dtype=float)
+    if len(points) > 1:
+        distinct = np.any(np.diff(points, axis=0) != 0.0, axis=1)
+        points = points[np.concatenate([[True], distinct])]
+    if len(points) < 2:
+        point = points[0]
+        return [np.array([point, point, point, point])]
+
+    left_tangent = (
+        _end_tangent(points)
+        if left_tangent is None
+        else _unit_vector(np.asarray(left_tangent, dtype=float))
+    )
+    right_tangent = (
+        _end_tangent(points[::-1])
+        if right_tangent is None
+        else _unit_vector(np.asarray(right_tangent, dtype=float))
+    )
+    return _fit_cubic(points, left_tangent, right_tangent, tolerance, max_depth)
+
+
+def _fit_cubic(
+    points: np.ndarray,
+    left_tangent: np.ndarray,
+    right_tangent: np.ndarray,
+    tolerance: float,
+    depth: int,
+) -> List[np.ndarray]:
+    """Recursive step of fit_cubic_beziers."""
+    first, last = points[0], points[-1]
+    if len(points) == 2:
+        distance = float(np.hypot(*(last - first))) / 3.0
+        return [
+            np.array(
+                [
+                    first,
+                    first + left_tangent * distance,
+                    last + right_tangent * distance,
+                    last,
+                ]
+            )
+        ]
+
+    parameters = _chord_length_parameters(points)
+    bezier = _generate_bezier(points, parameters, left_tangent, right_tangent)
+    error, split = _max_fit_error(points, bezier, parameters)
+    if error <= tolerance:
+        return [bezier]
+
+    for _ in range(_REPARAMETERIZATION_STEPS):
+        parameters = _reparameterize(bezier, points, parameters)
+        bezier = _generate_bezier(points, parameters, left_tangent, right_tangent)
+        error, split = _max_fit_error(points, bezier, parameters)
+        if error <= tolerance:
+            return [bezier]
+
+    if depth <= 0:
+        return [bezier]
+
+    center_tangent = _unit_vector(points[split - 1] - points[split + 1])
+    return _fit_cubic(
+        points[: split + 1], left_tangent, center_tangent, tolerance, depth - 1
+    ) + _fit_cubic(points[split:], -center_tangent, right_tangent, tolerance, depth - 1)
+
+
+def _unit_vector(vector: np.ndarray) -> np.ndarray:
+    """Normalize a vector, returning the zero vector for zero input."""
+    length = float(np.hypot(vector[0], vector[1]))
+    if length == 0.0:
+        return np.zeros(2)
+    return vector / length
+
+
+def _end_tangent(points: np.ndarray) -> np.ndarray:
+    """Estimate the unit tangent at the first point with a three-point difference."""
+    if len(points) < 3:
+        return _unit_vector(points[1] - points[0])
+    h1 = float(np.hypot(*(points[1] - points[0])))
+    h2 = float(np.hypot(*(points[2] - points[1])))
+    tangent = (
+        -(2.0 * h1 + h2) / (h1 * (h1 + h2)) * points[0]
+        + (h1 + h2) / (h1 * h2) * points[1]
+        - h1 / (h2 * (h1 + h2)) * points[2]
+    )
+    return _unit_vector(tangent)
+
+
+def _chord_length_parameters(points: np.ndarray) -> np.ndarray:
+    """Assign curve parameters to points proportionally to the chord length."""
+    lengths = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))])
+    if lengths[-1] == 0.0:
+        return np.linspace(0.0, 1.0, len(points))
+    parameters: np.ndarray = lengths / lengths[-1]
+    return parameters
+
+
+def _generate_bezier(
+    points: np.ndarray,
+    parameters: np.ndarray,
+    left_tangent: np.ndarray,
+    right_tangent: np.ndarray,
+) -> np.ndarray:
+    """Least-squares fit of the inner control point distances along the end tangents."""
+    first, last = points[0], points[-1]
+    t = parameters[:, np.newaxis]
+    s = 1.0 - t
+    a1 = 3.0 * s * s * t * left_tangent
+    a2 = 3.0 * s * t * t * right_tangent
+    residual = (
+        points
+        - (s * s * s + 3.0 * s * s * t) * first
+        - (3.0 * s * t * t + t * t * t) * last
+    )
+
+    c11 = float(np.sum(a1 * a1))
+    c12 = float(np.sum(a1 * a2))
+    c22 = float(np.sum(a2 * a2))
+    x1 = float(np.sum(a1 * residual))
+    x2 = float(np.sum(a2 * residual))
+
+    determinant = c11 * c22 - c12 * c12
+    segment_length = float(np.hypot(*(last - first)))
+    if determinant != 0.0:
+        alpha_left = (x1 * c22 - x2 * c12) / determinant
+        alpha_right = (c11 * x2 - c12 * x1) / determinant
+    else:
+        alpha_left = alpha_right = 0.0
+
+    epsilon = 1e-6 * segment_length
+    if alpha_left < epsilon or alpha_right < epsilon:
+        alpha_left = alpha_right = segment_length / 3.0
+
+    return np.array(
+        [
+            first,
+            first + left_tangent * alpha_left,
+            last + right_tangent * alpha_right,
+            last,
+        ]
+    )
+
+
+def _max_fit_error(
+    points: np.ndarray, bezier: np.ndarray, parameters: np.ndarray
+) -> Tuple[float, int]:
+    """Find the largest distance between the samples and their fitted points."""
+    differences = cubic_bezier_points(bezier, parameters) - points
+    distances = np.hypot(differences[:, 0], differences[:, 1])
+    inner = distances[1:-1]
+    split = 1 + int(np.argmax(inner))
+    return float(inner[split - 1]), split
+
+
+def _reparameterize(
+    bezier: np.ndarray, points: np.ndarray, parameters: np.ndarray
+) -> np.ndarray:
+    """Improve the curve parameters of the samples with one Newton-Raphson step."""
+    t = parameters[:, np.newaxis]
+    s = 1.0 - t
+    p0, p1, p2, p3 = bezier
+    first_derivative = 3.0 * (
+        s * s * (p1 - p0) + 2.0 * s * t * (p2 - p1) + t * t * (p3 - p2)
+    )
+    second_derivative = 6.0 * (s * (p2 - 2.0 * p1 + p0) + t * (p3 - 2.0 * p2 + p1))
+    differences = cubic_bezier_points(bezier, parameters) - points
+    numerator = np.sum(differences * first_derivative, axis=1)
+    denominator = np.sum(
+        first_derivative * first_derivative + differences * second_derivative, axis=1
+    )
+    safe = denominator != 0.0
+    updated = parameters.copy()
+    updated[safe] -= numerator[safe] / denominator[safe]
+    clipped: np.ndarray = np.clip(updated, 0.0, 1.0)
+    return clipped
+
+
+def arc_center_parameters(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    radii: np.ndarray,
+    rotations: np.ndarray,
+    large_arcs: np.ndarray,
+    sweeps: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Convert many SVG arcs from endpoint to center parameterization.
+
+    Implements SVG 1.1, appendix F.6, including the correction of radii too
+    small to reach the end point. A point of arc k at angle theta is
+    center + R(phi) (rx cos(theta), ry sin(theta)) for theta from theta1 to
+    theta1 + delta.
+
+    Args:
+        starts: Array of shape (K, 2) with the current points before the arcs.
+        ends: Array of shape (K, 2) with the arc end points.
+        radii: Array of shape (K, 2) with the (rx, ry) radii.
+        rotations: Array of shape (K,) with the x-axis rotations in degrees.
+        large_arcs: Array of shape (K,) with the large-arc flags.
+        sweeps: Array of shape (K,) with the sweep flags.
+
+    Returns:
+        Tuple (centers, radii, phi, theta1, delta, degenerate) with the
+        (K, 2) centers and corrected radii, the rotations in radians, the
+        start angles, the signed angle spans and a mask of degenerate arcs
+        (zero radius or coinciding end points), which are straight lines.
+    """
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+    radii = np.abs(np.asarray(radii, dtype=float).reshape(-1, 2))
+    rotations = np.asarray(rotations, dtype=float).reshape(-1)
+    large_arcs = np.asarray(large_arcs, dtype=bool).reshape(-1)
+    sweeps = np.asarray(sweeps, dtype=bool).reshape(-1)
+
+    rx = radii[:, 0].copy()
+    ry = radii[:, 1].copy()
+    degenerate = (rx == 0.0) | (ry == 0.0) | np.all(starts == ends, axis=1)
+
+    phi = np.radians(rotations % 360.0)
+    cos_phi = np.cos(phi)
+    sin_phi = np.sin(phi)
+
+    half_difference = (starts - ends) / 2.0
+    x1p = cos_phi * half_difference[:, 0] + sin_phi * half_difference[:, 1]
+    y1p = -sin_phi * half_difference[:, 0] + cos_phi * half_difference[:, 1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        radius_check = x1p * x1p / (rx * rx) + y1p * y1p / (ry * ry)
+        scale = np.where(radius_check > 1.0, np.sqrt(radius_check), 1.0)
+        rx = rx * scale
+        ry = ry * scale
+        rx2 = rx * rx
+        ry2 = ry * ry
+
+        numerator = rx2 * ry2 - rx2 * y1p * y1p - ry2 * x1p * x1p
+        denominator = rx2 * y1p * y1p + ry2 * x1p * x1p
+        degenerate |= denominator == 0.0
+
+        factor = np.sqrt(np.maximum(0.0, numerator / denominator))
+        factor = np.where(large_arcs == sweeps, -factor, factor)
+        cxp = factor * rx * y1p / ry
+        cyp = -factor * ry * x1p / rx
+
+        midpoints = (starts + ends) / 2.0
+        cx = cos_phi * cxp - sin_phi * cyp + midpoints[:, 0]
+        cy = sin_phi * cxp + cos_phi * cyp + midpoints[:, 1]
+
+        v1x = (x1p - cxp) / rx
+        v1y = (y1p - cyp) / ry
+        v2x = (-x1p - cxp) / rx
+        v2y = (-y1p - cyp) / ry
+        theta1 = np.arctan2(v1y, v1x)
+        delta = np.arctan2(v1x * v2y - v1y * v2x, v1x * v2x + v1y * v2y)
+        delta = np.where(~sweeps & (delta > 0.0), delta - 2.0 * math.pi, delta)
+        delta = np.where(sweeps & (delta < 0.0), delta + 2.0 * math.pi, delta)
+
+    return (
+        np.column_stack([cx, cy]),
+        np.column_stack([rx, ry]),
+        phi,
+        theta1,
+        delta,
+        degenerate,
+    )
+
+
+def flatten_arcs(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    radii: np.ndarray,
+    rotations: np.ndarray,
+    large_arcs: np.ndarray,
+    sweeps: np.ndarray,
+    tolerance: float = DEFAULT_ARC_TOLERANCE,
+    max_step: float = _MAX_ARC_STEP,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Approximate many SVG elliptical arcs with line segments at once.
+
+    Converts every arc from endpoint to center parameterization (SVG 1.1,
+    appendix F.6) and samples all arcs in one batch. The number of segments
+    of an arc is chosen so that the chords deviate at most tolerance from an
+    ellipse with the arc's larger radius.
+
+    Args:
+        starts: Array of shape (K, 2) with the current points before the arcs.
+        ends: Array of shape (K, 2) with the arc end points.
+        radii: Array of shape (K, 2) with the (rx, ry) radii.
+        rotations: Array of shape (K,) with the x-axis rotations in degrees.
+        large_arcs: Array of shape (K,) with the large-arc flags.
+        sweeps: Array of shape (K,) with the sweep flags.
+        tolerance: Maximum allowed distance between an arc and its chords.
+        max_step: Largest angle in radians covered by one segment.
+
+    Returns:
+        Tuple (points, offsets). points has shape (N, 2) and contains the
+        segment end points of all arcs (excluding the start points and ending
+        exactly at the arc end points); the points of arc k are
+        points[offsets[k]:offsets[k + 1]]. Degenerate arcs (zero radius or
+        coinciding end points) contribute only their end point.
+    """
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+    centers, radii, phi, theta1, delta, degenerate = arc_center_parameters(
+        starts, ends, radii, rotations, large_arcs, sweeps
+    )
+    cx, cy = centers[:, 0], centers[:, 1]
+    rx, ry = radii[:, 0], radii[:, 1]
+    cos_phi = np.cos(phi)
+    sin_phi = np.sin(phi)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        radius = np.maximum(rx, ry)
+        step = 2.0 * np.arccos(np.clip(1.0 - tolerance / radius, -1.0, 1.0))
+        step = np.where(step > 0.0, np.minimum(step, max_step), max_step)
+        segments = np.ceil(np.abs(delta) / step)
+
+    segments = np.where(
+        degenerate | ~np.isfinite(segments), 1, np.maximum(segments, 1)
+    ).astype(int)
+    offsets = np.concatenate([[0], np.cumsum(segments)])
+    arc_indices = np.repeat(np.arange(len(starts)), segments)
+    fractions = (np.arange(offsets[-1]) - offsets[arc_indices] + 1) / segments[
+        arc_indices
+    ]
+
+    with np.errstate(invalid='ignore'):
+        angles = theta1[arc_indices] + delta[arc_indices] * fractions
+        cos_angles = np.cos(angles)
+        sin_angles = np.sin(angles)
+        arc_rx = rx[arc_indices]
+        arc_ry = ry[arc_indices]
+        points = np.column_stack(
+            [
+                cx[arc_indices]
+                + arc_rx * cos_phi[arc_indices] * cos_angles
+                - arc_ry * sin_phi[arc_indices] * sin_angles,
+                cy[arc_indices]
+                + arc_rx * sin_phi[arc_indices] * cos_angles
+                + arc_ry * cos_phi[arc_indices] * sin_angles,
+            ]
+        )
+    points[offsets[1:] - 1] = ends
+
+    return points, offsets
+
+
+class ArcLengthTable:
+    """Arc-length parameterization of a sequence of curve segments.
+
+    Segment k is a cubic Bezier curve with control points controls[k] or,
+    where is_arc[k], an elliptical arc with center parameters arcs[k] =
+    (cx, cy, rx, ry, phi, theta1, delta) traversed from theta1 to
+    theta1 + delta (see arc_center_parameters). Every segment is split into
+    subintervals whose lengths are integrated with Gauss-Legendre quadrature
+    in one batch and stored as a cumulative table. Lookups by distance
+    interpolate in the table and refine the curve parameter with Newton
+    steps.
+
+    Example:
+        >>> table = ArcLengthTable(controls, arcs, is_arc)
+        >>> table.points_at(np.linspace(0.0, table.length, 100))
+    """
+
+    def __init__(
+        self,
+        controls: np.ndarray,
+        arcs: np.ndarray,
+        is_arc: np.ndarray,
+        subdivisions: int = _ARC_LENGTH_SUBDIVISIONS
+    ) -> None:
+        """Build the cumulative length table.
+
+        Args:
+            controls: Array of shape (K, 4, 2) with cubic control points
+                (ignored for arcs).
+            arcs: Array of shape (K, 7) with arc center parameters (ignored
+                for Bezier segments).
+            is_arc: Array of shape (K,) marking the arc segments.
+            subdivisions: Number of table intervals per segment.
+        """
+        self._controls = np.asarray(controls, dtype=float).reshape(-1, 4, 2)
+        self._arcs = np.asarray(arcs, dtype=float).reshape(-1, 7)
+        self._is_arc = np.asarray(is_arc, dtype=bool).reshape(-1)
+        self._subdivisions = subdivisions
+
+        segment_count = len(self._is_arc)
+        segments = np.repeat(np.arange(segment_count), subdivisions)
+        lower = np.tile(np.arange(subdivisions), segment_count) / subdivisions
+        lengths = self._integrate(segments, lower, lower + 1.0 / subdivisions)
+        self._cumulative = np.concatenate([[0.0], np.cumsum(lengths)])
+
+    @property
+    def length(self) -> float:
+        """Get the total length of all segments."""
+        return float(self._cumulative[-1])
+
+    @property
+    def segment_lengths(self) -> np.ndarray:
+        """Get the lengths of the individual segments."""
+        return np.diff(self._cumulative[::self._subdivisions])
+
+    def points(self, segments: np.ndarray, parameters: np.ndarray) -> np.ndarray:
+        """Evaluate segments at curve parameters.
+
+        Args:
+            segments: Array of shape (M,) with segment indices.
+            parameters: Array of shape (M,) with parameters in [0, 1].
+
+        Returns:
+            Array of shape (M, 2) with the points.
+        """
+        t = parameters[:, np.newaxis]
+        s = 1.0 - t
+        controls = self._controls[segments]
+        bezier = (
+            s * s * s * controls[:, 0] + 3.0 * s * s * t * controls[:, 1]
+            + 3.0 * s * t * t * controls[:, 2] + t * t * t * controls[:, 3]
+        )
+
+        cx, cy, rx, ry, phi, theta1, delta = self._arcs[segments].T
+        angles = theta1 + parameters * delta
+        cos_angles, sin_angles = np.cos(angles), np.sin(angles)
+        cos_phi, sin_phi = np.cos(phi), np.sin(phi)
+        ellipse = np.column_stack([
+            cx + rx * cos_phi * cos_angles - ry * sin_phi * sin_angles,
+            cy + rx * sin_phi * cos_angles + ry * cos_phi * sin_angles,
+        ])
+        return np.where(self._is_arc[segments][:, np.newaxis], ellipse, bezier)
+
+    def speeds(self, segments: np.ndarray, parameters: np.ndarray) -> np.ndarray:
+        """Get the lengths of the derivatives of segments at curve parameters.
+
+        Args:
+            segments: Array of shape (M,) with segment indices.
+            parameters: Array of shape (M,) with parameters in [0, 1].
+
+        Returns:
+            Array of shape (M,) with the speeds.
+        """
+        t = parameters[:, np.newaxis]
+        s = 1.0 - t
+        controls = self._controls[segments]
+        derivatives = 3.0 * (
+            s * s * (controls[:, 1] - controls[:, 0])
+            + 2.0 * s * t * (controls[:, 2] - controls[:, 1])
+            + t * t * (controls[:, 3] - controls[:, 2])
+        )
+        bezier = np.hypot(derivatives[:, 0], derivatives[:, 1])
+
+        _cx, _cy, rx, ry, _phi, theta1, delta = self._arcs[segments].T
+        angles = theta1 + parameters * delta
+        ellipse = np.abs(delta) * np.hypot(rx * np.sin(angles), ry * np.cos(angles))
+        speeds: np.ndarray = np.where(self._is_arc[segments], ellipse, bezier)
+        return speeds
+
+    def locate(self, distances: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the segments and curve parameters at distances along the segments.
+
+        Args:
+            distances: Array of shape (M,) with distances from the start;
+                values outside [0, length] are clipped.
+
+        Returns:
+            Tuple (segments, parameters) of arrays of shape (M,).
+
+        Raises:
+            ValueError: If the table has no segments.
+        """
+        interval_count = len(self._cumulative) - 1
+        if interval_count == 0:
+            raise ValueError('Cannot locate points without segments.')
+
+        distances = np.clip(
+            np.asarray(distances, dtype=float).reshape(-1), 0.0, self.length
+        )
+        index = np.clip(
+            np.searchsorted(self._cumulative, distances, side='right') - 1,
+            0,
+            interval_count - 1,
+        )
+        segments = index // self._subdivisions
+        lower = (index % self._subdivisions) / self._subdivisions
+        upper = lower + 1.0 / self._subdivisions
+        remaining = distances - self._cumulative[index]
+        interval_lengths = self._cumulative[index + 1] - self._cumulative[index]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fractions = np.where(
+                interval_lengths > 0.0, remaining / interval_lengths, 1.0
+            )
+            parameters = lower + np.clip(fractions, 0.0, 1.0) / self._subdivisions
+            for _ in range(_ARC_LENGTH_NEWTON_STEPS):
+                errors = self._integrate(segments, lower, parameters) - remaining
+                speeds = self.speeds(segments, parameters)
+                steps = np.where(speeds > 0.0, errors / speeds, 0.0)
+                parameters = np.clip(parameters - steps, lower, upper)
+        return segments, parameters
+
+    def points_at(self, distances: np.ndarray) -> np.ndarray:
+        """Get the points at distances along the segments.
+
+        Args:
+            distances: Array of shape (M,) with distances from the start.
+
+        Returns:
+            Array of shape (M, 2) with the points.
+        """
+        return self.points(*self.locate(distances))
+
+    def _integrate(
+        self, segments: np.ndarray, lower: np.ndarray, upper: np.ndarray
+    ) -> np.ndarray:
+        """Integrate the speeds of segments between parameter bounds."""
+        half_widths = (upper - lower) / 2.0
+        parameters = lower[:, np.newaxis] + half_widths[:, np.newaxis] * (
+            _GAUSS_LEGENDRE_NODES + 1.0
+        )
+        order = len(_GAUSS_LEGENDRE_NODES)
+        speeds = self.speeds(
+            np.repeat(segments, order), parameters.reshape(-1)
+        ).reshape(-1, order)
+        lengths: np.ndarray = half_widths * (speeds @ _GAUSS_LEGENDRE_WEIGHTS)
+        return lengths
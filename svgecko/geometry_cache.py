@@ -0,0 +1,311 @@
+"""Memory-mapped sidecar files with the pre-parsed path geometry of SVG files."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from lxml import etree
+from lxml.etree import ElementBase
+
+from svgecko.geometry import DEFAULT_ARC_TOLERANCE
+from svgecko.svg_path import Path
+
+# Changed whenever sidecar files of an older version must not be reused
+_GEOMETRY_CACHE_VERSION = 1
+_READ_CHUNK_BYTES = 1 << 20
+# Arrays stored after the metadata, in file order
+_ARRAY_NAMES = (
+    'element_indices',
+    'letters',
+    'command_offsets',
+    'points',
+    'point_offsets',
+)
+
+
+class GeometryCache:
+    """Absolute path commands of all elements with path data of a document.
+
+    Commands are stored as ASCII command letters and an (N, 2) point array,
+    as produced by Path._to_absolute, so transformations can use them
+    without tokenizing the path data again. Saved files are sequences of
+    .npy arrays that are memory-mapped when loaded. An entry is only used
+    while the element's d attribute equals the path data it was parsed
+    from, so modified documents fall back to parsing.
+
+    Example:
+        >>> SVG.from_file('map.svg').save_geometry_cache('map.svg.geometry')
+        >>> svg = SVG.from_file('map.svg', geometry_cache='map.svg.geometry')
+    """
+
+    def __init__(
+        self,
+        arc_tolerance: float,
+        element_indices: np.ndarray,
+        letters: np.ndarray,
+        command_offsets: np.ndarray,
+        points: np.ndarray,
+        point_offsets: np.ndarray,
+        path_data_checksum: int
+    ) -> None:
+        """Initialize from the geometry arrays.
+
+        Args:
+            arc_tolerance: Tolerance the arcs were flattened with.
+            element_indices: Array of shape (E,) with the document order
+                indices of the elements with path data.
+            letters: Array of shape (K,) with the ASCII codes of the
+                absolute command letters of all elements.
+            command_offsets: Array of shape (E + 1,); the letters of element
+                e are letters[command_offsets[e]:command_offsets[e + 1]].
+            points: Array of shape (N, 2) with the command coordinates.
+            point_offsets: Array of shape (E + 1,); the points of element e
+                are points[point_offsets[e]:point_offsets[e + 1]].
+            path_data_checksum: CRC-32 of the path data of all elements.
+        """
+        self._arc_tolerance = float(arc_tolerance)
+        self._element_indices = element_indices
+        self._letters = letters
+        self._command_offsets = command_offsets
+        self._points = points
+        self._point_offsets = point_offsets
+        self._path_data_checksum = path_data_checksum
+        self._rows: Dict[int, int] = {}
+        self._path_data: List[str] = []
+
+    @classmethod
+    def from_element(
+        cls, root: ElementBase, arc_tolerance: float = DEFAULT_ARC_TOLERANCE
+    ) -> GeometryCache:
+        """Parse the path data of a document.
+
+        Args:
+            root: Root element of the document.
+            arc_tolerance: Maximum deviation of flattened arcs.
+
+        Returns:
+            The GeometryCache, bound to the document.
+
+        Raises:
+            ValueError: If path data contains invalid commands.
+        """
+        element_indices: List[int] = []
+        letters: List[str] = []
+        command_offsets = [0]
+        values: List[float] = []
+        point_offsets = [0]
+        path_data: List[str] = []
+        for element_index, element in enumerate(root.iter(etree.Element)):
+            d = element.get('d')
+            if d is None:
+                continue
+            commands = Path.from_command_string(d)._to_absolute(arc_tolerance)._commands
+            for command in commands:
+                values.extend(command.coordinates)
+            element_indices.append(element_index)
+            letters.append(''.join(command.type for command in commands))
+            command_offsets.append(command_offsets[-1] + len(commands))
+            point_offsets.append(len(values) // 2)
+            path_data.append(d)
+
+        cache = cls(
+            arc_tolerance,
+            np.array(element_indices, dtype=np.int64),
+            np.frombuffer(''.join(letters).encode('ascii'), dtype=np.uint8),
+            np.array(command_offsets, dtype=np.int64),
+            np.array(values, dtype=float).reshape(-1, 2),
+            np.array(point_offsets, dtype=np.int64),
+            _checksum(path_data),
+        )
+        cache._rows = {
+            element_index: row for row, element_index in enumerate(element_indices)
+        }
+        cache._path_data = path_data
+        return cache
+
+    @property
+    def arc_tolerance(self) -> float:
+        """Get the tolerance the arcs were flattened with."""
+        return self._arc_tolerance
+
+    @property
+    def points(self) -> np.ndarray:
+        """Get the (N, 2) array of the command coordinates of all elements."""
+        return self._points
+
+    def save(self, path: str, source_path: str) -> None:
+        """Write the cache next to the SVG file it was parsed from.
+
+        Args:
+            path: Path of the cache file.
+            source_path: Path of the SVG file. Its size, modification time
+                and SHA-256 digest are recorded to detect changes.
+        """
+        status = os.stat(source_path)
+        metadata = {
+            'version': _GEOMETRY_CACHE_VERSION,
+            'arc_tolerance': self._arc_tolerance,
+            'source_size': status.st_size,
+            'source_mtime_ns': status.st_mtime_ns,
+            'source_sha256': _file_digest(source_path),
+            'path_data_checksum': self._path_data_checksum,
+        }
+        arrays = [np.frombuffer(json.dumps(metadata).encode('utf-8'), dtype=np.uint8)]
+        arrays.extend(
+            np.ascontiguousarray(getattr(self, f'_{name}')) for name in _ARRAY_NAMES
+        )
+
+        directory = os.path.dirname(os.path.abspath(path))
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(file_descriptor, 'wb') as file:
+            for array in arrays:
+                np.lib.format.write_array(
+                    file, array, version=(1, 0), allow_pickle=False
+                )
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(
+        cls, path: str, source_path: str, root: ElementBase
+    ) -> Optional[GeometryCache]:
+        """Memory-map a cache file if it is still valid for an SVG file.
+
+        The cache is valid if the SVG file has the recorded size and either
+        the recorded modification time or the recorded SHA-256 digest, and
+        if the path data of the parsed document matches the cached one.
+
+        Args:
+            path: Path of the cache file.
+            source_path: Path of the SVG file.
+            root: Root element of the document parsed from the SVG file.
+
+        Returns:
+            The GeometryCache bound to the document, or None if the file is
+            missing, unreadable or stale.
+        """
+        try:
+            metadata, arrays = _read_arrays(path)
+        except (OSError, ValueError):
+            return None
+        if metadata.get('version') != _GEOMETRY_CACHE_VERSION:
+            return None
+
+        status = os.stat(source_path)
+        if status.st_size != metadata['source_size']:
+            return None
+        if (
+            status.st_mtime_ns != metadata['source_mtime_ns']
+            and _file_digest(source_path) != metadata['source_sha256']
+        ):
+            return None
+
+        element_indices, letters, command_offsets, points, point_offsets = arrays
+        cache = cls(
+            metadata['arc_tolerance'],
+            element_indices,
+            letters,
+            command_offsets,
+            points,
+            point_offsets,
+            path_data_checksum=metadata['path_data_checksum'],
+        )
+        return cache if cache._bind(root) else None
+
+    def lookup(
+        self, element_index: int, d: str, arc_tolerance: float
+    ) -> Optional[Tuple[str, np.ndarray]]:
+        """Get the parsed commands of an element if they are still valid.
+
+        Args:
+            element_index: Index of the element in document order.
+            d: Current path data of the element.
+            arc_tolerance: Tolerance arcs have to be flattened with.
+
+        Returns:
+            Tuple (absolute command letters, (n, 2) points), or None if the
+            element is not cached, its path data changed or the tolerance
+            differs.
+        """
+        row = self._rows.get(element_index)
+        if (
+            row is None
+            or arc_tolerance != self._arc_tolerance
+            or self._path_data[row] != d
+        ):
+            return None
+        first, last = self._command_offsets[row:row + 2].tolist()
+        start, stop = self._point_offsets[row:row + 2].tolist()
+        return (
+            self._letters[first:last].tobytes().decode('ascii'),
+            self._points[start:stop],
+        )
+
+    def _bind(self, root: ElementBase) -> bool:
+        """Record the path data of the cached elements, checking it is unchanged."""
+        elements = list(root.iter(etree.Element))
+        element_indices = self._element_indices.tolist()
+        if element_indices and element_indices[-1] >= len(elements):
+            return False
+        path_data = [
+            elements[element_index].get('d') for element_index in element_indices
+        ]
+        if None in path_data or _checksum(path_data) != self._path_data_checksum:
+            return False
+        self._rows = {
+            element_index: row for row, element_index in enumerate(element_indices)
+        }
+        self._path_data = path_data
+        return True
+
+
+def _read_arrays(path: str) -> Tuple[Dict, List[np.ndarray]]:
+    """Read the metadata and memory-map the arrays of a cache file."""
+    header_readers = {
+        (1, 0): np.lib.format.read_array_header_1_0,
+        (2, 0): np.lib.format.read_array_header_2_0,
+    }
+    arrays = []
+    with open(path, 'rb') as file:
+        for _ in range(len(_ARRAY_NAMES) + 1):
+            version = np.lib.format.read_magic(file)
+            if version not in header_readers:
+                raise ValueError(f'Unsupported .npy version: {version}')
+            shape, fortran_order, dtype = header_readers[version](file)
+            if fortran_order or dtype.hasobject:
+                raise ValueError('Invalid geometry cache array.')
+            offset = file.tell()
+            size = int(np.prod(shape)) * dtype.itemsize
+            if size == 0:
+                arrays.append(np.empty(shape, dtype=dtype))
+            elif not arrays:
+                arrays.append(np.frombuffer(file.read(size), dtype=dtype))
+            else:
+                arrays.append(
+                    np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+                )
+            file.seek(offset + size)
+    metadata = json.loads(arrays[0].tobytes().decode('utf-8'))
+    return metadata, arrays[1:]
+
+
+def _checksum(path_data: List[str]) -> int:
+    """Compute the CRC-32 of the path data of all cached elements."""
+    checksum = 0
+    for d in path_data:
+        checksum = zlib.crc32(d.encode('utf-8') + b'\0', checksum)
+    return checksum
+
+
+def _file_digest(path: str) -> str:
+    """Compute the SHA-256 digest of a file, reading it in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(_READ_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
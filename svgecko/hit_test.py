@@ -0,0 +1,310 @@
+"""Vectorized point-in-shape queries against the filled geometry of SVG documents."""
+
+from __future__ import annotations
+
+import re
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+from lxml import etree
+from lxml.etree import ElementBase
+
+from svgecko.coordinates import geometry_arrays
+from svgecko.geometry import DEFAULT_ARC_TOLERANCE
+from svgecko.render import REFERENCED_CONTAINERS, viewport_ctms
+from svgecko.svg_path import COMMAND_CODES
+
+FILL_RULES = ('nonzero', 'evenodd')
+
+# Maximum number of point-edge pairs evaluated at once
+_MAX_PAIRS = 1 << 20
+_FILL_RULE_RE = re.compile(r'(?:^|;)\s*fill-rule\s*:\s*(?P<value>[^;]*)')
+_DISPLAY_NONE_RE = re.compile(r'(?:^|;)\s*display\s*:\s*none\b')
+
+
+class HitTestIndex:
+    """Flattened outlines of the paths, polygons and polylines of a document.
+
+    Curves and arcs are flattened once into polygon edges in the root
+    coordinate system (through every element's CTM, including nested <svg>
+    viewports). Queries find candidate
+    elements through their bounding boxes and count the winding number of
+    all candidate points against the edges of an element in NumPy. Content
+    of referenced containers (defs, clipPath, ...) and elements with
+    display none are excluded; fill and stroke paint are not considered.
+
+    Example:
+        >>> index = HitTestIndex.from_element(svg.xml)
+        >>> rows = index.query(np.array([[10.0, 20.0], [30.0, 5.0]]))
+    """
+
+    def __init__(
+        self,
+        element_indices: np.ndarray,
+        ids: List[Optional[str]],
+        evenodd: np.ndarray,
+        boxes: np.ndarray,
+        edges: np.ndarray,
+        edge_offsets: np.ndarray,
+        tolerance: float
+    ) -> None:
+        """Initialize from the flattened outlines.
+
+        Args:
+            element_indices: Array of shape (E,) with the document order
+                indices of the elements.
+            ids: The id attribute of every element, or None.
+            evenodd: Boolean array of shape (E,); True for elements with the
+                evenodd fill rule, False for nonzero.
+            boxes: Array of shape (E, 4) with (x0, y0, x1, y1) per element.
+            edges: Array of shape (M, 4) with (x0, y0, x1, y1) per edge.
+            edge_offsets: Array of shape (E + 1,); the edges of element e
+                are edges[edge_offsets[e]:edge_offsets[e + 1]].
+            tolerance: Tolerance the curves and arcs were flattened with.
+        """
+        self._element_indices = element_indices
+        self._ids = ids
+        self._evenodd = evenodd
+        self._boxes = boxes
+        self._edges = edges
+        self._edge_offsets = edge_offsets
+        self._tolerance = float(tolerance)
+
+    @classmethod
+    def from_element(
+        cls, root: ElementBase, tolerance: float = DEFAULT_ARC_TOLERANCE
+    ) -> HitTestIndex:
+        """Flatten the outlines of a document.
+
+        Args:
+            root: Root element of the document.
+            tolerance: Maximum distance between curves or arcs and the
+                edges approximating them.
+
+        Returns:
+            The HitTestIndex.
+
+        Raises:
+            ValueError: If path data contains invalid commands.
+        """
+        arrays = geometry_arrays(root, tolerance)
+        elements = list(root.iter(etree.Element))
+        hidden = _hidden_elements(root)
+        ctms = viewport_ctms(root)
+
+        rows = [
+            row
+            for row, index in enumerate(arrays.element_indices.tolist())
+            if elements[index] not in hidden
+        ]
+        element_indices = arrays.element_indices[rows]
+        ids = [arrays.ids[row] for row in rows]
+        evenodd = np.array(
+            [
+                _fill_rule(elements[index]) == 'evenodd'
+                for index in element_indices.tolist()
+            ],
+            dtype=bool,
+        )
+
+        # Vertices of all kept elements with a flag marking subpath starts
+        vertices: List[np.ndarray] = []
+        starts: List[np.ndarray] = []
+        vertex_counts: List[int] = []
+        for row, index in zip(rows, element_indices.tolist()):
+            element_arrays = arrays.element(row)
+            points, is_start = _subpath_vertices(
+                element_arrays.codes, element_arrays.points, element_arrays.offsets
+            )
+            vertices.append(
+                ctms[elements[index]].transform_points(points)
+                if len(points)
+                else points
+            )
+            starts.append(is_start)
+            vertex_counts.append(len(points))
+
+        if not vertices:
+            empty = np.zeros((0, 4))
+            return cls(
+                element_indices,
+                ids,
+                evenodd,
+                empty,
+                empty,
+                np.zeros(1, dtype=np.int64),
+                tolerance,
+            )
+
+        points = np.concatenate(vertices)
+        is_start = np.concatenate(starts)
+        vertex_elements = np.repeat(np.arange(len(rows)), vertex_counts)
+        subpaths = np.cumsum(is_start) - 1
+
+        # Edges between consecutive vertices of a subpath and back to its start
+        following = np.flatnonzero(subpaths[:-1] == subpaths[1:])
+        subpath_starts = np.flatnonzero(is_start)
+        subpath_ends = np.append(subpath_starts[1:], len(points)) - 1
+        edge_starts = np.concatenate([following, subpath_ends])
+        edge_ends = np.concatenate([following + 1, subpath_starts])
+        order = np.argsort(vertex_elements[edge_starts], kind='stable')
+        edge_starts, edge_ends = edge_starts[order], edge_ends[order]
+        edges = np.hstack([points[edge_starts], points[edge_ends]])
+        edge_counts = np.bincount(vertex_elements[edge_starts], minlength=len(rows))
+
+        boxes = np.full((len(rows), 4), np.nan)
+        vertex_offsets = np.concatenate([[0], np.cumsum(vertex_counts)]).astype(
+            np.int64
+        )
+        filled = np.flatnonzero(np.asarray(vertex_counts) > 0)
+        if len(filled):
+            boxes[filled, :2] = np.minimum.reduceat(
+                points, vertex_offsets[filled], axis=0
+            )
+            boxes[filled, 2:] = np.maximum.reduceat(
+                points, vertex_offsets[filled], axis=0
+            )
+        edge_offsets = np.concatenate([[0], np.cumsum(edge_counts)]).astype(np.int64)
+        return cls(element_indices, ids, evenodd, boxes, edges, edge_offsets, tolerance)
+
+    @property
+    def tolerance(self) -> float:
+        """Get the tolerance the curves and arcs were flattened with."""
+        return self._tolerance
+
+    @property
+    def element_indices(self) -> np.ndarray:
+        """Get the document order indices of the indexed elements."""
+        return self._element_indices
+
+    @property
+    def ids(self) -> List[Optional[str]]:
+        """Get the id attributes of the indexed elements (None without id)."""
+        return self._ids
+
+    def query(self, points: np.ndarray, fill_rule: Optional[str] = None) -> np.ndarray:
+        """Find the topmost element containing each point.
+
+        Elements are tested from the last in document order (painted on
+        top) to the first; every point is resolved by the first element
+        containing it.
+
+        Args:
+            points: Array of shape (P, 2) with points in the root coordinate
+                system.
+            fill_rule: 'nonzero' or 'evenodd' for all elements. Defaults to
+                None (the inherited fill-rule of every element).
+
+        Returns:
+            Integer array of shape (P,) with the index of the containing
+            element into ids and element_indices, or -1.
+
+        Raises:
+            ValueError: If points do not have shape (P, 2) or fill_rule is
+                unknown.
+        """
+        points = np.asarray(points, dtype=float)
+        if points.ndim != 2 or points.shape[1] != 2:
+            raise ValueError(f'points must have shape (P, 2), got {points.shape}.')
+        if fill_rule is not None and fill_rule not in FILL_RULES:
+            raise ValueError(f'Unknown fill rule: {fill_rule}')
+
+        result = np.full(len(points), -1, dtype=np.int64)
+        if len(points) == 0 or len(self._boxes) == 0:
+            return result
+
+        # Points sorted by x, so the candidates of a box are one slice of the order
+        order = np.argsort(points[:, 0], kind='stable')
+        sorted_x = points[order, 0]
+        with np.errstate(invalid='ignore'):
+            lower = np.searchsorted(sorted_x, self._boxes[:, 0], side='left')
+            upper = np.searchsorted(sorted_x, self._boxes[:, 2], side='right')
+        unresolved = len(points)
+        for row in np.flatnonzero(upper > lower)[::-1].tolist():
+            candidates = order[lower[row]:upper[row]]
+            y = points[candidates, 1]
+            x0, y0, x1, y1 = self._boxes[row]
+            candidates = candidates[(y >= y0) & (y <= y1) & (result[candidates] < 0)]
+            if len(candidates) == 0:
+                continue
+
+            edges = self._edges[self._edge_offsets[row]:self._edge_offsets[row + 1]]
+            winding = _winding_numbers(points[candidates], edges)
+            evenodd = (
+                self._evenodd[row] if fill_rule is None else fill_rule == 'evenodd'
+            )
+            inside = winding % 2 == 1 if evenodd else winding != 0
+            result[candidates[inside]] = row
+            unresolved -= int(np.count_nonzero(inside))
+            if unresolved == 0:
+                break
+        return result
+
+
+def _winding_numbers(points: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Compute the winding numbers of points around closed polygon edges."""
+    winding = np.zeros(len(points), dtype=np.int64)
+    if len(edges) == 0:
+        return winding
+    x0, y0, x1, y1 = edges.T
+    chunk = max(1, _MAX_PAIRS // len(edges))
+    for start in range(0, len(points), chunk):
+        px = points[start:start + chunk, :1]
+        py = points[start:start + chunk, 1:]
+        side = (x1 - x0) * (py - y0) - (px - x0) * (y1 - y0)
+        upward = (y0 <= py) & (y1 > py) & (side > 0)
+        downward = (y0 > py) & (y1 <= py) & (side < 0)
+        winding[start:start + chunk] = upward.sum(axis=1) - downward.sum(axis=1)
+    return winding
+
+
+def _subpath_vertices(
+    codes: np.ndarray, points: np.ndarray, offsets: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the vertices of flattened path arrays and flags marking subpath starts.
+
+    A command following Z without a move starts a new subpath at the start
+    point of the closed one, which is inserted as an extra vertex.
+    """
+    counts = np.diff(offsets)
+    point_codes = np.repeat(codes, counts)
+    is_start = point_codes == COMMAND_CODES['M']
+    if len(points):
+        is_start[0] = True
+
+    closed = np.flatnonzero(codes[:-1] == COMMAND_CODES['Z']) + 1
+    reopened = closed[(codes[closed] != COMMAND_CODES['M']) & (counts[closed] > 0)]
+    if len(reopened) == 0:
+        return points, is_start
+
+    positions = offsets[reopened]
+    subpath_starts = np.maximum.accumulate(
+        np.where(is_start, np.arange(len(points)), 0)
+    )
+    points = np.insert(points, positions, points[subpath_starts[positions - 1]], axis=0)
+    is_start = np.insert(is_start, positions, True)
+    return points, is_start
+
+
+def _hidden_elements(root: ElementBase) -> Set[ElementBase]:
+    """Get the elements inside referenced containers or with display none."""
+    hidden: Set[ElementBase] = set()
+    for element in root.iter(etree.Element):
+        if (
+            element.getparent() in hidden
+            or etree.QName(element).localname in REFERENCED_CONTAINERS
+            or element.get('display') == 'none'
+            or _DISPLAY_NONE_RE.search(element.get('style', ''))
+        ):
+            hidden.add(element)
+    return hidden
+
+
+def _fill_rule(element: ElementBase) -> str:
+    """Resolve the inherited fill rule of an element (nonzero by default)."""
+    for ancestor in [element, *element.iterancestors()]:
+        match = _FILL_RULE_RE.search(ancestor.get('style', ''))
+        value = match.group('value').strip() if match else ancestor.get('fill-rule')
+        if value in FILL_RULES:
+            return value
+    return 'nonzero'
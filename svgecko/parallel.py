@@ -0,0 +1,86 @@
+"""Multi-process transformation of coordinate arrays through shared memory."""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from svgecko.transformations import transform_points
+
+TransformationFunction = Callable[[Tuple[float, float]], Tuple[float, float]]
+
+
+def transform_points_shared(
+    points: np.ndarray,
+    transformation: TransformationFunction,
+    processes: Optional[int] = None
+) -> np.ndarray:
+    """Transform an array of points in parallel worker processes.
+
+    The points are copied once into a multiprocessing.shared_memory block.
+    Every worker attaches to the block and transforms a disjoint slice in
+    place, so no coordinates are pickled between the processes; only the
+    transformation itself is sent to each worker.
+
+    Args:
+        points: Array of shape (N, 2).
+        transformation: The transformation to apply. Must be picklable.
+            Vectorized transformations (see transformations.transform_points)
+            process each slice at once.
+        processes: Number of worker processes. Defaults to the CPU count.
+
+    Returns:
+        Array of shape (N, 2) with the transformed points.
+    """
+    points = np.ascontiguousarray(points, dtype=float).reshape(-1, 2)
+    if len(points) == 0:
+        return np.empty((0, 2))
+
+    processes = max(1, min(processes or os.cpu_count() or 1, len(points)))
+    block = shared_memory.SharedMemory(create=True, size=points.nbytes)
+    try:
+        buffer = np.ndarray(points.shape, dtype=float, buffer=block.buf)
+        buffer[:] = points
+        bounds = np.linspace(0, len(points), processes + 1).astype(int).tolist()
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [
+                executor.submit(
+                    _transform_shared_slice,
+                    block.name,
+                    points.shape,
+                    start,
+                    stop,
+                    transformation,
+                )
+                for start, stop in zip(bounds[:-1], bounds[1:])
+                if stop > start
+            ]
+            for future in futures:
+                future.result()
+        result: np.ndarray = buffer.copy()
+        del buffer
+    finally:
+        block.close()
+        block.unlink()
+    return result
+
+
+def _transform_shared_slice(
+    name: str,
+    shape: Tuple[int, int],
+    start: int,
+    stop: int,
+    transformation: TransformationFunction
+) -> None:
+    """Worker task transforming points[start:stop] of a shared memory block in place."""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        buffer = np.ndarray(shape, dtype=float, buffer=block.buf)
+        buffer[start:stop] = transform_points(transformation, buffer[start:stop])
+        del buffer
+    finally:
+        block.close()
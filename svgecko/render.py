@@ -0,0 +1,664 @@
+"""Tiled rasterization of large SVG documents in a process pool."""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from copy import deepcopy
+from io import BytesIO
+import math
+import re
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from lxml import etree
+from lxml.etree import ElementBase
+
+from svgecko.svg_path import Path, parse_numbers
+from svgecko.transformations import AffineTransform, local_transform
+
+TileBox = Tuple[int, int, int, int]
+
+DEFAULT_TILE_SIZE = 1024
+# Extra pixels around element bounding boxes covering antialiasing and joins
+DEFAULT_CULL_MARGIN = 2.0
+# How cull_elements treats elements outside the viewport
+CULL_MODES = ('remove', 'hide')
+# Containers whose content is only rendered through references
+REFERENCED_CONTAINERS = {
+    'defs',
+    'clipPath',
+    'mask',
+    'pattern',
+    'symbol',
+    'marker',
+    'linearGradient',
+    'radialGradient',
+}
+
+_SVG_NAMESPACE = 'http://www.w3.org/2000/svg'
+_XLINK_NAMESPACE = 'http://www.w3.org/1999/xlink'
+# Presentation attributes that paint outside the geometry of an element
+_UNBOUNDED_PAINT_RE = re.compile(r'\b(?:filter|marker(?:-start|-mid|-end)?)\s*:')
+_STROKE_WIDTH_RE = re.compile(r'(?:^|;)\s*stroke-width\s*:\s*(?P<value>[^;]*)')
+_URL_REFERENCE_RE = re.compile(r'url\(\s*[\'"]?#(?P<id>[^\'")\s]+)')
+
+_worker_document: Optional[ElementBase] = None
+_worker_boxes: Optional[np.ndarray] = None
+_worker_size: Tuple[int, int] = (0, 0)
+
+
+def render_tiled(
+    svg: Any,
+    scale: float = 1.0,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    max_workers: Optional[int] = None,
+    cull: bool = True,
+    out: Optional[np.ndarray] = None,
+    **render_kwargs: Any
+) -> np.ndarray:
+    """Render an SVG into an RGBA array tile by tile in a process pool.
+
+    Args:
+        svg: The SVG object to render.
+        scale: Scale factor of the rendering. Defaults to 1.0.
+        tile_size: Edge length of the square tiles in pixels.
+        max_workers: Number of worker processes. Defaults to the CPU count.
+        cull: If True, elements whose bounding box lies outside a tile are
+            removed before the tile is rendered. Defaults to True.
+        out: Optional preallocated uint8 array of shape (height, width, 4),
+            e.g. a numpy.memmap for renders larger than memory.
+        **render_kwargs: Additional arguments passed to cairosvg.svg2png
+            for every tile (e.g., background_color).
+
+    Returns:
+        The stitched RGBA image as an array of shape (height, width, 4).
+
+    Raises:
+        ValueError: If out has the wrong shape.
+        ModuleNotFoundError: If cairosvg is not installed.
+    """
+    width, height = output_size(svg, scale)
+    if out is None:
+        out = np.zeros((height, width, 4), dtype=np.uint8)
+    elif out.shape != (height, width, 4):
+        raise ValueError(f'out must have shape {(height, width, 4)}, got {out.shape}.')
+
+    for (x0, y0, x1, y1), tile in render_tiles(
+        svg, scale, tile_size, max_workers, cull, **render_kwargs
+    ):
+        out[y0:y1, x0:x1] = tile
+    return out
+
+
+def render_tiles(
+    svg: Any,
+    scale: float = 1.0,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    max_workers: Optional[int] = None,
+    cull: bool = True,
+    **render_kwargs: Any
+) -> Iterator[Tuple[TileBox, np.ndarray]]:
+    """Render an SVG tile by tile, yielding tiles as they are finished.
+
+    The document is sent to every worker once. Each tile is rendered from a
+    copy of the document nested into an outer SVG whose viewBox is the
+    tile, so the tiles line up pixel-exactly with a full rendering.
+
+    Args:
+        svg: The SVG object to render.
+        scale: Scale factor of the rendering. Defaults to 1.0.
+        tile_size: Edge length of the square tiles in pixels.
+        max_workers: Number of worker processes. Defaults to the CPU count.
+        cull: If True, elements whose bounding box lies outside a tile are
+            removed before the tile is rendered. Defaults to True.
+        **render_kwargs: Additional arguments passed to cairosvg.svg2png.
+
+    Yields:
+        ((x0, y0, x1, y1), tile) pairs in completion order, where the box is
+        in output pixels and tile is a uint8 array of shape
+        (y1 - y0, x1 - x0, 4).
+
+    Raises:
+        ValueError: If tile_size is not positive.
+        ModuleNotFoundError: If cairosvg is not installed.
+    """
+    if tile_size < 1:
+        raise ValueError('tile_size must be positive.')
+
+    width, height = output_size(svg, scale)
+    boxes = element_bounding_boxes(svg._xml, width, height) if cull else None
+    initargs = (svg._to_bytes(), boxes, (width, height))
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_initialize_worker, initargs=initargs
+    ) as executor:
+        futures = {
+            executor.submit(_render_tile, box, render_kwargs): box
+            for box in tile_boxes(width, height, tile_size)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def output_size(svg: Any, scale: float = 1.0) -> Tuple[int, int]:
+    """Get the size of a rendering in pixels.
+
+    Args:
+        svg: The SVG object.
+        scale: Scale factor of the rendering.
+
+    Returns:
+        (width, height) in pixels.
+
+    Raises:
+        ValueError: If the document size cannot be resolved.
+    """
+    width, height = svg.shape
+    return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+
+def tile_boxes(width: int, height: int, tile_size: int) -> List[TileBox]:
+    """Split an image into tiles.
+
+    Args:
+        width: Image width in pixels.
+        height: Image height in pixels.
+        tile_size: Edge length of the tiles; tiles at the right and bottom
+            edges are smaller.
+
+    Returns:
+        (x0, y0, x1, y1) boxes in row-major order.
+    """
+    return [
+        (x0, y0, min(x0 + tile_size, width), min(y0 + tile_size, height))
+        for y0 in range(0, height, tile_size)
+        for x0 in range(0, width, tile_size)
+    ]
+
+
+def viewport_transform(
+    root: ElementBase, width: float, height: float
+) -> AffineTransform:
+    """Get the transformation from root user units to output pixels.
+
+    Applies the root viewBox and preserveAspectRatio for a rendering of
+    width x height pixels.
+
+    Args:
+        root: Root element of the document.
+        width: Output width in pixels.
+        height: Output height in pixels.
+
+    Returns:
+        The viewport transformation.
+    """
+    view_box = parse_numbers(root.get('viewBox', ''))
+    if len(view_box) != 4 or view_box[2] <= 0 or view_box[3] <= 0:
+        document_width = _length(root.get('width')) or width
+        document_height = _length(root.get('height')) or height
+        return AffineTransform.scaling(width / document_width, height / document_height)
+
+    view_x, view_y, view_width, view_height = view_box
+    scale_x, scale_y = width / view_width, height / view_height
+    aspect = root.get('preserveAspectRatio', 'xMidYMid meet').split()
+    if aspect[0] == 'none':
+        return AffineTransform(
+            scale_x, 0, 0, scale_y, -view_x * scale_x, -view_y * scale_y
+        )
+
+    scale = max(scale_x, scale_y) if aspect[-1] == 'slice' else min(scale_x, scale_y)
+    align = {'Min': 0.0, 'Mid': 0.5, 'Max': 1.0}
+    offset_x = (width - view_width * scale) * align.get(aspect[0][1:4], 0.5)
+    offset_y = (height - view_height * scale) * align.get(aspect[0][5:8], 0.5)
+    return AffineTransform(
+        scale, 0, 0, scale, offset_x - view_x * scale, offset_y - view_y * scale
+    )
+
+
+def viewport_ctms(
+    root: ElementBase,
+    width: Optional[float] = None,
+    height: Optional[float] = None
+) -> Dict[ElementBase, AffineTransform]:
+    """Compute the CTMs of all elements, including nested <svg> viewports.
+
+    Like compute_ctms, but content of nested <svg> elements is also mapped
+    through their x/y position and viewBox. Percentage positions and sizes
+    resolve against the enclosing viewport; a nested viewport of unresolved
+    size contributes only its position.
+
+    Args:
+        root: Root element of the document.
+        width: Width of the root viewport in user units. Defaults to the
+            root viewBox or width attribute.
+        height: Height of the root viewport in user units. Defaults to the
+            root viewBox or height attribute.
+
+    Returns:
+        Mapping from element to the transformation from the element's
+        coordinate system to the root coordinate system.
+    """
+    if width is None:
+        width = _length(root.get('width'))
+    if height is None:
+        height = _length(root.get('height'))
+    ctms: Dict[ElementBase, AffineTransform] = {root: local_transform(root)}
+    viewports = {root: _viewport_size(root, width, height)}
+    for element in root.iter(etree.Element):
+        parent = element.getparent()
+        if parent is None:
+            continue
+        ctm = ctms[parent]
+        style = element.get('style', '')
+        if 'transform' in element.attrib or 'transform' in style:
+            ctm = ctm @ local_transform(element)
+        viewport = viewports[parent]
+        if etree.QName(element).localname == 'svg':
+            outer_width, outer_height = viewport
+            x = _viewport_length(element.get('x'), outer_width) or 0.0
+            y = _viewport_length(element.get('y'), outer_height) or 0.0
+            ctm = ctm @ AffineTransform.translation(x, y)
+            inner_width = _viewport_length(element.get('width', '100%'), outer_width)
+            inner_height = _viewport_length(element.get('height', '100%'), outer_height)
+            if inner_width and inner_height and min(inner_width, inner_height) > 0:
+                ctm = ctm @ viewport_transform(element, inner_width, inner_height)
+            viewport = _viewport_size(element, inner_width, inner_height)
+        ctms[element] = ctm
+        viewports[element] = viewport
+    return ctms
+
+
+def element_bounding_boxes(
+    root: ElementBase,
+    width: float,
+    height: float,
+    margin: float = DEFAULT_CULL_MARGIN
+) -> np.ndarray:
+    """Compute conservative pixel bounding boxes of all geometry elements.
+
+    Boxes are computed from path control points, shape extents and polygon
+    points, mapped through every element's CTM (including nested <svg>
+    viewports) and the viewport transformation and widened by half the
+    stroke width and margin pixels.
+    Elements that cannot be culled safely (containers, text, images, uses,
+    content of referenced containers, elements referenced by id and
+    elements with filters or markers) get NaN boxes.
+
+    Args:
+        root: Root element of the document.
+        width: Output width in pixels.
+        height: Output height in pixels.
+        margin: Extra pixels added around every box.
+
+    Returns:
+        Array of shape (N, 4) with (x0, y0, x1, y1) per element in the
+        order of root.iter(etree.Element).
+    """
+    viewport = viewport_transform(root, width, height)
+    ctms = viewport_ctms(
+        root,
+        _length(root.get('width')) or width,
+        _length(root.get('height')) or height
+    )
+    elements = list(root.iter(etree.Element))
+    referenced = referenced_ids(root)
+    boxes = np.full((len(elements), 4), np.nan)
+    uncullable: Set[ElementBase] = set()
+    for index, element in enumerate(elements):
+        parent = element.getparent()
+        name = etree.QName(element).localname
+        if (
+            parent in uncullable
+            or name in REFERENCED_CONTAINERS
+            or element.get('id') in referenced
+            or _UNBOUNDED_PAINT_RE.search(_presentation(element))
+        ):
+            uncullable.add(element)
+            continue
+
+        points = _geometry_points(element, name)
+        if points is None or len(points) == 0:
+            continue
+        transformation = viewport @ ctms[element]
+        transformed = transformation.transform_points(points)
+        if not np.all(np.isfinite(transformed)):
+            continue
+        stroke = stroke_width(element) * max(transformation.scale_factors) / 2.0
+        boxes[index, :2] = transformed.min(axis=0) - stroke - margin
+        boxes[index, 2:] = transformed.max(axis=0) + stroke + margin
+    return boxes
+
+
+def stroke_width(element: ElementBase) -> float:
+    """Resolve the inherited stroke width of an element.
+
+    Args:
+        element: The element.
+
+    Returns:
+        The stroke width in user units of the element; 1 if it is not set
+        or cannot be resolved (e.g., percentages).
+    """
+    for ancestor in [element, *element.iterancestors()]:
+        match = _STROKE_WIDTH_RE.search(ancestor.get('style', ''))
+        value = match.group('value') if match else ancestor.get('stroke-width')
+        if value is not None:
+            width = _length(value)
+            return 1.0 if width is None else abs(width)
+    return 1.0
+
+
+def referenced_ids(root: ElementBase) -> Set[str]:
+    """Collect the ids referenced within a document.
+
+    Args:
+        root: Root element of the document.
+
+    Returns:
+        The ids referenced by href attributes (e.g., of <use> or
+        <textPath>), url(#id) values and style sheets.
+    """
+    ids: Set[str] = set()
+    for element in root.iter(etree.Element):
+        for name, value in element.attrib.items():
+            if name.endswith('href') and value.startswith('#'):
+                ids.add(value[1:])
+            elif 'url(' in value:
+                ids.update(
+                    match.group('id') for match in _URL_REFERENCE_RE.finditer(value)
+                )
+        if etree.QName(element).localname == 'style' and element.text:
+            ids.update(
+                match.group('id') for match in _URL_REFERENCE_RE.finditer(element.text)
+            )
+    return ids
+
+
+def tile_document(
+    document: ElementBase,
+    size: Tuple[int, int],
+    box: TileBox,
+    boxes: Optional[np.ndarray] = None
+) -> ElementBase:
+    """Build the document rendering one tile of a full rendering.
+
+    Args:
+        document: Root element of the document.
+        size: (width, height) of the full rendering in pixels.
+        box: (x0, y0, x1, y1) of the tile in pixels.
+        boxes: Optional element boxes from element_bounding_boxes; elements
+            whose box does not intersect the tile are removed.
+
+    Returns:
+        Root element of the tile document.
+    """
+    x0, y0, x1, y1 = box
+    inner = deepcopy(document)
+    inner.set('width', str(size[0]))
+    inner.set('height', str(size[1]))
+    for name in ('x', 'y'):
+        inner.attrib.pop(name, None)
+
+    # Without a viewBox the document would be drawn unscaled at the new size
+    view_box = parse_numbers(document.get('viewBox', ''))
+    if len(view_box) != 4 or view_box[2] <= 0 or view_box[3] <= 0:
+        width = _length(document.get('width'))
+        height = _length(document.get('height'))
+        if width and height and width > 0 and height > 0:
+            inner.set('viewBox', f'0 0 {width} {height}')
+            inner.set('preserveAspectRatio', 'none')
+
+    if boxes is not None:
+        elements = list(inner.iter(etree.Element))
+        for index in np.flatnonzero(_outside(boxes, box)).tolist():
+            element = elements[index]
+            parent = element.getparent()
+            if parent is not None:
+                parent.remove(element)
+
+    outer = etree.Element(
+        f'{{{_SVG_NAMESPACE}}}svg',
+        nsmap={None: _SVG_NAMESPACE, 'xlink': _XLINK_NAMESPACE},
+    )
+    outer.set('width', str(x1 - x0))
+    outer.set('height', str(y1 - y0))
+    outer.set('viewBox', f'{x0} {y0} {x1 - x0} {y1 - y0}')
+    outer.append(inner)
+    return outer
+
+
+def cull_elements(
+    root: ElementBase,
+    width: float,
+    height: float,
+    margin: float = DEFAULT_CULL_MARGIN,
+    mode: str = 'remove'
+) -> int:
+    """Remove or hide the elements of a document that lie outside its viewport.
+
+    Elements are culled if their box from element_bounding_boxes does not
+    intersect a width x height pixel rendering. Elements that cannot be
+    culled safely get no box and are kept, as are elements referenced by
+    id (through href or url(#id)), which may be drawn elsewhere.
+
+    Args:
+        root: Root element of the document, modified in place.
+        width: Output width in pixels.
+        height: Output height in pixels.
+        margin: Extra pixels added around every element box.
+        mode: 'remove' to remove the elements, 'hide' to set
+            display="none" on them. Defaults to 'remove'.
+
+    Returns:
+        The number of culled elements.
+
+    Raises:
+        ValueError: If mode is unknown.
+    """
+    if mode not in CULL_MODES:
+        raise ValueError(f'Unknown cull mode: {mode}')
+
+    boxes = element_bounding_boxes(root, width, height, margin)
+    elements = list(root.iter(etree.Element))
+    culled = 0
+    for index in np.flatnonzero(_outside(boxes, (0, 0, width, height))).tolist():
+        element = elements[index]
+        parent = element.getparent()
+        if parent is None:
+            continue
+        if mode == 'hide':
+            element.set('display', 'none')
+        else:
+            parent.remove(element)
+        culled += 1
+    return culled
+
+
+def rasterize_into(document: bytes, out: np.ndarray) -> None:
+    """Rasterize SVG bytes directly into a uint8 array.
+
+    The document is drawn on a cairo image surface of the size of out and
+    its pixels are converted in place, without PNG encoding or PIL images.
+
+    Args:
+        document: The serialized SVG document.
+        out: Array of shape (height, width, 4) receiving RGBA pixels, or of
+            shape (height, width, 3) receiving RGB pixels composited onto a
+            white background.
+
+    Raises:
+        ValueError: If out does not have 3 or 4 channels.
+        ModuleNotFoundError: If cairosvg is not installed.
+    """
+    if out.ndim != 3 or out.shape[2] not in (3, 4):
+        raise ValueError(
+            f'out must have shape (height, width, 3 or 4), got {out.shape}.'
+        )
+    try:
+        from cairosvg.parser import Tree
+        from cairosvg.surface import PNGSurface
+    except ModuleNotFoundError as exc:
+        raise ModuleNotFoundError(
+            "cairosvg is required for rendering SVGs. Install it via pip."
+        ) from exc
+
+    height, width, channels = out.shape
+    surface = PNGSurface(
+        Tree(bytestring=document), None, 96, output_width=width, output_height=height
+    ).cairo
+    surface.flush()
+    rows = min(height, surface.get_height())
+    columns = min(width, surface.get_width())
+    data = np.frombuffer(surface.get_data(), dtype=np.uint8).reshape(
+        -1, surface.get_stride()
+    )
+    # Cairo stores premultiplied BGRA in native (little-endian) byte order
+    pixels = data[:rows, :4 * columns].reshape(rows, columns, 4)
+    premultiplied = pixels[:, :, 2::-1].astype(np.uint16)
+    alpha = pixels[:, :, 3:].astype(np.uint16)
+    if channels == 3:
+        rgb = premultiplied + (255 - alpha)
+    else:
+        rgb = (premultiplied * 255 + alpha // 2) // np.maximum(alpha, 1)
+        out[:rows, :columns, 3] = pixels[:, :, 3]
+    out[:rows, :columns, :3] = rgb
+    out[rows:] = 0
+    out[:rows, columns:] = 0
+
+
+def _render_rgba(document: bytes, **render_kwargs: Any) -> np.ndarray:
+    """Rasterize SVG bytes with cairosvg into an RGBA array."""
+    try:
+        from cairosvg import svg2png
+    except ModuleNotFoundError as exc:
+        raise ModuleNotFoundError(
+            "cairosvg is required for rendering SVGs. Install it via pip."
+        ) from exc
+    from PIL import Image
+
+    buffer = BytesIO()
+    svg2png(bytestring=document, write_to=buffer, **render_kwargs)
+    buffer.seek(0)
+    return np.asarray(Image.open(buffer).convert('RGBA'))
+
+
+def _initialize_worker(
+    document: bytes, boxes: Optional[np.ndarray], size: Tuple[int, int]
+) -> None:
+    """Parse the document once per worker process."""
+    global _worker_document, _worker_boxes, _worker_size
+    _worker_document = etree.fromstring(document)
+    _worker_boxes = boxes
+    _worker_size = size
+
+
+def _render_tile(box: TileBox, render_kwargs: Dict[str, Any]) -> np.ndarray:
+    """Worker task rendering one tile."""
+    tile = tile_document(_worker_document, _worker_size, box, _worker_boxes)
+    return _render_rgba(etree.tostring(tile), **render_kwargs)
+
+
+def _outside(boxes: np.ndarray, box: Tuple[float, float, float, float]) -> np.ndarray:
+    """Get the mask of element boxes that do not intersect a box (never for NaN)."""
+    x0, y0, x1, y1 = box
+    return (
+        (boxes[:, 2] < x0)
+        | (boxes[:, 0] > x1)
+        | (boxes[:, 3] < y0)
+        | (boxes[:, 1] > y1)
+    )
+
+
+def _geometry_points(element: ElementBase, name: str) -> Optional[np.ndarray]:
+    """Get points whose convex hull contains the geometry of an element."""
+    attributes = element.attrib
+    if name == 'path' and 'd' in attributes:
+        try:
+            commands = (
+                Path.from_command_string(attributes['d'])._to_absolute()._commands
+            )
+        except ValueError:
+            return None
+        coordinates = [value for command in commands for value in command.coordinates]
+        return np.array(coordinates, dtype=float).reshape(-1, 2)
+    if name in ('polygon', 'polyline'):
+        numbers = parse_numbers(attributes.get('points', ''))
+        return np.array(
+            numbers[: len(numbers) - len(numbers) % 2], dtype=float
+        ).reshape(-1, 2)
+    if name == 'line':
+        x1, y1, x2, y2 = (
+            _length(attributes.get(key)) or 0.0 for key in ('x1', 'y1', 'x2', 'y2')
+        )
+        return np.array([[x1, y1], [x2, y2]])
+    if name == 'rect':
+        x, y = _length(attributes.get('x')) or 0.0, _length(attributes.get('y')) or 0.0
+        width, height = _length(attributes.get('width')), _length(
+            attributes.get('height')
+        )
+        if width is None or height is None:
+            return None
+        return np.array(
+            [[x, y], [x + width, y], [x, y + height], [x + width, y + height]]
+        )
+    if name in ('circle', 'ellipse'):
+        cx, cy = (
+            _length(attributes.get('cx')) or 0.0,
+            _length(attributes.get('cy')) or 0.0,
+        )
+        if name == 'circle':
+            rx = ry = _length(attributes.get('r'))
+        else:
+            rx, ry = _length(attributes.get('rx')), _length(attributes.get('ry'))
+        if rx is None or ry is None:
+            return None
+        return np.array(
+            [
+                [cx - rx, cy - ry],
+                [cx + rx, cy - ry],
+                [cx - rx, cy + ry],
+                [cx + rx, cy + ry],
+            ]
+        )
+    return None
+
+
+def _presentation(element: ElementBase) -> str:
+    """Join the style and presentation attributes of an element as CSS."""
+    attributes = element.attrib
+    declarations = [
+        f'{name}:{value}' for name, value in attributes.items() if '}' not in name
+    ]
+    return ';'.join(declarations + [attributes.get('style', '')])
+
+
+def _viewport_length(
+    value: Optional[str],
+    reference: Optional[float]
+) -> Optional[float]:
+    """Parse a length, resolving percentages against a reference length."""
+    if value is None or '%' not in value:
+        return _length(value)
+    numbers = parse_numbers(value)
+    if reference is None or not numbers or math.isnan(numbers[0]):
+        return None
+    return numbers[0] / 100.0 * reference
+
+
+def _viewport_size(
+    element: ElementBase,
+    width: Optional[float],
+    height: Optional[float]
+) -> Tuple[Optional[float], Optional[float]]:
+    """Get the size of the user coordinate system an <svg> element establishes."""
+    view_box = parse_numbers(element.get('viewBox', ''))
+    if len(view_box) == 4 and view_box[2] > 0 and view_box[3] > 0:
+        return view_box[2], view_box[3]
+    return width, height
+
+
+def _length(value: Optional[str]) -> Optional[float]:
+    """Parse the leading number of a length value; percentages are not resolved."""
+    if value is None or '%' in value:
+        return None
+    numbers = parse_numbers(value)
+    return numbers[0] if numbers and not math.isnan(numbers[0]) else None
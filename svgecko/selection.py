@@ -0,0 +1,176 @@
+"""Selection of SVG subtrees by XPath, simple CSS selectors or element ids."""
+
+from __future__ import annotations
+
+import re
+from typing import List, Sequence, Union
+
+from lxml import etree
+from lxml.etree import ElementBase
+
+SVG_NAMESPACES = {
+    'svg': 'http://www.w3.org/2000/svg',
+    'xlink': 'http://www.w3.org/1999/xlink',
+}
+
+Selector = Union[str, Sequence[str]]
+
+_CSS_TOKEN_RE = re.compile(
+    r'''
+    (?P<combinator>\s*>\s*|\s+)
+    | (?P<tag>\*|[A-Za-z_][\w-]*)
+    | \#(?P<id>[\w-]+)
+    | \.(?P<class>[\w-]+)
+    | \[\s*(?P<attribute>[A-Za-z_][\w-]*)\s*
+        (?:=\s*(?:
+            "(?P<double_quoted>[^"]*)"
+            | '(?P<single_quoted>[^']*)'
+            | (?P<bare>[\w-]+)
+        )\s*)?\]
+    ''',
+    re.VERBOSE,
+)
+_XPATH_PREFIXES = ('/', './', '../', '(')
+
+
+def select_elements(root: ElementBase, select: Selector) -> List[ElementBase]:
+    """Find the roots of the subtrees matching a selector.
+
+    Strings starting with '/', './', '../' or '(' are evaluated as XPath with the
+    prefixes 'svg' and 'xlink' bound to the SVG and XLink namespaces. Other
+    strings are simple CSS selectors (see css_to_xpath). Any other sequence
+    is a list of element ids. Elements nested inside another selected
+    element are dropped, so every subtree is listed once. Like a missing id,
+    an XPath or CSS selector that matches nothing is an error rather than an
+    empty selection.
+
+    Args:
+        root: Root element of the document.
+        select: XPath, CSS selector or list of element ids.
+
+    Returns:
+        The selected elements in document order.
+
+    Raises:
+        ValueError: If the selector is invalid, does not select elements,
+            matches no element or an id does not exist.
+    """
+    if isinstance(select, str):
+        expression = (
+            select
+            if select.strip().startswith(_XPATH_PREFIXES)
+            else css_to_xpath(select)
+        )
+        try:
+            result = root.xpath(expression, namespaces=SVG_NAMESPACES)
+        except etree.XPathError as error:
+            raise ValueError(f'Invalid selector: {select}') from error
+        if not isinstance(result, list) or not all(
+            isinstance(item, etree._Element) for item in result
+        ):
+            raise ValueError(f'Selector does not select elements: {select}')
+        if not result:
+            raise ValueError(f'Selector matches no elements: {select}')
+        elements = result
+    else:
+        ids = set(select)
+        elements = [
+            element
+            for element in root.xpath('descendant-or-self::*[@id]')
+            if element.get('id') in ids
+        ]
+        missing = ids - {element.get('id') for element in elements}
+        if missing:
+            raise ValueError(f'No elements with ids: {sorted(missing)}')
+
+    selected = set(elements)
+    return [
+        element for element in elements
+        if not any(ancestor in selected for ancestor in element.iterancestors())
+    ]
+
+
+def css_to_xpath(selector: str) -> str:
+    """Translate a simple CSS selector into XPath.
+
+    Supported are type selectors (matched by local name, so no namespace
+    prefixes are needed), '*', #id, .class, [attribute] and
+    [attribute=value], the descendant (whitespace) and child (>)
+    combinators and comma-separated selector groups.
+
+    Args:
+        selector: The CSS selector.
+
+    Returns:
+        An XPath expression selecting the matching elements below and
+        including the context element.
+
+    Raises:
+        ValueError: If the selector uses unsupported syntax.
+    """
+    groups = []
+    for group in selector.split(','):
+        group = group.strip()
+        if not group:
+            raise ValueError(f'Invalid CSS selector: {selector}')
+
+        steps = 'descendant-or-self::'
+        conditions: List[str] = []
+        position = 0
+        while position < len(group):
+            match = _CSS_TOKEN_RE.match(group, position)
+            if match is None:
+                raise ValueError(f'Unsupported CSS selector: {selector}')
+            position = match.end()
+            if match.group('combinator') is not None:
+                steps += _xpath_step(conditions) + (
+                    '/' if '>' in match.group('combinator') else '//'
+                )
+                conditions = []
+            elif match.group('tag') is not None:
+                if match.group('tag') != '*':
+                    conditions.append(
+                        f"local-name()={_xpath_literal(match.group('tag'))}"
+                    )
+            elif match.group('id') is not None:
+                conditions.append(f"@id={_xpath_literal(match.group('id'))}")
+            elif match.group('class') is not None:
+                literal = _xpath_literal(' ' + match.group('class') + ' ')
+                conditions.append(
+                    f"contains(concat(' ', normalize-space(@class), ' '), {literal})"
+                )
+            else:
+                attribute = match.group('attribute')
+                value = next(
+                    (
+                        value
+                        for value in match.group(
+                            'double_quoted', 'single_quoted', 'bare'
+                        )
+                        if value is not None
+                    ),
+                    None,
+                )
+                conditions.append(
+                    f'@{attribute}'
+                    if value is None
+                    else f'@{attribute}={_xpath_literal(value)}'
+                )
+        groups.append(steps + _xpath_step(conditions))
+
+    return ' | '.join(groups)
+
+
+def _xpath_step(conditions: List[str]) -> str:
+    """Build an XPath step matching elements that satisfy all conditions."""
+    return '*' + ''.join(f'[{condition}]' for condition in conditions)
+
+
+def _xpath_literal(value: str) -> str:
+    """Quote a string as an XPath literal."""
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return 'concat(' + ", \"'\", ".join(f"'{part}'" for part in parts) + ')'
@@ -0,0 +1,98 @@
+"""Removal of non-rendering content such as editor data and metadata from SVGs."""
+
+from __future__ import annotations
+
+from typing import FrozenSet, Iterable, Optional, Union
+
+from lxml import etree
+from lxml.etree import ElementBase
+
+SLIM_CATEGORIES = ('comments', 'processing_instructions', 'metadata', 'editor')
+
+# Namespaces of editor-only elements and attributes (Inkscape, Illustrator, Sketch)
+EDITOR_NAMESPACES = (
+    'http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd',
+    'http://www.inkscape.org/namespaces/inkscape',
+    'http://ns.adobe.com/AdobeIllustrator/10.0/',
+    'http://ns.adobe.com/AdobeSVGViewerExtensions/3.0/',
+    'http://ns.adobe.com/Extensibility/1.0/',
+    'http://ns.adobe.com/Graphs/1.0/',
+    'http://ns.adobe.com/ImageReplacement/1.0/',
+    'http://ns.adobe.com/SaveForWeb/1.0/',
+    'http://ns.adobe.com/Variables/1.0/',
+    'http://www.bohemiancoding.com/sketch/ns',
+)
+
+SlimOption = Union[bool, Iterable[str]]
+
+_METADATA_TAG = '{http://www.w3.org/2000/svg}metadata'
+
+
+def slim_categories(slim: Optional[SlimOption]) -> FrozenSet[str]:
+    """Resolve a slim option into the categories of content to remove.
+
+    Args:
+        slim: True for all categories, False or None for none, or an
+            iterable of category names from SLIM_CATEGORIES:
+            'comments', 'processing_instructions', 'metadata' (<metadata>
+            elements including embedded RDF and thumbnails) and 'editor'
+            (elements and attributes in EDITOR_NAMESPACES).
+
+    Returns:
+        The set of category names.
+
+    Raises:
+        ValueError: If a category is unknown.
+    """
+    if slim is None or slim is False:
+        return frozenset()
+    if slim is True:
+        return frozenset(SLIM_CATEGORIES)
+    categories = frozenset([slim] if isinstance(slim, str) else slim)
+    unknown = categories.difference(SLIM_CATEGORIES)
+    if unknown:
+        raise ValueError(f'Unknown slim categories: {sorted(unknown)}')
+    return categories
+
+
+def slim_parser(
+    categories: FrozenSet[str], encoding: Optional[str] = None
+) -> etree.XMLParser:
+    """Create a parser that drops comments and processing instructions while parsing.
+
+    Args:
+        categories: Categories of content to remove (see slim_categories).
+        encoding: Optional character encoding of the input.
+
+    Returns:
+        The XML parser.
+    """
+    return etree.XMLParser(
+        encoding=encoding,
+        remove_comments='comments' in categories,
+        remove_pis='processing_instructions' in categories,
+    )
+
+
+def strip_non_rendering(root: ElementBase, categories: FrozenSet[str]) -> None:
+    """Remove metadata and editor content from a parsed document in place.
+
+    Comments and processing instructions are removed by slim_parser during
+    parsing. Namespace declarations that are no longer used are dropped.
+
+    Args:
+        root: Root element of the document.
+        categories: Categories of content to remove (see slim_categories).
+    """
+    tags = []
+    if 'metadata' in categories:
+        tags.append(_METADATA_TAG)
+    if 'editor' in categories:
+        tags.extend(f'{{{namespace}}}*' for namespace in EDITOR_NAMESPACES)
+        etree.strip_attributes(
+            root, *[f'{{{namespace}}}*' for namespace in EDITOR_NAMESPACES]
+        )
+    if not tags:
+        return
+    etree.strip_elements(root, *tags, with_tail=False)
+    etree.cleanup_namespaces(root)
@@ -3,15 +3,74 @@
 from __future__ import annotations
 
 from copy import deepcopy
+import gzip
 from io import BytesIO
+import math
 import re
-from typing import Callable, Dict, Optional, Tuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
+import numpy as np
 from PIL import Image
 from lxml import etree
 from lxml.etree import ElementBase
 
-from svgecko.svg_path import parse_numbers, transform_path_command_string
+from svgecko.cache import TransformCache
+from svgecko.coordinates import (
+    COORDINATE_ATTRIBUTE_PAIRS,
+    DocumentCoordinates,
+    GeometryArrays,
+    apply_geometry_arrays,
+    geometry_arrays,
+)
+from svgecko.geometry import DEFAULT_ARC_TOLERANCE, simplify_polyline
+from svgecko.geometry_cache import GeometryCache
+from svgecko.hit_test import HitTestIndex
+from svgecko.parallel import transform_points_shared
+from svgecko.render import (
+    CULL_MODES,
+    DEFAULT_CULL_MARGIN,
+    cull_elements,
+    referenced_ids,
+    render_tiled,
+    stroke_width,
+)
+from svgecko.selection import Selector, select_elements
+from svgecko.slim import SlimOption, slim_categories, slim_parser, strip_non_rendering
+from svgecko.svg_path import Path, parse_numbers, transform_path_command_string
+from svgecko.transformations import (
+    AffineTransform,
+    chain_transformations,
+    compute_ctms,
+    is_vectorized,
+    remove_style_transform,
+    transform_points,
+    transform_translate_functions,
+)
+
+_GZIP_MAGIC = b'\x1f\x8b'
+_SVG_NAMESPACE = 'http://www.w3.org/2000/svg'
+_XLINK_NAMESPACE = 'http://www.w3.org/1999/xlink'
+# Text marking the insertion point of the next chunk in iter_transform
+_CHUNK_MARKER = 'svgecko-chunk-marker'
+_GEOMETRY_TAGS = ['path', 'polygon', 'polyline', 'rect', 'circle', 'ellipse', 'line']
+_URL_REFERENCE_RE = re.compile(r'url\(\s*#(?P<id>[^)\s]+)\s*\)')
+# Elements whose rendering cannot be rotated, skewed or mirrored through attributes
+_RESIDUAL_TRANSFORM_TAGS = {'use', 'image', 'text', 'foreignObject', 'svg'}
+_STROKE_WIDTH_DECLARATION_RE = re.compile(
+    r'(?P<name>(?:^|;)\s*stroke-width\s*:\s*)[^;]*'
+)
 
 
 class SVG:
@@ -24,6 +83,13 @@ class SVG:
     Attributes:
         xml: The underlying XML element tree representation of the SVG.
     
+    Serialized bytes are cached, so repeated to_string, to_file, pickling
+    and rendering of an unchanged document serialize it only once. The
+    cache is invalidated by transform(inplace=True), bake_transforms
+    (inplace=True), add and every access of the xml property, since the
+    returned tree may be modified. Call invalidate_cache() after modifying
+    a previously obtained tree.
+    
     Example:
         >>> svg = SVG.from_file('example.svg')
         >>> transformation = lambda point: (point[0] + 1, point[1] + 1)
@@ -38,40 +104,81 @@ class SVG:
             xml: The XML element tree representing the SVG.
         """
         self._xml = xml
+        self._serialized: Dict[str, bytes] = {}
+        self._source_path: Optional[str] = None
+        self._geometry_cache: Optional[GeometryCache] = None
+        self._hit_test_index: Optional[HitTestIndex] = None
 
     @property
     def xml(self) -> ElementBase:
         """Get the underlying XML element tree.
         
+        The caller may modify the returned tree, so the serialization cache
+        is invalidated.
+        
         Returns:
             The XML element tree representation of the SVG.
         """
+        self.invalidate_cache()
         return self._xml
 
+    def invalidate_cache(self) -> None:
+        """Drop the cached serialization after the XML tree was modified."""
+        self._serialized.clear()
+        self._hit_test_index = None
+
     @classmethod
-    def from_string(cls, svg_string: str, encoding: str = 'utf-8') -> SVG:
+    def from_string(
+        cls, svg_string: str, encoding: str = 'utf-8', slim: SlimOption = False
+    ) -> SVG:
         """Parse an SVG string and return an SVG object.
         
         Args:
             svg_string: SVG string in XML format.
             encoding: Character encoding of the SVG string. Defaults to 'utf-8'.
+            slim: If True, content that does not affect rendering is dropped
+                while loading: comments, processing instructions, <metadata>
+                and editor namespaces (sodipodi, inkscape, Illustrator,
+                Sketch). An iterable of category names from
+                slim.SLIM_CATEGORIES removes only those. Defaults to False.
             
         Returns:
             An SVG object representing the parsed SVG.
             
         Raises:
             etree.XMLSyntaxError: If the SVG string is not valid XML.
+            ValueError: If a slim category is unknown.
         """
-        svg_tree = etree.fromstring(bytes(svg_string, encoding=encoding))
+        categories = slim_categories(slim)
+        svg_tree = etree.fromstring(
+            bytes(svg_string, encoding=encoding), slim_parser(categories)
+        )
+        strip_non_rendering(svg_tree, categories)
         return SVG(svg_tree)
 
     @classmethod
-    def from_file(cls, file_path: str, encoding: str = 'utf-8') -> SVG:
+    def from_file(
+        cls,
+        file_path: str,
+        encoding: str = 'utf-8',
+        slim: SlimOption = False,
+        geometry_cache: Optional[str] = None
+    ) -> SVG:
         """Parse an SVG file and return an SVG object.
         
+        Gzip-compressed files (SVGZ) are detected by their magic bytes and
+        decompressed while being streamed into the XML parser, without
+        holding the decompressed text in memory.
+        
         Args:
-            file_path: Path to the SVG file.
+            file_path: Path to the SVG or SVGZ file.
             encoding: Character encoding of the file. Defaults to 'utf-8'.
+            slim: Categories of non-rendering content to drop while loading
+                (see from_string). Defaults to False.
+            geometry_cache: Optional path of a file written by
+                save_geometry_cache. If it is still valid for the file, its
+                memory-mapped geometry is used instead of parsing path data
+                when transforming. Stale or missing caches are ignored.
             
         Returns:
             An SVG object representing the parsed SVG file.
@@ -79,10 +186,60 @@ class SVG:
         Raises:
             FileNotFoundError: If the file does not exist.
             etree.XMLSyntaxError: If the file contains invalid XML.
+            ValueError: If a slim category is unknown.
+        """
+        with open(file_path, 'rb') as file:
+            is_compressed = file.read(len(_GZIP_MAGIC)) == _GZIP_MAGIC
+
+        if is_compressed:
+            categories = slim_categories(slim)
+            with gzip.open(file_path, 'rb') as file:
+                svg_tree = etree.parse(
+                    file, slim_parser(categories, encoding)
+                ).getroot()
+            strip_non_rendering(svg_tree, categories)
+            svg = SVG(svg_tree)
+        else:
+            with open(file_path, 'r', encoding=encoding) as file:
+                svg_string = file.read()
+            svg = SVG.from_string(svg_string, encoding=encoding, slim=slim)
+
+        svg._source_path = str(file_path)
+        if geometry_cache is not None:
+            svg._geometry_cache = GeometryCache.load(
+                geometry_cache, file_path, svg._xml
+            )
+        return svg
+
+    def save_geometry_cache(
+        self, path: str, arc_tolerance: float = DEFAULT_ARC_TOLERANCE
+    ) -> None:
+        """Write the parsed path geometry to a sidecar file for faster reloads.
+        
+        The absolute commands of all path data are stored as command
+        letters, offsets and a float coordinate array in a binary file that
+        from_file(..., geometry_cache=path) memory-maps, so later loads skip
+        tokenizing the path data. The cache records the size, modification
+        time and SHA-256 digest of the source file and a checksum of the
+        path data, and is ignored once either changes.
+        
+        Args:
+            path: Path of the cache file.
+            arc_tolerance: Tolerance arcs are flattened with; the cache is
+                only used by transforms with the same arc_tolerance.
+                Defaults to DEFAULT_ARC_TOLERANCE.
+                
+        Raises:
+            ValueError: If the SVG was not loaded with from_file or path
+                data contains invalid commands.
         """
-        with open(file_path, 'r', encoding=encoding) as file:
-            svg_string = file.read()
-        return SVG.from_string(svg_string, encoding=encoding)
+        if self._source_path is None:
+            raise ValueError(
+                'Geometry caches can only be saved for SVGs loaded with from_file.'
+            )
+        cache = GeometryCache.from_element(self._xml, arc_tolerance)
+        cache.save(path, self._source_path)
+        self._geometry_cache = cache
 
     def to_string(self, encoding: str = 'utf-8') -> str:
         """Convert the SVG object to an XML string.
@@ -93,27 +250,72 @@ class SVG:
         Returns:
             The SVG as an XML string.
         """
-        return etree.tostring(self._xml, encoding=encoding).decode(encoding=encoding)
+        return self._to_bytes(encoding).decode(encoding=encoding)
+
+    def _to_bytes(self, encoding: str = 'utf-8') -> bytes:
+        """Serialize the SVG, reusing the cached bytes of an unchanged tree."""
+        serialized = self._serialized.get(encoding)
+        if serialized is None:
+            serialized = etree.tostring(self._xml, encoding=encoding)
+            self._serialized[encoding] = serialized
+        return serialized
 
-    def to_file(self, file_path: str, encoding: str = 'utf-8') -> None:
+    def to_file(
+        self,
+        file_path: str,
+        encoding: str = 'utf-8',
+        compress: Optional[bool] = None,
+        compresslevel: int = 9
+    ) -> None:
         """Write the SVG object to a file.
         
+        Compressed output (SVGZ) is serialized incrementally into a gzip
+        stream, without building the full XML string in memory, unless a
+        cached serialization exists.
+        
         Args:
             file_path: Path where the SVG file should be written.
             encoding: Character encoding for the file. Defaults to 'utf-8'.
+            compress: Whether to write a gzip-compressed SVGZ file. Defaults
+                to None, which compresses files with a '.svgz' suffix.
+            compresslevel: Gzip compression level from 0 (none) to 9 (best).
+                Defaults to 9.
         """
-        with open(file_path, 'w', encoding=encoding) as file:
-            file.write(self.to_string(encoding=encoding))
+        if compress is None:
+            compress = str(file_path).lower().endswith('.svgz')
+
+        if compress:
+            with gzip.open(file_path, 'wb', compresslevel=compresslevel) as file:
+                serialized = self._serialized.get(encoding)
+                if serialized is None:
+                    etree.ElementTree(self._xml).write(file, encoding=encoding)
+                else:
+                    file.write(serialized)
+            return
+
+        with open(file_path, 'wb') as file:
+            file.write(self._to_bytes(encoding))
 
     def __copy__(self) -> SVG:
-        """Create a shallow copy of the SVG object."""
-        return SVG(self._xml)
+        """Create a shallow copy of the SVG object.
+        
+        The copy shares the XML tree and therefore also its serialization
+        cache.
+        """
+        svg = SVG(self._xml)
+        svg._serialized = self._serialized
+        svg._source_path = self._source_path
+        svg._geometry_cache = self._geometry_cache
+        return svg
 
     def __deepcopy__(self, memodict: Optional[Dict] = None) -> SVG:
         """Create a deep copy of the SVG object."""
         if memodict is None:
             memodict = {}
-        return SVG(deepcopy(self._xml, memodict))
+        svg = SVG(deepcopy(self._xml, memodict))
+        svg._source_path = self._source_path
+        svg._geometry_cache = self._geometry_cache
+        return svg
 
     def __getstate__(self) -> Dict[str, str]:
         """Get state for pickling."""
@@ -121,7 +323,11 @@ class SVG:
 
     def __setstate__(self, state: Dict[str, str]) -> None:
         """Set state from unpickling."""
-        self._xml = self.from_string(state['xml']).xml
+        self._xml = self.from_string(state['xml'])._xml
+        self._serialized = {}
+        self._source_path = None
+        self._geometry_cache = None
+        self._hit_test_index = None
 
     @property
     def shape(self) -> Tuple[float, float]:
@@ -134,13 +340,13 @@ class SVG:
             ValueError: If width/height cannot be resolved from attributes
                 or viewBox.
         """
-        raw_width = self.xml.attrib.get('width')
-        raw_height = self.xml.attrib.get('height')
+        raw_width = self._xml.attrib.get('width')
+        raw_height = self._xml.attrib.get('height')
         width = self._parse_length(raw_width)
         height = self._parse_length(raw_height)
 
         if width is None or height is None:
-            view_box = self.xml.attrib.get('viewBox')
+            view_box = self._xml.attrib.get('viewBox')
             if view_box:
                 values = parse_numbers(view_box)
                 if len(values) == 4:
@@ -155,7 +361,17 @@ class SVG:
     def transform(
         self, 
         transformation: Callable[[Tuple[float, float]], Tuple[float, float]],
-        inplace: bool = False
+        inplace: bool = False,
+        simplify: Optional[float] = None,
+        fit_curves: Optional[float] = None,
+        bake_transforms: bool = False,
+        arc_tolerance: float = DEFAULT_ARC_TOLERANCE,
+        processes: Optional[int] = None,
+        cache: Optional[TransformCache] = None,
+        fingerprint: Optional[str] = None,
+        select: Optional[Selector] = None,
+        cull: Union[bool, str] = False,
+        cull_margin: float = DEFAULT_CULL_MARGIN
     ) -> SVG:
         """Apply a geometric transformation to all points in the SVG.
         
@@ -168,104 +384,919 @@ class SVG:
                 a transformed (x, y) tuple.
             inplace: If True, modify this SVG object. If False, return a new
                 transformed copy. Defaults to False.
+            simplify: Optional tolerance. If given, polyline runs of paths and
+                polygon/polyline points are simplified after the transformation
+                (see Path.simplify). Defaults to None (no simplification).
+            fit_curves: Optional tolerance. If given, curves and arcs in paths
+                are sampled, transformed and refitted with cubic Bezier curves
+                (see Path.transform). Defaults to None.
+            bake_transforms: If True, every element's cumulative transform
+                attributes (matrix, translate, scale, rotate, skew) are first
+                applied to its coordinates and removed, so the transformation
+                runs in the root coordinate system (see bake_transforms()).
+                Defaults to False.
+            arc_tolerance: Maximum distance between an arc and the line
+                segments approximating it. Defaults to DEFAULT_ARC_TOLERANCE.
+            processes: Optional number of worker processes. If given, all
+                coordinates are collected into one shared memory buffer whose
+                slices are transformed by the workers in place (see
+                parallel.transform_points_shared). The transformation must be
+                picklable. Defaults to None (transform in this process).
+            cache: Optional TransformCache. If the serialized document was
+                transformed with the same transformation and options before,
+                the stored result is returned without transforming.
+            fingerprint: Version string identifying the transformation in
+                the cache. Required with a cache unless the transformation
+                is an AffineTransform.
+            select: Optional selection of the subtrees to transform: an
+                XPath (prefixes 'svg' and 'xlink' are bound), a simple CSS
+                selector such as 'g#roads' or '.layer > path', or a list of
+                element ids. Only the selected elements and their
+                descendants are visited; simplification is restricted to them
+                as well. Baking (bake_transforms=True) still covers the whole
+                document. Defaults to None (the whole document).
+            cull: If True or 'remove', elements whose transformed bounds lie
+                entirely outside the viewport (see shape) are removed; with
+                'hide' they get display="none" instead (see
+                render.cull_elements). Defaults to False.
+            cull_margin: Margin around the viewport in pixels of a
+                rendering at scale 1 within which elements are kept.
+                Defaults to DEFAULT_CULL_MARGIN.
+                
+        Vectorized transformations (AffineTransform or functions decorated
+        with transformations.vectorized) transform all coordinates of the
+        document as a single array instead of point by point.
                 
         Returns:
             The transformed SVG object. If inplace=True, returns self.
             Otherwise, returns a new SVG object.
+
+        Raises:
+            ValueError: If fit_curves is combined with processes, a cache is
+                given without a fingerprint for a transformation other than
+                an AffineTransform, the selector is invalid or matches
+                nothing, the cull mode is unknown or the size of a culled
+                SVG cannot be resolved.
         """
+        if fit_curves is not None and processes is not None:
+            raise ValueError('fit_curves cannot be combined with processes.')
+        if isinstance(cull, str) and cull not in CULL_MODES:
+            raise ValueError(f'Unknown cull mode: {cull}')
+
+        if cache is not None:
+            options: Dict[str, Any] = dict(
+                simplify=simplify,
+                fit_curves=fit_curves,
+                bake_transforms=bake_transforms,
+                arc_tolerance=arc_tolerance,
+                select=select,
+            )
+            if cull:
+                options.update(cull=cull, cull_margin=cull_margin)
+            key = cache.key(self._to_bytes(), transformation, fingerprint, **options)
+            cached = cache.get(key)
+            if cached is None:
+                svg = self.transform(
+                    transformation,
+                    inplace=inplace,
+                    simplify=simplify,
+                    fit_curves=fit_curves,
+                    bake_transforms=bake_transforms,
+                    arc_tolerance=arc_tolerance,
+                    processes=processes,
+                    select=select,
+                    cull=cull,
+                    cull_margin=cull_margin,
+                )
+                cache.put(key, svg._to_bytes())
+                return svg
+            if inplace:
+                svg = self
+                svg._xml = etree.fromstring(cached)
+                svg._geometry_cache = None
+                svg._hit_test_index = None
+            else:
+                svg = SVG(etree.fromstring(cached))
+            svg._serialized = {'utf-8': cached}
+            return svg
+
         if inplace:
             svg = self
         else:
             svg = deepcopy(self)
 
-        self._transform_paths(svg, transformation)
-        self._transform_xy_attributes(svg, transformation)
-        self._transform_points_attributes(svg, transformation)
-        self._transform_transform_attributes(svg, transformation)
-        self._transform_style_attributes(svg, transformation)
+        svg.invalidate_cache()
+        if bake_transforms:
+            svg.bake_transforms(inplace=True)
 
+        roots = None if select is None else select_elements(svg._xml, select)
+        self._transform_elements(
+            svg, transformation, simplify, fit_curves, arc_tolerance, processes, roots
+        )
+        svg._geometry_cache = None
+        if cull:
+            width, height = svg.shape
+            cull_elements(
+                svg._xml, width, height, cull_margin, 'remove' if cull is True else cull
+            )
         return svg
 
+    def pipeline(self) -> TransformPipeline:
+        """Start a lazy chain of transformations of this SVG.
+        
+        Transformations added with TransformPipeline.transform are only
+        composed; apply() transforms the document in a single pass, with
+        consecutive affine transformations fused into one matrix.
+        
+        Example:
+            >>> pipeline = svg.pipeline().transform(rotation).transform(scaling)
+            >>> pipeline.transform(warp).apply()
+        
+        Returns:
+            An empty TransformPipeline of this SVG.
+        """
+        return TransformPipeline(self)
+
+    def transform_many(
+        self,
+        transformations: Sequence[
+            Callable[[Tuple[float, float]], Tuple[float, float]]
+        ] = (),
+        batched: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        count: Optional[int] = None,
+        arc_tolerance: float = DEFAULT_ARC_TOLERANCE
+    ) -> List[SVG]:
+        """Apply several transformations to copies of the SVG.
+        
+        The coordinates of the document are extracted once and transformed
+        by every transformation; the document is serialized once with
+        placeholders for the coordinate attributes, so every result only
+        formats its coordinates and shares all other serialized content.
+        The results are equal to the vectorized route of transform().
+        
+        Args:
+            transformations: A sequence of transformations, each applied as
+                in transform() (vectorized ones transform all points at
+                once). Defaults to no transformations.
+            batched: Optional function mapping an array of shape
+                (count, N, 2) to transformed points of the same shape, e.g.,
+                a batch of random warps, used instead of transformations.
+            count: Number of results of the batched function. Required with
+                batched. Defaults to None.
+            arc_tolerance: Maximum distance between an arc and the line
+                segments approximating it. Defaults to DEFAULT_ARC_TOLERANCE.
+                
+        Returns:
+            List of the transformed SVG objects, one per transformation.
+            
+        Raises:
+            ValueError: If batched is combined with transformations or given
+                without count (or count without batched), count is negative
+                or the batched function returns an array of a different
+                shape.
+        """
+        if batched is None:
+            if count is not None:
+                raise ValueError('count requires a batched function.')
+        elif count is None or len(transformations):
+            raise ValueError('batched requires count and no transformations.')
+        elif count < 0:
+            raise ValueError(f'Invalid count: {count}')
+
+        coordinates = DocumentCoordinates.from_element(
+            self._xml, arc_tolerance, self._geometry_cache
+        )
+        points = coordinates.points
+        batch: Sequence[np.ndarray]
+        if batched is None or count is None:
+            batch = [
+                transform_points(transformation, points)
+                for transformation in transformations
+            ]
+        else:
+            stacked = np.asarray(
+                batched(np.repeat(points[np.newaxis], count, axis=0)), dtype=float
+            )
+            if stacked.shape != (count,) + points.shape:
+                raise ValueError(
+                    'Expected transformed points of shape '
+                    f'{(count,) + points.shape}, got {stacked.shape}.'
+                )
+            batch = list(stacked)
+
+        svgs = []
+        for serialized in coordinates.serialize_many(self._xml, batch):
+            svg = SVG(etree.fromstring(serialized))
+            svg._serialized['utf-8'] = serialized
+            svgs.append(svg)
+        return svgs
+
+    def iter_transform(
+        self,
+        transformation: Callable[[Tuple[float, float]], Tuple[float, float]],
+        simplify: Optional[float] = None,
+        fit_curves: Optional[float] = None,
+        arc_tolerance: float = DEFAULT_ARC_TOLERANCE,
+        chunk_depth: int = 1
+    ) -> Iterator[bytes]:
+        """Transform the SVG element by element, yielding serialized chunks.
+        
+        Elements are copied, transformed and serialized one subtree at a
+        time in document order, so the first bytes are available long before
+        the whole document is transformed, e.g., to stream an HTTP response.
+        The concatenated chunks equal to_string() of transform() with the
+        same options, encoded in UTF-8. This SVG is not modified.
+        
+        Args:
+            transformation: The transformation function to apply.
+            simplify: Optional simplification tolerance (see transform()).
+            fit_curves: Optional curve fitting tolerance (see transform()).
+            arc_tolerance: Maximum deviation of flattened arcs. Defaults to
+                DEFAULT_ARC_TOLERANCE.
+            chunk_depth: Nesting depth of the elements that are transformed
+                and yielded as one chunk each. Container elements above this
+                depth are opened and their children streamed separately.
+                Defaults to 1 (one chunk per child of the root element);
+                larger values split documents with a few large layers.
+                
+        Yields:
+            UTF-8 encoded chunks of the transformed document.
+            
+        Raises:
+            ValueError: If chunk_depth is negative.
+        """
+        if chunk_depth < 0:
+            raise ValueError(f'Invalid chunk depth: {chunk_depth}')
+        if chunk_depth == 0 or len(self._xml) == 0:
+            yield self.transform(
+                transformation,
+                simplify=simplify,
+                fit_curves=fit_curves,
+                arc_tolerance=arc_tolerance,
+            )._to_bytes()
+            return
+
+        root = etree.Element(
+            self._xml.tag, attrib=self._xml.attrib, nsmap=self._xml.nsmap
+        )
+        document = SVG(root)
+
+        def transform_subtree(element: ElementBase) -> None:
+            self._transform_elements(
+                document,
+                transformation,
+                simplify,
+                fit_curves,
+                arc_tolerance,
+                None,
+                [element],
+            )
+
+        def split_at_marker(
+            shell: ElementBase, text: Optional[str]
+        ) -> Tuple[bytes, bytes]:
+            # Serialize the open elements with a marker as the text of the innermost one
+            shell.text = (text or '') + _CHUNK_MARKER
+            serialized = etree.tostring(root, encoding='utf-8')
+            shell.text = None
+            position = serialized.rfind(_CHUNK_MARKER.encode('utf-8'))
+            return serialized[:position], serialized[position + len(_CHUNK_MARKER):]
+
+        def stream(
+            original: ElementBase,
+            shell: ElementBase,
+            depth: int,
+            outer: Tuple[bytes, bytes],
+        ) -> Iterator[bytes]:
+            transform_subtree(shell)
+            opening, closing = split_at_marker(shell, None)
+            yield split_at_marker(shell, original.text)[0][len(outer[0]):]
+            for child in original:
+                if (
+                    depth + 1 < chunk_depth
+                    and isinstance(child.tag, str)
+                    and len(child)
+                ):
+                    namespaces = {
+                        prefix: uri
+                        for prefix, uri in child.nsmap.items()
+                        if original.nsmap.get(prefix) != uri
+                    }
+                    child_shell = etree.SubElement(
+                        shell, child.tag, attrib=child.attrib, nsmap=namespaces
+                    )
+                    yield from stream(child, child_shell, depth + 1, (opening, closing))
+                    shell.remove(child_shell)
+                    if child.tail:
+                        yield split_at_marker(shell, child.tail)[0][len(opening):]
+                    continue
+                copy = deepcopy(child)
+                shell.append(copy)
+                if isinstance(copy.tag, str):
+                    transform_subtree(copy)
+                serialized = etree.tostring(root, encoding='utf-8')
+                shell.remove(copy)
+                yield serialized[len(opening):len(serialized) - len(closing)]
+            yield closing[:len(closing) - len(outer[1])]
+
+        yield from stream(self._xml, root, 0, (b'', b''))
+
+    def bake_transforms(self, inplace: bool = False) -> SVG:
+        """Apply all transform attributes to the coordinates they affect.
+        
+        The cumulative transformation matrix (CTM) of every element is
+        computed in a single pass over the tree and applied to the element's
+        path data, coordinate attributes and points. Transform attributes and
+        style transform declarations are removed afterwards, so the whole
+        document lives in the root coordinate system.
+        
+        Sizes (width, height, r, rx, ry) are scaled by the CTM's axis scale
+        factors and stroke widths of shapes by its area scale. Rectangles,
+        circles and ellipses whose CTM rotates or skews them (or scales a
+        circle unevenly) are converted into paths. Uses, images, texts,
+        foreign objects and nested SVGs that are rotated, skewed or mirrored
+        (texts: scaled at all) keep their CTM as a matrix() transform
+        instead. So do elements that reference other content with url()
+        (clip paths, masks, gradients, patterns, filters, markers), since
+        that content lives in their user space and is not baked.
+        
+        Args:
+            inplace: If True, modify this SVG object. If False, return a new
+                baked copy. Defaults to False.
+                
+        Returns:
+            The baked SVG object. If inplace=True, returns self.
+        """
+        svg = self if inplace else deepcopy(self)
+
+        ctms = compute_ctms(svg.xml)
+        # CTMs kept as transform attributes, inherited by the descendants
+        kept: Dict[ElementBase, AffineTransform] = {}
+        for element, ctm in ctms.items():
+            if 'transform' in element.attrib:
+                del element.attrib['transform']
+            style = element.attrib.get('style')
+            if style and 'transform' in style:
+                style = remove_style_transform(style)
+                if style:
+                    element.attrib['style'] = style
+                else:
+                    del element.attrib['style']
+            kept_ctm = kept.get(element.getparent())
+            if kept_ctm is not None:
+                kept[element] = kept_ctm
+                ctm = kept_ctm.inverse() @ ctm
+            if ctm.is_identity or element is svg.xml:
+                continue
+
+            name = etree.QName(element).localname
+            if self._needs_residual_transform(
+                name, ctm
+            ) or self._references_content(element):
+                element.attrib['transform'] = ctm.to_string()
+                kept[element] = ctms[element]
+                continue
+
+            if name in ('rect', 'circle', 'ellipse'):
+                if not self._bake_shape(element, name, ctm):
+                    element.attrib['transform'] = ctm.to_string()
+                    kept[element] = ctms[element]
+                    continue
+            else:
+                if 'd' in element.attrib:
+                    element.attrib['d'] = transform_path_command_string(
+                        element.attrib['d'], ctm
+                    )
+                self._transform_element_xy_attributes(element, ctm)
+                self._transform_element_points_attribute(element, ctm)
+                self._scale_element_lengths(element, ctm)
+            if name in _GEOMETRY_TAGS:
+                a, b, c, d, _e, _f = ctm.coefficients
+                self._scale_stroke_width(element, math.sqrt(abs(a * d - b * c)))
+
+        return svg
+
+    def sample_points(
+        self, n_per_path: int, apply_transforms: bool = False
+    ) -> np.ndarray:
+        """Sample evenly spaced points along every path of the SVG.
+        
+        Points are spaced by arc length (see Path.sample_uniform).
+        
+        Args:
+            n_per_path: Number of points per path, including the start and
+                end points.
+            apply_transforms: If True, the points are mapped through every
+                element's cumulative transform into the root coordinate
+                system. Defaults to False (element coordinates).
+                
+        Returns:
+            Array of shape (P, n_per_path, 2) for the P elements with path
+            data, in document order. Rows of paths without points are NaN.
+            
+        Raises:
+            ValueError: If n_per_path is smaller than 1 or path data is invalid.
+        """
+        if n_per_path < 1:
+            raise ValueError(f'Invalid sample count: {n_per_path}')
+
+        elements = self._xml.xpath('//*[@d]')
+        ctms = compute_ctms(self._xml) if apply_transforms else {}
+        samples = np.full((len(elements), n_per_path, 2), np.nan)
+        for index, element in enumerate(elements):
+            path = Path.from_command_string(element.attrib['d'])
+            try:
+                points = path.sample_uniform(n_per_path)
+            except ValueError:
+                continue
+            samples[index] = (
+                ctms[element].transform_points(points) if apply_transforms else points
+            )
+        return samples
+
+    def hit_test(
+        self,
+        points: np.ndarray,
+        fill_rule: Optional[str] = None,
+        tolerance: float = DEFAULT_ARC_TOLERANCE
+    ) -> List[Optional[str]]:
+        """Find the topmost path, polygon or polyline containing each point.
+        
+        Outlines are flattened once into a HitTestIndex that is kept until
+        the tree is modified (see hit_test.HitTestIndex), so repeated queries
+        only run the bounding box prefilter and the vectorized winding tests.
+        
+        Args:
+            points: Array of shape (P, 2) with points in the root coordinate
+                system (the user units of the viewBox).
+            fill_rule: 'nonzero' or 'evenodd' for all elements. Defaults to
+                None (the fill-rule of every element).
+            tolerance: Maximum distance between curves or arcs and the edges
+                approximating them. Defaults to DEFAULT_ARC_TOLERANCE.
+                
+        Returns:
+            The id of the topmost element containing each point, or None if
+            no element contains it or the element has no id.
+            
+        Raises:
+            ValueError: If points do not have shape (P, 2), fill_rule is
+                unknown or path data contains invalid commands.
+        """
+        index = self._hit_test_index
+        if index is None or index.tolerance != tolerance:
+            index = self._hit_test_index = HitTestIndex.from_element(
+                self._xml, tolerance
+            )
+        ids = index.ids
+        return [
+            None if row < 0 else ids[row]
+            for row in index.query(points, fill_rule).tolist()
+        ]
+
+    def to_arrays(self, tolerance: Optional[float] = None) -> GeometryArrays:
+        """Export the geometry of all paths, polygons and polylines as NumPy arrays.
+        
+        Commands of all elements are concatenated into one code array, one
+        point array and one offset array (see Path.to_arrays), so the
+        geometry can be processed in bulk without Python objects per point.
+        
+        Args:
+            tolerance: If given, curves and arcs are flattened into lines
+                deviating at most this much from the exact geometry.
+                Defaults to None (Bezier curves are kept, arcs are flattened
+                with DEFAULT_ARC_TOLERANCE).
+                
+        Returns:
+            The GeometryArrays; element_indices and ids map the elements
+            back into the document.
+            
+        Raises:
+            ValueError: If path data contains invalid commands.
+        """
+        return geometry_arrays(self._xml, tolerance)
+
+    @classmethod
+    def from_arrays(cls, arrays: GeometryArrays, template: Optional[SVG] = None) -> SVG:
+        """Create an SVG from geometry arrays.
+        
+        Args:
+            arrays: The geometry arrays, e.g., returned by to_arrays and
+                modified in place.
+            template: Optional SVG the arrays were exported from. If given,
+                a copy of it with the geometry of the arrays is returned.
+                Defaults to None (a new SVG with one path per element).
+                
+        Returns:
+            The SVG object.
+            
+        Raises:
+            ValueError: If the number of points does not match the codes.
+        """
+        if template is not None:
+            svg = deepcopy(template)
+            svg.invalidate_cache()
+            apply_geometry_arrays(svg._xml, arrays)
+            return svg
+
+        root = etree.Element(f'{{{_SVG_NAMESPACE}}}svg', nsmap={None: _SVG_NAMESPACE})
+        for element_id in arrays.ids:
+            path = etree.SubElement(root, f'{{{_SVG_NAMESPACE}}}path')
+            if element_id is not None:
+                path.attrib['id'] = element_id
+        elements = GeometryArrays(
+            *arrays[:4], np.arange(1, len(arrays.ids) + 1), arrays.ids
+        )
+        apply_geometry_arrays(root, elements)
+        return SVG(root)
+
+    @staticmethod
+    def _transform_elements(
+        svg: SVG,
+        transformation: Callable[[Tuple[float, float]], Tuple[float, float]],
+        simplify: Optional[float],
+        fit_curves: Optional[float],
+        arc_tolerance: float,
+        processes: Optional[int],
+        roots: Optional[List[ElementBase]]
+    ) -> None:
+        """Transform the coordinates of an SVG in place, optionally within subtrees.
+        
+        Args:
+            svg: The SVG object to transform.
+            transformation: The transformation function to apply.
+            simplify: Optional simplification tolerance.
+            fit_curves: Optional curve fitting tolerance.
+            arc_tolerance: Maximum deviation of flattened arcs.
+            processes: Optional number of worker processes.
+            roots: Optional subtrees to restrict the transformation to.
+        """
+        vectorized_route = (
+            processes is not None
+            or is_vectorized(transformation)
+            or svg._geometry_cache is not None
+        )
+        if fit_curves is None and vectorized_route:
+            SVG._transform_coordinates(
+                svg, transformation, arc_tolerance, processes, roots
+            )
+        else:
+            SVG._transform_paths(svg, transformation, fit_curves, arc_tolerance, roots)
+            SVG._transform_xy_attributes(svg, transformation, roots)
+            SVG._transform_points_attributes(svg, transformation, roots)
+            SVG._transform_transform_attributes(svg, transformation, roots)
+            SVG._transform_style_attributes(svg, transformation, roots)
+
+        if simplify is not None:
+            SVG._simplify_geometry(svg, simplify, roots)
+
+    @staticmethod
+    def _needs_residual_transform(name: str, ctm: AffineTransform) -> bool:
+        """Check whether an element must keep its CTM as a transform attribute."""
+        if name not in _RESIDUAL_TRANSFORM_TAGS:
+            return False
+        a, b, c, d, _e, _f = ctm.coefficients
+        if a * d - b * c == 0:
+            return False
+        if name == 'text':
+            return (a, b, c, d) != (1.0, 0.0, 0.0, 1.0)
+        return b != 0 or c != 0 or a < 0 or d < 0
+
+    @staticmethod
+    def _references_content(element: ElementBase) -> bool:
+        """Check whether an element references other content with url()."""
+        return any('url(' in value for value in element.attrib.values())
+
+    @staticmethod
+    def _bake_shape(element: ElementBase, name: str, ctm: AffineTransform) -> bool:
+        """Apply a CTM to a rectangle, circle or ellipse, converting it if needed.
+
+        Shapes that stay axis-aligned under the CTM keep their element;
+        rotated or skewed shapes are replaced by an equivalent path.
+
+        Returns:
+            False if the shape has sizes that cannot be resolved (the
+            element is left unchanged), True otherwise.
+        """
+        attributes = element.attrib
+        # Radii that are missing or auto take the value of the other radius
+        given = {
+            key for key in ('rx', 'ry') if attributes.get(key, 'auto').strip() != 'auto'
+        }
+        lengths: Dict[str, float] = {}
+        for key in ('x', 'y', 'width', 'height', 'cx', 'cy', 'r', 'rx', 'ry'):
+            if key in ('rx', 'ry') and key not in given:
+                lengths[key] = 0.0
+                continue
+            # Missing lengths default to 0; percentages cannot be resolved
+            length = SVG._parse_length(attributes.get(key, '0'))
+            if length is None:
+                return False
+            lengths[key] = length
+        x, y = lengths['x'], lengths['y']
+        width, height = lengths['width'], lengths['height']
+        cx, cy = lengths['cx'], lengths['cy']
+        rx = abs(lengths['rx'] if 'rx' in given else lengths['ry'])
+        ry = abs(lengths['ry'] if 'ry' in given else lengths['rx'])
+        if name == 'rect':
+            rx, ry = min(rx, width / 2.0), min(ry, height / 2.0)
+        elif name == 'circle':
+            rx = ry = abs(lengths['r'])
+
+        a, b, c, d, _e, _f = ctm.coefficients
+        scale_x, scale_y = ctm.scale_factors
+        # Circles stay circles under rotations, mirrors and uniform scaling
+        conformal = math.isclose(scale_x, scale_y) and math.isclose(
+            a * c + b * d, 0.0, abs_tol=1e-12 * scale_x**2
+        )
+        if (b == 0 and c == 0) or (name == 'circle' and conformal):
+            if name == 'rect':
+                (x0, y0), (x1, y1) = ctm((x, y)), ctm((x + width, y + height))
+                values = {
+                    'x': min(x0, x1),
+                    'y': min(y0, y1),
+                    'width': abs(x1 - x0),
+                    'height': abs(y1 - y0),
+                }
+            else:
+                values = dict(zip(('cx', 'cy'), ctm((cx, cy))))
+            if name == 'circle' and conformal:
+                values['r'] = rx * scale_x
+            elif name == 'circle':
+                values = {**values, 'rx': rx * abs(a), 'ry': ry * abs(d)}
+                attributes.pop('r', None)
+                element.tag = etree.QName(
+                    etree.QName(element).namespace, 'ellipse'
+                ).text
+            elif rx or ry or 'rx' in attributes or 'ry' in attributes:
+                values.update(rx=rx * abs(a), ry=ry * abs(d))
+            for key, value in values.items():
+                attributes[key] = str(value)
+            return True
+
+        if name == 'rect':
+            if rx and ry:
+                arc = f'A {rx} {ry} 0 0 1'
+                corners = [
+                    f'M {x + rx} {y} H {x + width - rx} {arc} {x + width} {y + ry}',
+                    f'V {y + height - ry} {arc} {x + width - rx} {y + height}',
+                    f'H {x + rx} {arc} {x} {y + height - ry}',
+                    f'V {y + ry} {arc} {x + rx} {y} Z',
+                ]
+                path_data = ' '.join(corners)
+            else:
+                path_data = f'M {x} {y} H {x + width} V {y + height} H {x} Z'
+        else:
+            path_data = (
+                f'M {cx - rx} {cy} A {rx} {ry} 0 1 0 {cx + rx} {cy} '
+                f'A {rx} {ry} 0 1 0 {cx - rx} {cy} Z'
+            )
+        for key in lengths:
+            attributes.pop(key, None)
+        element.tag = etree.QName(etree.QName(element).namespace, 'path').text
+        attributes['d'] = transform_path_command_string(path_data, ctm)
+        return True
+
+    @staticmethod
+    def _scale_stroke_width(element: ElementBase, scale: float) -> None:
+        """Set the stroke width of an element to its inherited width times scale."""
+        if scale == 1.0:
+            return
+        width = str(stroke_width(element) * scale)
+        style = element.attrib.get('style', '')
+        if _STROKE_WIDTH_DECLARATION_RE.search(style):
+            element.attrib['style'] = _STROKE_WIDTH_DECLARATION_RE.sub(
+                lambda match: match.group('name') + width, style
+            )
+        else:
+            element.attrib['stroke-width'] = width
+
+    @staticmethod
+    def _scale_element_lengths(element: ElementBase, ctm: AffineTransform) -> None:
+        """Scale size attributes of an element by the scale factors of a CTM."""
+        scale_x, scale_y = ctm.scale_factors
+        scales = {
+            'width': scale_x,
+            'height': scale_y,
+            'rx': scale_x,
+            'ry': scale_y,
+            'r': math.sqrt(scale_x * scale_y),
+        }
+        for name, scale in scales.items():
+            values = parse_numbers(element.attrib.get(name, ''))
+            if values and '%' not in element.attrib[name]:
+                element.attrib[name] = str(values[0] * scale)
+
+    @staticmethod
+    def _simplify_geometry(
+        svg: SVG, tolerance: float, roots: Optional[List[ElementBase]] = None
+    ) -> None:
+        """Simplify path data and polygon/polyline points in SVG elements.
+        
+        Args:
+            svg: The SVG object to simplify.
+            tolerance: Maximum allowed deviation of the simplified geometry.
+            roots: Optional subtrees to restrict the simplification to.
+        """
+        for path in SVG._find_elements(svg, '@d', roots):
+            path.attrib['d'] = (
+                Path.from_command_string(path.attrib['d'])
+                .simplify(tolerance)
+                .command_string
+            )
+
+        for element in SVG._find_elements(svg, '@points', roots):
+            numbers = parse_numbers(element.attrib.get('points', ''))
+            if len(numbers) < 6 or len(numbers) % 2 != 0:
+                continue
+            closed = etree.QName(element).localname == 'polygon'
+            points = simplify_polyline(
+                np.array(numbers).reshape(-1, 2), tolerance, closed=closed
+            )
+            element.attrib['points'] = ' '.join(f'{x},{y}' for x, y in points.tolist())
+
+    @staticmethod
+    def _find_elements(
+        svg: SVG, condition: str, roots: Optional[List[ElementBase]] = None
+    ) -> List[ElementBase]:
+        """Find elements satisfying an XPath condition, optionally only within subtrees.
+        
+        Args:
+            svg: The SVG object to search.
+            condition: XPath predicate, e.g. '@d'.
+            roots: Optional subtrees to search instead of the whole document.
+            
+        Returns:
+            The matching elements in document order.
+        """
+        if roots is None:
+            elements: List[ElementBase] = svg.xml.xpath(f'//*[{condition}]')
+            return elements
+        return [
+            element
+            for root in roots
+            for element in root.xpath(f'descendant-or-self::*[{condition}]')
+        ]
+
     @staticmethod
     def _transform_xy_attributes(
         svg: SVG, 
-        transformation: Callable[[Tuple[float, float]], Tuple[float, float]]
+        transformation: Callable[[Tuple[float, float]], Tuple[float, float]],
+        roots: Optional[List[ElementBase]] = None
     ) -> None:
         """Transform coordinate attributes in SVG elements.
         
         Args:
             svg: The SVG object to transform.
             transformation: The transformation function to apply.
+            roots: Optional subtrees to restrict the transformation to.
         """
-        for attribute_pairs in [('x', 'y'), ('x1', 'y1'), ('x2', 'y2'), ('cx', 'cy'), ('fx', 'fy')]:
-            elements_with_both_attributes_selector = f'//*[@{attribute_pairs[0]} and @{attribute_pairs[1]}]'
-            elements_with_both_attributes = svg.xml.xpath(elements_with_both_attributes_selector)
+        for attribute_pair in COORDINATE_ATTRIBUTE_PAIRS:
+            both_attributes_condition = f'@{attribute_pair[0]} and @{attribute_pair[1]}'
+            elements_with_both_attributes = SVG._find_elements(
+                svg, both_attributes_condition, roots
+            )
             for element in elements_with_both_attributes:
-                x_name, y_name = attribute_pairs
-                x_values = parse_numbers(element.attrib[x_name])
-                y_values = parse_numbers(element.attrib[y_name])
-                if not x_values or not y_values:
-                    continue
-                x, y = x_values[0], y_values[0]
-                transformed_x, transformed_y = transformation((x, y))
-                element.attrib[x_name], element.attrib[y_name] = str(transformed_x), str(transformed_y)
+                SVG._transform_xy_attribute_pair(
+                    element, attribute_pair, transformation
+                )
+
+    @staticmethod
+    def _transform_element_xy_attributes(
+        element: ElementBase,
+        transformation: Callable[[Tuple[float, float]], Tuple[float, float]]
+    ) -> None:
+        """Transform all coordinate attribute pairs of a single element."""
+        for attribute_pair in COORDINATE_ATTRIBUTE_PAIRS:
+            if (
+                attribute_pair[0] in element.attrib
+                and attribute_pair[1] in element.attrib
+            ):
+                SVG._transform_xy_attribute_pair(
+                    element, attribute_pair, transformation
+                )
+
+    @staticmethod
+    def _transform_xy_attribute_pair(
+        element: ElementBase,
+        attribute_pair: Tuple[str, str],
+        transformation: Callable[[Tuple[float, float]], Tuple[float, float]]
+    ) -> None:
+        """Transform one coordinate attribute pair (e.g., cx/cy) of an element."""
+        x_name, y_name = attribute_pair
+        x_values = parse_numbers(element.attrib[x_name])
+        y_values = parse_numbers(element.attrib[y_name])
+        if not x_values or not y_values:
+            return
+        x, y = x_values[0], y_values[0]
+        transformed_x, transformed_y = transformation((x, y))
+        element.attrib[x_name], element.attrib[y_name] = str(transformed_x), str(
+            transformed_y
+        )
+
+    @staticmethod
+    def _transform_coordinates(
+        svg: SVG,
+        transformation: Callable[[Tuple[float, float]], Tuple[float, float]],
+        arc_tolerance: float = DEFAULT_ARC_TOLERANCE,
+        processes: Optional[int] = None,
+        roots: Optional[List[ElementBase]] = None
+    ) -> None:
+        """Transform all coordinates of an SVG as one array.
+        
+        Args:
+            svg: The SVG object to transform.
+            transformation: The transformation function to apply.
+            arc_tolerance: Maximum deviation of flattened arcs.
+            processes: Optional number of worker processes sharing the array.
+            roots: Optional subtrees to restrict the transformation to.
+        """
+        if roots is None:
+            roots = [svg.xml]
+        coordinates = DocumentCoordinates.from_element(
+            roots, arc_tolerance, svg._geometry_cache
+        )
+        if processes is None:
+            transformed = transform_points(transformation, coordinates.points)
+        else:
+            transformed = transform_points_shared(
+                coordinates.points, transformation, processes
+            )
+        coordinates.apply(roots, transformed)
 
     @staticmethod
     def _transform_paths(
         svg: SVG, 
-        transformation: Callable[[Tuple[float, float]], Tuple[float, float]]
+        transformation: Callable[[Tuple[float, float]], Tuple[float, float]],
+        fit_curves: Optional[float] = None,
+        arc_tolerance: float = DEFAULT_ARC_TOLERANCE,
+        roots: Optional[List[ElementBase]] = None
     ) -> None:
         """Transform path commands in SVG elements.
         
         Args:
             svg: The SVG object to transform.
             transformation: The transformation function to apply.
+            fit_curves: Optional tolerance for refitting curves and arcs.
+            arc_tolerance: Maximum deviation of flattened arcs.
+            roots: Optional subtrees to restrict the transformation to.
         """
-        elements_with_attribute_d_selector = '//*[@d]'
-        paths = svg.xml.xpath(elements_with_attribute_d_selector)
+        paths = SVG._find_elements(svg, '@d', roots)
         for path in paths:
             path_command_string = path.attrib['d']
             transformed_path_command_string = transform_path_command_string(
                 path_command_string=path_command_string,
-                transformation=transformation
+                transformation=transformation,
+                fit_curves=fit_curves,
+                arc_tolerance=arc_tolerance
             )
             path.attrib['d'] = transformed_path_command_string
 
     @staticmethod
     def _transform_points_attributes(
         svg: SVG,
-        transformation: Callable[[Tuple[float, float]], Tuple[float, float]]
+        transformation: Callable[[Tuple[float, float]], Tuple[float, float]],
+        roots: Optional[List[ElementBase]] = None
     ) -> None:
         """Transform points attributes in polygon/polyline elements."""
-        elements_with_points = svg.xml.xpath('//*[@points]')
+        elements_with_points = SVG._find_elements(svg, '@points', roots)
         for element in elements_with_points:
-            points_attr = element.attrib.get('points', '')
-            numbers = parse_numbers(points_attr)
-            if len(numbers) < 2 or len(numbers) % 2 != 0:
-                continue
+            SVG._transform_element_points_attribute(element, transformation)
 
-            transformed_pairs = []
-            for i in range(0, len(numbers), 2):
-                transformed = transformation((numbers[i], numbers[i + 1]))
-                transformed_pairs.append(f'{transformed[0]},{transformed[1]}')
+    @staticmethod
+    def _transform_element_points_attribute(
+        element: ElementBase,
+        transformation: Callable[[Tuple[float, float]], Tuple[float, float]]
+    ) -> None:
+        """Transform the points attribute of a single polygon/polyline element."""
+        points_attr = element.attrib.get('points', '')
+        numbers = parse_numbers(points_attr)
+        if len(numbers) < 2 or len(numbers) % 2 != 0:
+            return
 
-            element.attrib['points'] = ' '.join(transformed_pairs)
+        transformed_pairs = []
+        for i in range(0, len(numbers), 2):
+            transformed = transformation((numbers[i], numbers[i + 1]))
+            transformed_pairs.append(f'{transformed[0]},{transformed[1]}')
+
+        element.attrib['points'] = ' '.join(transformed_pairs)
     
     @staticmethod
     def _transform_style_attributes(
         svg: SVG, 
-        transformation: Callable[[Tuple[float, float]], Tuple[float, float]]
+        transformation: Callable[[Tuple[float, float]], Tuple[float, float]],
+        roots: Optional[List[ElementBase]] = None
     ) -> None:
         """Transform style positioning commands like translate in SVG elements.
         
         Args:
             svg: The SVG object to transform.
             transformation: The transformation function to apply.
+            roots: Optional subtrees to restrict the transformation to.
         """
         import re
         
         # Find all elements with style attributes
-        elements_with_style = svg.xml.xpath('//*[@style]')
+        elements_with_style = SVG._find_elements(svg, '@style', roots)
         
         for element in elements_with_style:
             style_attr = element.attrib.get('style', '')
@@ -273,66 +1304,27 @@ class SVG:
                 continue
                 
             # Transform translate() functions in style
-            transformed_style = SVG._transform_translate_functions(style_attr, transformation)
+            transformed_style = transform_translate_functions(style_attr, transformation)
             if transformed_style != style_attr:
                 element.attrib['style'] = transformed_style
 
     @staticmethod
     def _transform_transform_attributes(
         svg: SVG,
-        transformation: Callable[[Tuple[float, float]], Tuple[float, float]]
+        transformation: Callable[[Tuple[float, float]], Tuple[float, float]],
+        roots: Optional[List[ElementBase]] = None
     ) -> None:
         """Transform translate() functions in transform attributes."""
-        elements_with_transform = svg.xml.xpath('//*[@transform]')
+        elements_with_transform = SVG._find_elements(svg, '@transform', roots)
         for element in elements_with_transform:
             transform_attr = element.attrib.get('transform', '')
             if not transform_attr:
                 continue
 
-            transformed_transform = SVG._transform_translate_functions(transform_attr, transformation)
+            transformed_transform = transform_translate_functions(transform_attr, transformation)
             if transformed_transform != transform_attr:
                 element.attrib['transform'] = transformed_transform
     
-    @staticmethod
-    def _transform_translate_functions(
-        style_string: str,
-        transformation: Callable[[Tuple[float, float]], Tuple[float, float]]
-    ) -> str:
-        """Transform translate() functions in CSS style strings.
-        
-        Args:
-            style_string: CSS style string that may contain translate() functions.
-            transformation: The transformation function to apply.
-            
-        Returns:
-            Transformed style string.
-        """
-        import re
-        
-        def transform_translate(match: re.Match[str]) -> str:
-            translate_values = match.group('values')
-            function_name = match.group('func')
-            values = parse_numbers(translate_values)
-
-            if not values:
-                return match.group(0)
-
-            if function_name == 'translate':
-                x = values[0]
-                y = values[1] if len(values) > 1 else 0.0
-            elif function_name == 'translateX':
-                x = values[0]
-                y = 0.0
-            else:  # translateY
-                x = 0.0
-                y = values[0]
-
-            transformed_x, transformed_y = transformation((x, y))
-            return f'translate({transformed_x}, {transformed_y})'
-
-        pattern = r'(?P<func>translate|translateX|translateY)\((?P<values>[^)]+)\)'
-        return re.sub(pattern, transform_translate, style_string)
-
     @staticmethod
     def _parse_length(value: Optional[str]) -> Optional[float]:
         """Parse a length attribute, ignoring percent values."""
@@ -345,10 +1337,29 @@ class SVG:
             return None
         return float(match.group(0))
 
-    def to_pil_image(self, **kwargs) -> Image.Image:
+    def to_pil_image(
+        self,
+        tile_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        cull: Union[bool, str] = False,
+        cull_margin: float = DEFAULT_CULL_MARGIN,
+        **kwargs: Any
+    ) -> Image.Image:
         """Convert the SVG to a PIL Image.
         
         Args:
+            tile_size: Optional tile edge length in pixels. If given, the
+                image is rendered in tiles by a process pool and stitched
+                together; elements outside a tile are culled before it is
+                rendered (see render.render_tiled). Defaults to None (render
+                in one piece).
+            max_workers: Number of worker processes for tiled rendering.
+                Defaults to the CPU count.
+            cull: If True or a cull mode, elements entirely outside the
+                viewport are culled in a copy of the document before it is
+                rendered (see transform). Defaults to False.
+            cull_margin: Margin around the viewport in pixels of a
+                rendering at scale 1. Defaults to DEFAULT_CULL_MARGIN.
             **kwargs: Additional arguments passed to cairosvg.svg2png.
                 Common options include:
                 - scale: Scale factor for the output image (default: 1.0)
@@ -357,7 +1368,34 @@ class SVG:
                 
         Returns:
             A PIL Image object representing the SVG.
+            
+        Raises:
+            ValueError: If an output width or height is combined with tile_size,
+                the cull mode is unknown or the size of the SVG cannot be
+                resolved for culling.
         """
+        svg = self
+        if cull:
+            svg = SVG(deepcopy(self._xml))
+            width, height = svg.shape
+            cull_elements(
+                svg._xml, width, height, cull_margin, 'remove' if cull is True else cull
+            )
+
+        if tile_size is not None:
+            if any(
+                name in kwargs
+                for name in ('width', 'height', 'output_width', 'output_height')
+            ):
+                raise ValueError(
+                    'Tiled rendering supports scale only, '
+                    'not an output width or height.'
+                )
+            scale = float(kwargs.pop('scale', 1.0))
+            return Image.fromarray(
+                render_tiled(svg, scale, tile_size, max_workers, **kwargs)
+            )
+
         try:
             from cairosvg import svg2png
         except ModuleNotFoundError as exc:
@@ -365,7 +1403,7 @@ class SVG:
                 "cairosvg is required for SVG.to_pil_image(). Install it via pip."
             ) from exc
         buffer = BytesIO()
-        svg2png(bytestring=bytes(self.to_string(encoding='utf-8'), encoding='utf-8'), write_to=buffer, **kwargs)
+        svg2png(bytestring=svg._to_bytes('utf-8'), write_to=buffer, **kwargs)
         buffer.seek(0)
         image = Image.open(buffer)
         return image
@@ -378,3 +1416,273 @@ class SVG:
         """
         for child in other._xml:
             self._xml.append(child)
+        self.invalidate_cache()
+        other.invalidate_cache()
+
+    @classmethod
+    def compose(
+        cls,
+        svgs: Iterable[SVG],
+        layout: Optional[Sequence[Tuple[float, float]]] = None,
+        deduplicate: bool = True
+    ) -> SVG:
+        """Compose many SVGs into one document, sharing repeated geometry.
+        
+        Every input document is copied into a nested <svg> element placed at
+        its layout position. Conflicting ids are renamed (together with
+        their href and url(#...) references). With deduplicate, geometric
+        elements that occur more than once with identical attributes are
+        stored once in <defs> and every occurrence is replaced by a <use>
+        reference, so both the output size and later transformation work
+        scale with the unique geometry.
+        
+        Args:
+            svgs: SVG objects to compose. They are not modified.
+            layout: Optional (x, y) position of every SVG in the composed
+                document. Defaults to None, which places all SVGs at the
+                origin.
+            deduplicate: Whether to share repeated geometry through <defs>
+                and <use>. Defaults to True.
+                
+        Returns:
+            A new SVG object containing all input documents.
+            
+        Raises:
+            ValueError: If layout does not have one position per SVG.
+        """
+        svgs = list(svgs)
+        if layout is None:
+            layout = [(0.0, 0.0)] * len(svgs)
+        if len(layout) != len(svgs):
+            raise ValueError(
+                f'Layout has {len(layout)} positions for {len(svgs)} SVGs.'
+            )
+
+        root = etree.Element(
+            f'{{{_SVG_NAMESPACE}}}svg',
+            nsmap={None: _SVG_NAMESPACE, 'xlink': _XLINK_NAMESPACE},
+        )
+        used_ids: Set[str] = set()
+        width = height = 0.0
+        for index, (svg, (x, y)) in enumerate(zip(svgs, layout)):
+            document = deepcopy(svg._xml)
+            cls._rename_conflicting_ids(document, used_ids, suffix=str(index))
+            nested = etree.SubElement(root, f'{{{_SVG_NAMESPACE}}}svg')
+            for name, value in document.attrib.items():
+                nested.attrib[name] = value
+            nested.attrib['x'] = str(x)
+            nested.attrib['y'] = str(y)
+            nested.text = document.text
+            for child in document:
+                nested.append(child)
+
+            try:
+                svg_width, svg_height = svg.shape
+            except ValueError:
+                continue
+            width = max(width, x + svg_width)
+            height = max(height, y + svg_height)
+
+        if width > 0 and height > 0:
+            root.attrib['width'] = str(width)
+            root.attrib['height'] = str(height)
+            root.attrib['viewBox'] = f'0 0 {width} {height}'
+
+        if deduplicate:
+            cls._share_repeated_geometry(root, used_ids)
+
+        return SVG(root)
+
+    @staticmethod
+    def _rename_conflicting_ids(
+        document: ElementBase, used_ids: Set[str], suffix: str
+    ) -> None:
+        """Rename ids already in used_ids and update references to them.
+        
+        Args:
+            document: Root element of the document to process in place.
+            used_ids: Ids already taken; the document's final ids are added.
+            suffix: Suffix used to derive new ids.
+        """
+        renames: Dict[str, str] = {}
+        for element in document.iter():
+            element_id = element.get('id') if isinstance(element.tag, str) else None
+            if element_id is None:
+                continue
+            if element_id in used_ids:
+                new_id = f'{element_id}-{suffix}'
+                counter = 1
+                while new_id in used_ids:
+                    new_id = f'{element_id}-{suffix}-{counter}'
+                    counter += 1
+                renames[element_id] = new_id
+                element.attrib['id'] = new_id
+                element_id = new_id
+            used_ids.add(element_id)
+
+        if not renames:
+            return
+
+        def rename_reference(match: re.Match[str]) -> str:
+            return match.group(0).replace(
+                match.group('id'), renames.get(match.group('id'), match.group('id'))
+            )
+
+        for element in document.iter():
+            if not isinstance(element.tag, str):
+                continue
+            for name, value in element.attrib.items():
+                if (
+                    etree.QName(name).localname == 'href'
+                    and value.startswith('#')
+                    and value[1:] in renames
+                ):
+                    element.attrib[name] = '#' + renames[value[1:]]
+                elif 'url(' in value:
+                    element.attrib[name] = _URL_REFERENCE_RE.sub(
+                        rename_reference, value
+                    )
+            if (
+                etree.QName(element).localname == 'style'
+                and element.text
+                and 'url(' in element.text
+            ):
+                element.text = _URL_REFERENCE_RE.sub(rename_reference, element.text)
+
+    @staticmethod
+    def _share_repeated_geometry(root: ElementBase, used_ids: Set[str]) -> None:
+        """Move repeated geometric elements into <defs> and reference them with <use>.
+        
+        Args:
+            root: Root element of the document to process in place.
+            used_ids: Ids already taken in the document.
+        """
+        groups: Dict[Tuple, List[ElementBase]] = {}
+        # Elements referenced by id (e.g., by <textPath> or <mpath>) must stay in place
+        referenced = referenced_ids(root)
+        for element in root.iter(
+            *[f'{{{_SVG_NAMESPACE}}}{tag}' for tag in _GEOMETRY_TAGS]
+        ):
+            if (
+                len(element)
+                or (element.text and element.text.strip())
+                or element.get('id') in referenced
+            ):
+                continue
+            key = SVG._geometry_key(element)
+            if key is not None:
+                groups.setdefault(key, []).append(element)
+
+        repeated = [elements for elements in groups.values() if len(elements) > 1]
+        if not repeated:
+            return
+
+        defs = etree.Element(f'{{{_SVG_NAMESPACE}}}defs')
+        root.insert(0, defs)
+        counter = 0
+        for elements in repeated:
+            geometry_id = f'geometry-{counter}'
+            while geometry_id in used_ids:
+                counter += 1
+                geometry_id = f'geometry-{counter}'
+            used_ids.add(geometry_id)
+            counter += 1
+
+            shared = deepcopy(elements[0])
+            shared.tail = None
+            shared.attrib.pop('id', None)
+            shared.attrib['id'] = geometry_id
+            defs.append(shared)
+
+            for element in elements:
+                use = etree.Element(f'{{{_SVG_NAMESPACE}}}use')
+                use.attrib[f'{{{_XLINK_NAMESPACE}}}href'] = f'#{geometry_id}'
+                if 'id' in element.attrib:
+                    use.attrib['id'] = element.attrib['id']
+                use.tail = element.tail
+                element.getparent().replace(element, use)
+
+    @staticmethod
+    def _geometry_key(element: ElementBase) -> Optional[Tuple]:
+        """Compute a hashable key of an element's normalized geometry and attributes.
+
+        Returns None for elements with invalid path data, which are not shared.
+        """
+        attributes = []
+        for name, value in element.attrib.items():
+            if name == 'id':
+                continue
+            if name == 'd':
+                try:
+                    value = Path.from_command_string(value).command_string
+                except ValueError:
+                    return None
+            elif name == 'points':
+                value = ' '.join(str(number) for number in parse_numbers(value))
+            attributes.append((name, value))
+        return (element.tag, tuple(sorted(attributes)))
+
+
+class TransformPipeline:
+    """Lazy chain of transformations applied to an SVG in a single pass.
+    
+    Unlike chained SVG.transform calls, which copy the tree and format and
+    re-parse every coordinate between the steps, the pipeline composes the
+    transformations (see transformations.chain_transformations) and
+    transforms the document once. Pipelines are immutable; transform()
+    returns an extended copy, so a common prefix can be shared.
+    """
+
+    def __init__(
+        self,
+        svg: SVG,
+        transformations: Sequence[
+            Callable[[Tuple[float, float]], Tuple[float, float]]
+        ] = (),
+    ) -> None:
+        """Initialize the pipeline.
+        
+        Args:
+            svg: The SVG object to transform.
+            transformations: Transformations in the order they are applied.
+                Defaults to none.
+        """
+        self._svg = svg
+        self._transformations = tuple(transformations)
+
+    @property
+    def transformations(
+        self,
+    ) -> Tuple[Callable[[Tuple[float, float]], Tuple[float, float]], ...]:
+        """Get the transformations in the order they are applied."""
+        return self._transformations
+
+    @property
+    def transformation(self) -> Callable[[Tuple[float, float]], Tuple[float, float]]:
+        """Get the composed transformation, with affine runs fused into one matrix."""
+        return chain_transformations(self._transformations)
+
+    def transform(
+        self, transformation: Callable[[Tuple[float, float]], Tuple[float, float]]
+    ) -> TransformPipeline:
+        """Append a transformation.
+        
+        Args:
+            transformation: The transformation applied after the previous ones.
+            
+        Returns:
+            A new pipeline with the transformation appended.
+        """
+        return TransformPipeline(self._svg, self._transformations + (transformation,))
+
+    def apply(self, **transform_kwargs: Any) -> SVG:
+        """Transform the SVG by the composed transformation in a single pass.
+        
+        Args:
+            **transform_kwargs: Options of SVG.transform (e.g., inplace,
+                simplify, select or cache).
+                
+        Returns:
+            The transformed SVG object (see SVG.transform).
+        """
+        return self._svg.transform(self.transformation, **transform_kwargs)
@@ -4,13 +4,29 @@ from __future__ import annotations
 
 import math
 import re
-from typing import Any, Callable, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from svgecko.geometry import (
+    DEFAULT_ARC_TOLERANCE,
+    ArcLengthTable,
+    arc_center_parameters,
+    cubic_bezier_points,
+    douglas_peucker_mask,
+    fit_cubic_beziers,
+    flatten_arcs,
+    flatten_cubic_beziers,
+    quadratic_bezier_points,
+)
 
 COMMAND_TYPES: str = 'MmLlCcSsQqTtAaZzHhVv'
 
 _NUMBER_RE = re.compile(r'[+-]?(?:\d*\.\d+|\d+\.?)(?:[eE][+-]?\d+)?')
 _TOKEN_RE = re.compile(r'[MmLlCcSsQqTtAaZzHhVv]|[+-]?(?:\d*\.\d+|\d+\.?)(?:[eE][+-]?\d+)?')
-_PARAMS_PER_COMMAND = {
+# Read-only so that concurrent parsers can share it safely
+_PARAMS_PER_COMMAND = MappingProxyType({
     'M': 2,
     'L': 2,
     'C': 6,
@@ -21,11 +37,34 @@ _PARAMS_PER_COMMAND = {
     'H': 1,
     'V': 1,
     'Z': 0,
-}
+})
+
+# Number of samples taken along a curve segment before refitting it
+_CURVE_FIT_SAMPLES = 16
 
 # Type alias for transformation functions
 TransformationFunction = Callable[[Tuple[float, float]], Tuple[float, float]]
 
+# Integer codes of the absolute commands in exported geometry arrays
+COMMAND_CODES = MappingProxyType({'M': 0, 'L': 1, 'C': 2, 'Q': 3, 'Z': 4})
+_CODE_LETTERS = 'MLCQZ'
+_POINTS_PER_CODE = np.array([1, 1, 3, 2, 0])
+
+
+class PathArrays(NamedTuple):
+    """Geometry of a path as NumPy arrays.
+
+    Attributes:
+        codes: Array of shape (K,) with the command codes (see COMMAND_CODES).
+        points: Array of shape (N, 2) with the coordinates of all commands.
+        offsets: Array of shape (K + 1,); the points of command k are
+            points[offsets[k]:offsets[k + 1]].
+    """
+
+    codes: np.ndarray
+    points: np.ndarray
+    offsets: np.ndarray
+
 
 class Path:
     """Represents an SVG path as a collection of path commands.
@@ -44,6 +83,7 @@ class Path:
             commands: List of PathCommand objects.
         """
         self._commands = commands
+        self._arc_length_table: Optional[ArcLengthTable] = None
 
     @classmethod
     def from_command_string(cls, command_string: str) -> Path:
@@ -70,18 +110,440 @@ class Path:
         """
         return ' '.join([str(command) for command in self._commands])
 
-    def transform(self, transformation: TransformationFunction) -> Path:
+    def transform(
+        self,
+        transformation: TransformationFunction,
+        fit_curves: Optional[float] = None,
+        arc_tolerance: float = DEFAULT_ARC_TOLERANCE
+    ) -> Path:
         """Apply a transformation to all coordinates in the path.
         
+        By default only the end and control points of curves are transformed
+        and arcs are approximated by line segments. With fit_curves, every
+        curve and arc is sampled, the samples are transformed and refitted
+        with cubic Bezier curves, which stays accurate under nonlinear
+        transformations.
+        
         Args:
             transformation: Function that transforms (x, y) coordinates.
+            fit_curves: Optional tolerance for refitting transformed curves
+                and arcs as C commands. Defaults to None (transform control
+                points only).
+            arc_tolerance: Maximum distance between an arc and the line
+                segments approximating it (before the transformation).
             
         Returns:
             A new Path object with transformed coordinates.
         """
+        if fit_curves is not None:
+            return self._transform_fitting_curves(transformation, fit_curves)
+
+        transformed_commands: List[PathCommand] = []
+        for command in self._to_absolute(arc_tolerance)._commands:
+            coords = command.coordinates
+            transformed_coords = flatten([
+                transformation((coords[i], coords[i + 1]))
+                for i in range(0, len(coords), 2)
+            ])
+            transformed_commands.append(PathCommand(command.type, transformed_coords))
+
+        return Path(transformed_commands)
+
+    def _transform_fitting_curves(
+        self, transformation: TransformationFunction, tolerance: float
+    ) -> Path:
+        """Transform the path, refitting curves and arcs with cubic Bezier curves.
+        
+        Args:
+            transformation: Function that transforms (x, y) coordinates.
+            tolerance: Maximum allowed distance of a transformed sample from
+                the fitted curves.
+            
+        Returns:
+            A new Path object with M, L, C and Z commands.
+        """
         current: Tuple[float, float] = (0.0, 0.0)
-        subpath_start: Optional[Tuple[float, float]] = None
+        subpath_start = current
+        previous_control: Optional[Tuple[float, float]] = None
+        previous_type = ''
         transformed_commands: List[PathCommand] = []
+        parameters = np.linspace(0.0, 1.0, _CURVE_FIT_SAMPLES)
+
+        for command in self._to_absolute(arc_tolerance=None)._commands:
+            command_type = command.type
+            coords = command.coordinates
+
+            if command_type in ['M', 'L']:
+                current = (coords[0], coords[1])
+                if command_type == 'M':
+                    subpath_start = current
+                transformed = transformation(current)
+                transformed_commands.append(
+                    PathCommand(command_type, [transformed[0], transformed[1]])
+                )
+                previous_type = command_type
+                continue
+
+            if command_type == 'Z':
+                transformed_commands.append(PathCommand('Z'))
+                current = subpath_start
+                previous_type = command_type
+                continue
+
+            if command_type in ['C', 'S']:
+                if command_type == 'S':
+                    first_control = (
+                        _reflect(previous_control, current)
+                        if previous_type in ['C', 'S']
+                        else current
+                    )
+                    control_points = [
+                        current,
+                        first_control,
+                        (coords[0], coords[1]),
+                        (coords[2], coords[3]),
+                    ]
+                else:
+                    control_points = [current] + [
+                        (coords[i], coords[i + 1]) for i in range(0, 6, 2)
+                    ]
+                samples = cubic_bezier_points(np.array(control_points), parameters)
+                tangents = _end_directions(control_points)
+                previous_control = control_points[2]
+            elif command_type in ['Q', 'T']:
+                if command_type == 'T':
+                    control = (
+                        _reflect(previous_control, current)
+                        if previous_type in ['Q', 'T']
+                        else current
+                    )
+                    control_points = [current, control, (coords[0], coords[1])]
+                else:
+                    control_points = [
+                        current,
+                        (coords[0], coords[1]),
+                        (coords[2], coords[3]),
+                    ]
+                samples = quadratic_bezier_points(np.array(control_points), parameters)
+                tangents = _end_directions(control_points)
+                previous_control = control_points[1]
+            elif command_type == 'A':
+                rx, ry, rotation, large_arc_flag, sweep_flag, end_x, end_y = coords
+                arc_points = self._arc_to_points(
+                    start=current,
+                    end=(end_x, end_y),
+                    rx=rx,
+                    ry=ry,
+                    rotation=rotation,
+                    large_arc=bool(int(large_arc_flag)),
+                    sweep=bool(int(sweep_flag)),
+                    tolerance=0.0,
+                    max_step=2.0 * math.pi / (_CURVE_FIT_SAMPLES * 2),
+                )
+                samples = np.array([current] + arc_points)
+                tangents = (None, None)
+                previous_control = None
+            else:
+                raise ValueError(f'Unsupported command type: {command_type}')
+
+            transformed_samples = [transformation((x, y)) for x, y in samples.tolist()]
+            left_tangent = _transformed_direction(
+                transformation, samples[0], tangents[0]
+            )
+            right_tangent = _transformed_direction(
+                transformation, samples[-1], tangents[1]
+            )
+            beziers = fit_cubic_beziers(
+                np.array(transformed_samples, dtype=float),
+                tolerance,
+                left_tangent=left_tangent,
+                right_tangent=right_tangent,
+            )
+            for bezier in beziers:
+                transformed_commands.append(
+                    PathCommand('C', bezier[1:].ravel().tolist())
+                )
+            current = (coords[-2], coords[-1])
+            previous_type = command_type
+
+        return Path(transformed_commands)
+
+    def length(self) -> float:
+        """Get the arc length of the path.
+        
+        Lines, Bezier curves and arcs are measured exactly up to the
+        quadrature error (see geometry.ArcLengthTable); moves do not count.
+        
+        Returns:
+            The total length of all subpaths.
+        """
+        return self._arc_lengths().length
+
+    def point_at(self, t: np.ndarray) -> np.ndarray:
+        """Get points at fractions of the path length.
+        
+        Args:
+            t: Scalar or array of fractions of the total length; values are
+                clipped to [0, 1].
+                
+        Returns:
+            Array of shape t.shape + (2,) with the points.
+            
+        Raises:
+            ValueError: If the path has no points.
+        """
+        fractions = np.asarray(t, dtype=float)
+        table = self._arc_lengths()
+        points = table.points_at(
+            np.clip(fractions.reshape(-1), 0.0, 1.0) * table.length
+        )
+        return points.reshape(fractions.shape + (2,))
+
+    def sample_uniform(self, n: int) -> np.ndarray:
+        """Sample points evenly spaced along the path.
+        
+        Args:
+            n: Number of points, including the start and end points.
+            
+        Returns:
+            Array of shape (n, 2) with the points.
+            
+        Raises:
+            ValueError: If n is smaller than 1 or the path has no points.
+        """
+        if n < 1:
+            raise ValueError(f'Invalid sample count: {n}')
+        return self.point_at(np.linspace(0.0, 1.0, n))
+
+    def to_arrays(self, tolerance: Optional[float] = None) -> PathArrays:
+        """Export the path geometry as NumPy arrays.
+        
+        Commands are made absolute; H/V become L, S and T become C and Q
+        with explicit control points and arcs are flattened into L commands.
+        
+        Args:
+            tolerance: Optional flattening tolerance. If given, curves and
+                arcs are flattened into L commands deviating at most
+                tolerance from them. Defaults to None, which keeps Bezier
+                curves and flattens arcs with DEFAULT_ARC_TOLERANCE.
+                
+        Returns:
+            The PathArrays of the path.
+            
+        Raises:
+            ValueError: If tolerance is not positive.
+        """
+        if tolerance is not None and tolerance <= 0.0:
+            raise ValueError(f'Invalid tolerance: {tolerance}')
+
+        arc_tolerance = DEFAULT_ARC_TOLERANCE if tolerance is None else tolerance
+        commands = _resolve_smooth_commands(self._to_absolute(arc_tolerance)._commands)
+        if tolerance is not None:
+            commands = _flatten_curves(commands, tolerance)
+
+        codes = np.array(
+            [COMMAND_CODES[command.type] for command in commands], dtype=np.int8
+        )
+        coordinates = [value for command in commands for value in command.coordinates]
+        points = np.array(coordinates, dtype=float).reshape(-1, 2)
+        offsets = np.concatenate([[0], np.cumsum(_POINTS_PER_CODE[codes])]).astype(
+            np.int64
+        )
+        return PathArrays(codes, points, offsets)
+
+    @classmethod
+    def from_arrays(cls, codes: np.ndarray, points: np.ndarray) -> Path:
+        """Create a Path from command codes and points.
+        
+        Args:
+            codes: Array of shape (K,) with command codes (see COMMAND_CODES).
+            points: Array of shape (N, 2) with the coordinates of all commands.
+            
+        Returns:
+            A Path object with absolute commands.
+            
+        Raises:
+            ValueError: If the number of points does not match the codes.
+        """
+        return cls.from_command_string(format_path_arrays(codes, points))
+
+    def _arc_lengths(self) -> ArcLengthTable:
+        """Get the cached arc length table of the path."""
+        if self._arc_length_table is None:
+            self._arc_length_table = ArcLengthTable(*self._segment_arrays())
+        return self._arc_length_table
+
+    def _segment_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Convert the path into cubic Bezier and elliptical arc segments.
+        
+        Lines and quadratic curves become equivalent cubic curves, closing
+        commands become lines back to the subpath start and arcs keep their
+        center parameterization. A path consisting of moves only becomes a
+        zero-length segment at its first point.
+        
+        Returns:
+            Tuple (controls, arcs, is_arc) as expected by ArcLengthTable.
+        """
+        current: Tuple[float, float] = (0.0, 0.0)
+        subpath_start = current
+        first_point: Optional[Tuple[float, float]] = None
+        controls: List[List[Tuple[float, float]]] = []
+        arc_indices: List[int] = []
+        arc_parameters: List[Tuple[float, ...]] = []
+
+        def line(
+            start: Tuple[float, float], end: Tuple[float, float]
+        ) -> List[Tuple[float, float]]:
+            return [
+                start,
+                _lerp(start, end, 1.0 / 3.0),
+                _lerp(start, end, 2.0 / 3.0),
+                end,
+            ]
+
+        for command in _resolve_smooth_commands(
+            self._to_absolute(arc_tolerance=None)._commands
+        ):
+            command_type = command.type
+            coords = command.coordinates
+
+            if command_type == 'M':
+                current = subpath_start = (coords[0], coords[1])
+                if first_point is None:
+                    first_point = current
+            elif command_type == 'L':
+                controls.append(line(current, (coords[0], coords[1])))
+            elif command_type == 'Z':
+                controls.append(line(current, subpath_start))
+                current = subpath_start
+            elif command_type == 'C':
+                controls.append(
+                    [current] + [(coords[i], coords[i + 1]) for i in range(0, 6, 2)]
+                )
+            elif command_type == 'Q':
+                controls.append(
+                    _elevate_quadratic(
+                        current, (coords[0], coords[1]), (coords[2], coords[3])
+                    )
+                )
+            elif command_type == 'A':
+                rx, ry, rotation, large_arc_flag, sweep_flag, end_x, end_y = coords
+                arc_indices.append(len(controls))
+                arc_parameters.append(
+                    (
+                        *current,
+                        end_x,
+                        end_y,
+                        rx,
+                        ry,
+                        rotation,
+                        large_arc_flag,
+                        sweep_flag,
+                    )
+                )
+                controls.append(line(current, (end_x, end_y)))
+            else:
+                raise ValueError(f'Unsupported command type: {command_type}')
+
+            if command_type not in ['M', 'Z']:
+                current = (coords[-2], coords[-1])
+
+        if not controls and first_point is not None:
+            controls.append([first_point] * 4)
+
+        control_array = np.array(controls, dtype=float).reshape(-1, 4, 2)
+        arc_array = np.zeros((len(controls), 7))
+        is_arc = np.zeros(len(controls), dtype=bool)
+        if arc_parameters:
+            parameters = np.array(arc_parameters, dtype=float)
+            centers, radii, phi, theta1, delta, degenerate = arc_center_parameters(
+                starts=parameters[:, 0:2],
+                ends=parameters[:, 2:4],
+                radii=parameters[:, 4:6],
+                rotations=parameters[:, 6],
+                large_arcs=parameters[:, 7] != 0.0,
+                sweeps=parameters[:, 8] != 0.0,
+            )
+            indices = np.array(arc_indices)
+            arc_array[indices] = np.column_stack([centers, radii, phi, theta1, delta])
+            is_arc[indices] = ~degenerate
+
+        return control_array, arc_array, is_arc
+
+    def simplify(self, tolerance: float) -> Path:
+        """Drop polyline vertices that deviate less than tolerance from the path.
+
+        Runs of consecutive line segments are simplified with the
+        Douglas-Peucker algorithm. Curve and arc commands, subpath starts
+        and closing commands are kept, so closed subpaths stay closed.
+
+        Args:
+            tolerance: Maximum allowed distance of a dropped vertex from the
+                simplified path.
+
+        Returns:
+            A new Path object in absolute coordinates.
+        """
+        commands = self._to_absolute(arc_tolerance=None)._commands
+        simplified_commands: List[PathCommand] = []
+        run: List[PathCommand] = []
+        anchor: Tuple[float, float] = (0.0, 0.0)
+        subpath_start: Tuple[float, float] = (0.0, 0.0)
+
+        def flush_run(closing_point: Optional[Tuple[float, float]] = None) -> None:
+            if len(run) > 1:
+                vertices = [anchor] + [
+                    (command.coordinates[0], command.coordinates[1]) for command in run
+                ]
+                if closing_point is not None:
+                    vertices.append(closing_point)
+                mask = douglas_peucker_mask(np.array(vertices), tolerance)
+                mask = mask[1:len(run) + 1]
+                simplified_commands.extend(
+                    command for command, keep in zip(run, mask) if keep
+                )
+            else:
+                simplified_commands.extend(run)
+            run.clear()
+
+        for command in commands:
+            if command.type == 'L':
+                run.append(command)
+                continue
+
+            flush_run(subpath_start if command.type == 'Z' else None)
+            simplified_commands.append(command)
+            if command.type == 'M':
+                subpath_start = (command.coordinates[0], command.coordinates[1])
+            if command.type == 'Z':
+                anchor = subpath_start
+            else:
+                anchor = (command.coordinates[-2], command.coordinates[-1])
+        flush_run()
+
+        return Path(simplified_commands)
+
+    def _to_absolute(
+        self, arc_tolerance: Optional[float] = DEFAULT_ARC_TOLERANCE
+    ) -> Path:
+        """Convert the path to absolute M, L, C, S, Q, T and Z commands.
+
+        Relative commands are resolved against the current point, H/V
+        commands become L commands and arcs are approximated by L commands.
+        All arcs of the path are flattened together in one vectorized batch.
+
+        Args:
+            arc_tolerance: Maximum distance between an arc and the line
+                segments approximating it. If None, arcs are kept as absolute
+                A commands.
+
+        Returns:
+            A new Path object in absolute coordinates.
+        """
+        current: Tuple[float, float] = (0.0, 0.0)
+        subpath_start: Optional[Tuple[float, float]] = None
+        absolute_commands: List[Optional[PathCommand]] = []
+        arcs: List[Tuple[float, ...]] = []
 
         for command in self._commands:
             command_type = command.type
@@ -93,8 +555,7 @@ class Path:
                 else:
                     current = (coords[0], coords[1])
                 subpath_start = current
-                transformed = transformation(current)
-                transformed_commands.append(PathCommand('M', [transformed[0], transformed[1]]))
+                absolute_commands.append(PathCommand('M', [current[0], current[1]]))
                 continue
 
             if command_type in ['L', 'l']:
@@ -102,22 +563,19 @@ class Path:
                     current = (current[0] + coords[0], current[1] + coords[1])
                 else:
                     current = (coords[0], coords[1])
-                transformed = transformation(current)
-                transformed_commands.append(PathCommand('L', [transformed[0], transformed[1]]))
+                absolute_commands.append(PathCommand('L', [current[0], current[1]]))
                 continue
 
             if command_type in ['H', 'h']:
                 x_value = coords[0] + current[0] if command_type == 'h' else coords[0]
                 current = (x_value, current[1])
-                transformed = transformation(current)
-                transformed_commands.append(PathCommand('L', [transformed[0], transformed[1]]))
+                absolute_commands.append(PathCommand('L', [current[0], current[1]]))
                 continue
 
             if command_type in ['V', 'v']:
                 y_value = coords[0] + current[1] if command_type == 'v' else coords[0]
                 current = (current[0], y_value)
-                transformed = transformation(current)
-                transformed_commands.append(PathCommand('L', [transformed[0], transformed[1]]))
+                absolute_commands.append(PathCommand('L', [current[0], current[1]]))
                 continue
 
             if command_type in ['C', 'c', 'S', 's', 'Q', 'q', 'T', 't']:
@@ -127,14 +585,12 @@ class Path:
                         absolute_coords.extend([current[0] + coords[i], current[1] + coords[i + 1]])
                     current = (current[0] + coords[-2], current[1] + coords[-1])
                 else:
-                    absolute_coords = coords
+                    absolute_coords = list(coords)
                     current = (coords[-2], coords[-1])
 
-                transformed_coords = flatten([
-                    transformation((absolute_coords[i], absolute_coords[i + 1]))
-                    for i in range(0, len(absolute_coords), 2)
-                ])
-                transformed_commands.append(PathCommand(command_type.upper(), transformed_coords))
+                absolute_commands.append(
+                    PathCommand(command_type.upper(), absolute_coords)
+                )
                 continue
 
             if command_type in ['A', 'a']:
@@ -146,27 +602,23 @@ class Path:
                 else:
                     end = (end_x, end_y)
 
-                arc_points = self._arc_to_points(
-                    start=current,
-                    end=end,
-                    rx=rx,
-                    ry=ry,
-                    rotation=rotation,
-                    large_arc=bool(int(large_arc_flag)),
-                    sweep=bool(int(sweep_flag)),
-                )
-                if not arc_points:
-                    arc_points = [end]
-
-                for point in arc_points:
-                    transformed = transformation(point)
-                    transformed_commands.append(PathCommand('L', [transformed[0], transformed[1]]))
+                if arc_tolerance is None:
+                    absolute_commands.append(
+                        PathCommand(
+                            'A', [rx, ry, rotation, large_arc_flag, sweep_flag, *end]
+                        )
+                    )
+                else:
+                    absolute_commands.append(None)
+                    arcs.append(
+                        (*current, *end, rx, ry, rotation, large_arc_flag, sweep_flag)
+                    )
 
                 current = end
                 continue
 
             if command_type in ['Z', 'z']:
-                transformed_commands.append(PathCommand('Z'))
+                absolute_commands.append(PathCommand('Z'))
                 if subpath_start is not None:
                     current = subpath_start
                 subpath_start = None
@@ -174,7 +626,34 @@ class Path:
 
             raise ValueError(f'Unsupported command type: {command_type}')
 
-        return Path(transformed_commands)
+        if arc_tolerance is None or not arcs:
+            # Placeholders are only appended for arcs that are flattened
+            return Path(
+                [command for command in absolute_commands if command is not None]
+            )
+
+        arc_parameters = np.array(arcs, dtype=float)
+        arc_points, offsets = flatten_arcs(
+            starts=arc_parameters[:, 0:2],
+            ends=arc_parameters[:, 2:4],
+            radii=arc_parameters[:, 4:6],
+            rotations=arc_parameters[:, 6],
+            large_arcs=arc_parameters[:, 7] != 0.0,
+            sweeps=arc_parameters[:, 8] != 0.0,
+            tolerance=arc_tolerance,
+        )
+        arc_points_list = arc_points.tolist()
+        commands: List[PathCommand] = []
+        arc_index = 0
+        for absolute_command in absolute_commands:
+            if absolute_command is not None:
+                commands.append(absolute_command)
+                continue
+            for point in arc_points_list[offsets[arc_index]:offsets[arc_index + 1]]:
+                commands.append(PathCommand('L', point))
+            arc_index += 1
+
+        return Path(commands)
 
     @staticmethod
     def _arc_to_points(
@@ -185,77 +664,213 @@ class Path:
         rotation: float,
         large_arc: bool,
         sweep: bool,
+        tolerance: float = DEFAULT_ARC_TOLERANCE,
+        max_step: float = math.pi / 8.0,
     ) -> List[Tuple[float, float]]:
-        """Approximate an SVG arc with line segment points."""
-        if rx == 0 or ry == 0 or start == end:
-            return [end]
-
-        rx = abs(rx)
-        ry = abs(ry)
-
-        phi = math.radians(rotation % 360.0)
-        cos_phi = math.cos(phi)
-        sin_phi = math.sin(phi)
-
-        dx = (start[0] - end[0]) / 2.0
-        dy = (start[1] - end[1]) / 2.0
-        x1p = cos_phi * dx + sin_phi * dy
-        y1p = -sin_phi * dx + cos_phi * dy
-
-        rx2 = rx * rx
-        ry2 = ry * ry
-        x1p2 = x1p * x1p
-        y1p2 = y1p * y1p
-
-        radius_check = x1p2 / rx2 + y1p2 / ry2
-        if radius_check > 1:
-            scale = math.sqrt(radius_check)
-            rx *= scale
-            ry *= scale
-            rx2 = rx * rx
-            ry2 = ry * ry
-
-        numerator = rx2 * ry2 - rx2 * y1p2 - ry2 * x1p2
-        denominator = rx2 * y1p2 + ry2 * x1p2
-        if denominator == 0:
-            return [end]
-
-        factor = math.sqrt(max(0.0, numerator / denominator))
-        if large_arc == sweep:
-            factor = -factor
-
-        cxp = factor * (rx * y1p) / ry
-        cyp = factor * (-ry * x1p) / rx
-
-        cx = cos_phi * cxp - sin_phi * cyp + (start[0] + end[0]) / 2.0
-        cy = sin_phi * cxp + cos_phi * cyp + (start[1] + end[1]) / 2.0
-
-        def _angle(u: Tuple[float, float], v: Tuple[float, float]) -> float:
-            dot = u[0] * v[0] + u[1] * v[1]
-            det = u[0] * v[1] - u[1] * v[0]
-            return math.atan2(det, dot)
-
-        v1 = ((x1p - cxp) / rx, (y1p - cyp) / ry)
-        v2 = ((-x1p - cxp) / rx, (-y1p - cyp) / ry)
-        theta1 = _angle((1.0, 0.0), v1)
-        delta = _angle(v1, v2)
-
-        if not sweep and delta > 0:
-            delta -= 2.0 * math.pi
-        elif sweep and delta < 0:
-            delta += 2.0 * math.pi
-
-        segments = max(1, int(math.ceil(abs(delta) / (math.pi / 8.0))))
-        points: List[Tuple[float, float]] = []
-        for i in range(1, segments + 1):
-            angle = theta1 + delta * (i / segments)
-            cos_angle = math.cos(angle)
-            sin_angle = math.sin(angle)
-            x = cx + rx * cos_phi * cos_angle - ry * sin_phi * sin_angle
-            y = cy + rx * sin_phi * cos_angle + ry * cos_phi * sin_angle
-            points.append((x, y))
-
-        return points
+        """Approximate a single SVG arc with line segment points.
+
+        See flatten_arcs for the batched implementation used by whole paths.
+        """
+        points, _offsets = flatten_arcs(
+            starts=np.array([start]),
+            ends=np.array([end]),
+            radii=np.array([[rx, ry]]),
+            rotations=np.array([rotation]),
+            large_arcs=np.array([large_arc]),
+            sweeps=np.array([sweep]),
+            tolerance=tolerance,
+            max_step=max_step,
+        )
+        return [(x, y) for x, y in points.tolist()]
+
+
+def format_path_arrays(codes: np.ndarray, points: np.ndarray) -> str:
+    """Build a path command string from command codes and points.
+    
+    All coordinates are converted to strings in one NumPy call.
+    
+    Args:
+        codes: Array of shape (K,) with command codes (see COMMAND_CODES).
+        points: Array of shape (N, 2) with the coordinates of all commands.
+        
+    Returns:
+        The path command string.
+        
+    Raises:
+        ValueError: If the number of points does not match the codes.
+    """
+    codes = np.asarray(codes, dtype=np.int64).reshape(-1)
+    values = np.asarray(points, dtype=float).reshape(-1).astype(str).tolist()
+    counts = (2 * _POINTS_PER_CODE[codes]).tolist()
+    if sum(counts) != len(values):
+        raise ValueError(
+            f'Expected {sum(counts) // 2} points for the command codes, '
+            f'got {len(values) // 2}.'
+        )
+
+    parts: List[str] = []
+    index = 0
+    for code, count in zip(codes.tolist(), counts):
+        if count == 0:
+            parts.append(_CODE_LETTERS[code])
+            continue
+        parts.append(_CODE_LETTERS[code] + ' ' + ' '.join(values[index:index + count]))
+        index += count
+    return ' '.join(parts)
+
+
+def _resolve_smooth_commands(commands: List[PathCommand]) -> List[PathCommand]:
+    """Replace absolute S and T commands by C and Q commands with explicit controls."""
+    current: Tuple[float, float] = (0.0, 0.0)
+    subpath_start = current
+    previous_control: Optional[Tuple[float, float]] = None
+    previous_type = ''
+    resolved: List[PathCommand] = []
+
+    for command in commands:
+        command_type = command.type
+        coords = command.coordinates
+        if command_type == 'S':
+            first_control = (
+                _reflect(previous_control, current)
+                if previous_type in ['C', 'S']
+                else current
+            )
+            command = PathCommand('C', [*first_control, *coords])
+        elif command_type == 'T':
+            control = (
+                _reflect(previous_control, current)
+                if previous_type in ['Q', 'T']
+                else current
+            )
+            command = PathCommand('Q', [*control, *coords])
+
+        if command.type == 'C':
+            previous_control = (command.coordinates[2], command.coordinates[3])
+        elif command.type == 'Q':
+            previous_control = (command.coordinates[0], command.coordinates[1])
+
+        if command_type == 'M':
+            subpath_start = (coords[0], coords[1])
+        if command_type == 'Z':
+            current = subpath_start
+        else:
+            current = (coords[-2], coords[-1])
+        previous_type = command_type
+        resolved.append(command)
+
+    return resolved
+
+
+def _flatten_curves(commands: List[PathCommand], tolerance: float) -> List[PathCommand]:
+    """Replace absolute C and Q commands by L commands, flattening curves at once."""
+    current: Tuple[float, float] = (0.0, 0.0)
+    subpath_start = current
+    curves: List[List[Tuple[float, float]]] = []
+    for command in commands:
+        coords = command.coordinates
+        if command.type == 'C':
+            curves.append(
+                [current] + [(coords[i], coords[i + 1]) for i in range(0, 6, 2)]
+            )
+        elif command.type == 'Q':
+            curves.append(
+                _elevate_quadratic(
+                    current, (coords[0], coords[1]), (coords[2], coords[3])
+                )
+            )
+
+        if command.type == 'M':
+            subpath_start = (coords[0], coords[1])
+        if command.type == 'Z':
+            current = subpath_start
+        else:
+            current = (coords[-2], coords[-1])
+
+    if not curves:
+        return commands
+
+    curve_points, offsets = flatten_cubic_beziers(
+        np.array(curves, dtype=float), tolerance
+    )
+    curve_points_list = curve_points.tolist()
+    flattened: List[PathCommand] = []
+    curve_index = 0
+    for command in commands:
+        if command.type not in ['C', 'Q']:
+            flattened.append(command)
+            continue
+        for point in curve_points_list[offsets[curve_index]:offsets[curve_index + 1]]:
+            flattened.append(PathCommand('L', point))
+        curve_index += 1
+    return flattened
+
+
+def _elevate_quadratic(
+    start: Tuple[float, float],
+    control: Tuple[float, float],
+    end: Tuple[float, float]
+) -> List[Tuple[float, float]]:
+    """Get the control points of the cubic curve equal to a quadratic curve."""
+    return [
+        start,
+        _lerp(start, control, 2.0 / 3.0),
+        _lerp(end, control, 2.0 / 3.0),
+        end,
+    ]
+
+
+def _lerp(
+    start: Tuple[float, float], end: Tuple[float, float], fraction: float
+) -> Tuple[float, float]:
+    """Interpolate linearly between two points."""
+    return (
+        start[0] + (end[0] - start[0]) * fraction,
+        start[1] + (end[1] - start[1]) * fraction,
+    )
+
+
+def _reflect(
+    point: Optional[Tuple[float, float]], center: Tuple[float, float]
+) -> Tuple[float, float]:
+    """Reflect a point about a center, returning the center for missing points."""
+    if point is None:
+        return center
+    return (2.0 * center[0] - point[0], 2.0 * center[1] - point[1])
+
+
+def _end_directions(
+    control_points: List[Tuple[float, float]]
+) -> Tuple[Optional[Tuple[float, float]], Optional[Tuple[float, float]]]:
+    """Get the directions into a Bezier curve at its first and last control point."""
+    def direction(points: List[Tuple[float, float]]) -> Optional[Tuple[float, float]]:
+        for point in points[1:]:
+            if point != points[0]:
+                return (point[0] - points[0][0], point[1] - points[0][1])
+        return None
+
+    return direction(control_points), direction(control_points[::-1])
+
+
+def _transformed_direction(
+    transformation: TransformationFunction,
+    point: np.ndarray,
+    direction: Optional[Tuple[float, float]],
+) -> Optional[np.ndarray]:
+    """Map a direction at a point through the transformation by a finite difference."""
+    if direction is None:
+        return None
+    length = math.hypot(direction[0], direction[1])
+    step = 1e-6 * max(1.0, float(np.max(np.abs(point))))
+    x, y = float(point[0]), float(point[1])
+    moved = transformation(
+        (x + step * direction[0] / length, y + step * direction[1] / length)
+    )
+    origin = transformation((x, y))
+    transformed = np.array([moved[0] - origin[0], moved[1] - origin[1]], dtype=float)
+    if not np.any(transformed):
+        return None
+    return transformed
 
 
 class PathCommand:
@@ -428,13 +1043,19 @@ def parse_commands(path_command_string: str) -> List[PathCommand]:
 
 def transform_path_command_string(
     path_command_string: str,
-    transformation: TransformationFunction
+    transformation: TransformationFunction,
+    fit_curves: Optional[float] = None,
+    arc_tolerance: float = DEFAULT_ARC_TOLERANCE
 ) -> str:
     """Transform an SVG path command string by applying a transformation to every point.
     
     Args:
         path_command_string: SVG path command string to transform.
         transformation: Function that transforms (x, y) coordinates.
+        fit_curves: Optional tolerance for refitting transformed curves and
+            arcs with cubic Bezier curves (see Path.transform).
+        arc_tolerance: Maximum distance between an arc and the line segments
+            approximating it.
         
     Returns:
         Transformed SVG path command string.
@@ -443,5 +1064,7 @@ def transform_path_command_string(
         ValueError: If the command string contains invalid commands.
     """
     path = Path.from_command_string(path_command_string)
-    transformed_path = path.transform(transformation)
+    transformed_path = path.transform(
+        transformation, fit_curves=fit_curves, arc_tolerance=arc_tolerance
+    )
     return transformed_path.command_string
@@ -0,0 +1,733 @@
+"""Affine, vectorized and grid-approximated transformations and transform parsing."""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from lxml.etree import ElementBase
+
+from svgecko.geometry import DEFAULT_ARC_TOLERANCE
+from svgecko.svg_path import parse_numbers
+
+_TRANSFORM_FUNCTION_RE = re.compile(
+    r'(?P<func>matrix|translateX|translateY|translate|scaleX|scaleY|scale|rotate'
+    r'|skewX|skewY)\s*\((?P<values>[^)]*)\)'
+)
+_STYLE_TRANSFORM_RE = re.compile(r'(?:^|;)\s*transform\s*:\s*(?P<value>[^;]*)')
+_TRANSLATE_FUNCTION_RE = re.compile(
+    r'(?P<func>translate|translateX|translateY)\((?P<values>[^)]+)\)'
+)
+_GRID_METHODS = ('bilinear', 'bicubic')
+
+
+class AffineTransform:
+    """Affine transformation of the plane given by an SVG matrix(a b c d e f).
+
+    The transformation maps (x, y) to (a * x + c * y + e, b * x + d * y + f).
+    Instances are callable on single points like any other transformation
+    function and additionally transform whole (N, 2) arrays at once.
+
+    Example:
+        >>> rotation = AffineTransform.rotation(90)
+        >>> transformation = rotation @ AffineTransform.translation(1, 0)
+        >>> transformation((0.0, 0.0))
+        (0.0, 1.0)
+    """
+
+    def __init__(
+        self,
+        a: float = 1.0,
+        b: float = 0.0,
+        c: float = 0.0,
+        d: float = 1.0,
+        e: float = 0.0,
+        f: float = 0.0
+    ) -> None:
+        """Initialize the transformation from its six matrix coefficients.
+
+        Args:
+            a, b, c, d: Linear part of the transformation.
+            e, f: Translation part of the transformation.
+        """
+        self._matrix = np.array([[a, c, e], [b, d, f], [0.0, 0.0, 1.0]], dtype=float)
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray) -> AffineTransform:
+        """Create a transformation from a 3x3 homogeneous matrix.
+
+        Args:
+            matrix: Array of shape (3, 3) whose last row is (0, 0, 1).
+
+        Returns:
+            The corresponding AffineTransform.
+        """
+        matrix = np.asarray(matrix, dtype=float)
+        return cls(
+            matrix[0, 0],
+            matrix[1, 0],
+            matrix[0, 1],
+            matrix[1, 1],
+            matrix[0, 2],
+            matrix[1, 2],
+        )
+
+    @classmethod
+    def translation(cls, tx: float, ty: float = 0.0) -> AffineTransform:
+        """Create a translation by (tx, ty)."""
+        return cls(e=tx, f=ty)
+
+    @classmethod
+    def scaling(cls, sx: float, sy: Optional[float] = None) -> AffineTransform:
+        """Create a scaling by sx horizontally and sy (defaults to sx) vertically."""
+        return cls(a=sx, d=sx if sy is None else sy)
+
+    @classmethod
+    def rotation(
+        cls, angle: float, cx: float = 0.0, cy: float = 0.0
+    ) -> AffineTransform:
+        """Create a rotation by angle degrees around the point (cx, cy)."""
+        radians = math.radians(angle)
+        cos_angle = math.cos(radians)
+        sin_angle = math.sin(radians)
+        rotation = cls(cos_angle, sin_angle, -sin_angle, cos_angle)
+        if cx == 0.0 and cy == 0.0:
+            return rotation
+        return cls.translation(cx, cy) @ rotation @ cls.translation(-cx, -cy)
+
+    @classmethod
+    def skew_x(cls, angle: float) -> AffineTransform:
+        """Create a skew along the x axis by angle degrees."""
+        return cls(c=math.tan(math.radians(angle)))
+
+    @classmethod
+    def skew_y(cls, angle: float) -> AffineTransform:
+        """Create a skew along the y axis by angle degrees."""
+        return cls(b=math.tan(math.radians(angle)))
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Get a copy of the 3x3 homogeneous transformation matrix.
+
+        Returns:
+            Array of shape (3, 3).
+        """
+        matrix: np.ndarray = self._matrix.copy()
+        return matrix
+
+    @property
+    def coefficients(self) -> Tuple[float, float, float, float, float, float]:
+        """Get the SVG matrix coefficients (a, b, c, d, e, f)."""
+        m = self._matrix
+        return (
+            float(m[0, 0]),
+            float(m[1, 0]),
+            float(m[0, 1]),
+            float(m[1, 1]),
+            float(m[0, 2]),
+            float(m[1, 2]),
+        )
+
+    @property
+    def is_identity(self) -> bool:
+        """Check whether the transformation leaves every point unchanged."""
+        return bool(np.array_equal(self._matrix, np.eye(3)))
+
+    @property
+    def scale_factors(self) -> Tuple[float, float]:
+        """Get the lengths of the transformed x and y unit vectors."""
+        a, b, c, d, _e, _f = self.coefficients
+        return math.hypot(a, b), math.hypot(c, d)
+
+    def __call__(self, point: Tuple[float, float]) -> Tuple[float, float]:
+        """Transform a single (x, y) point."""
+        a, b, c, d, e, f = self.coefficients
+        x, y = point
+        return (a * x + c * y + e, b * x + d * y + f)
+
+    def transform_points(self, points: np.ndarray) -> np.ndarray:
+        """Transform an array of points at once.
+
+        Args:
+            points: Array of shape (N, 2).
+
+        Returns:
+            Array of shape (N, 2) with the transformed points.
+        """
+        points = np.asarray(points, dtype=float)
+        transformed: np.ndarray = points @ self._matrix[:2, :2].T + self._matrix[:2, 2]
+        return transformed
+
+    def __matmul__(self, other: AffineTransform) -> AffineTransform:
+        """Compose two transformations, applying other first and self second."""
+        return AffineTransform.from_matrix(self._matrix @ other._matrix)
+
+    def inverse(self) -> AffineTransform:
+        """Get the inverse transformation.
+
+        Raises:
+            numpy.linalg.LinAlgError: If the transformation is singular.
+        """
+        return AffineTransform.from_matrix(np.linalg.inv(self._matrix))
+
+    def to_string(self) -> str:
+        """Format the transformation as an SVG matrix() function."""
+        return 'matrix({} {} {} {} {} {})'.format(*self.coefficients)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, AffineTransform):
+            return NotImplemented
+        return bool(np.array_equal(self._matrix, other._matrix))
+
+    def __hash__(self) -> int:
+        return hash(self.coefficients)
+
+    def __repr__(self) -> str:
+        return 'AffineTransform({}, {}, {}, {}, {}, {})'.format(*self.coefficients)
+
+
+class VectorizedTransformation:
+    """Transformation defined by a function on whole (N, 2) point arrays.
+
+    Instances are callable on single points like any other transformation
+    function, while bulk code paths (e.g., SVG.transform) pass all points of
+    a document to the wrapped function at once.
+
+    Example:
+        >>> wave = VectorizedTransformation(lambda p: p + np.sin(p[:, ::-1]))
+        >>> svg.transform(wave)
+    """
+
+    def __init__(self, function: Callable[[np.ndarray], np.ndarray]) -> None:
+        """Initialize from an array function.
+
+        Args:
+            function: Function mapping an array of shape (N, 2) to an array
+                of shape (N, 2).
+        """
+        self._function = function
+
+    @property
+    def function(self) -> Callable[[np.ndarray], np.ndarray]:
+        """Get the wrapped array function."""
+        return self._function
+
+    def __call__(self, point: Tuple[float, float]) -> Tuple[float, float]:
+        """Transform a single (x, y) point."""
+        x, y = self.transform_points(np.array([point], dtype=float))[0].tolist()
+        return (x, y)
+
+    def transform_points(self, points: np.ndarray) -> np.ndarray:
+        """Transform an array of points at once.
+
+        Args:
+            points: Array of shape (N, 2).
+
+        Returns:
+            Array of shape (N, 2) with the transformed points.
+        """
+        return np.asarray(
+            self._function(np.asarray(points, dtype=float)), dtype=float
+        ).reshape(-1, 2)
+
+
+def vectorized(
+    function: Callable[[np.ndarray], np.ndarray]
+) -> VectorizedTransformation:
+    """Decorator marking a function on (N, 2) arrays as a transformation.
+
+    Args:
+        function: Function mapping an array of shape (N, 2) to an array of
+            shape (N, 2).
+
+    Returns:
+        A VectorizedTransformation wrapping the function.
+    """
+    return VectorizedTransformation(function)
+
+
+class TransformationChain:
+    """Transformations applied one after another, evaluated on whole point arrays.
+
+    Every step transforms the array produced by the previous one (see
+    transform_points), so vectorized steps never fall back to single
+    points and nothing is formatted or parsed between the steps.
+    """
+
+    def __init__(
+        self, steps: Sequence[Callable[[Tuple[float, float]], Tuple[float, float]]]
+    ) -> None:
+        """Initialize from the steps.
+
+        Args:
+            steps: Transformations in the order they are applied.
+        """
+        self._steps = tuple(steps)
+
+    @property
+    def steps(self) -> Tuple[Callable[[Tuple[float, float]], Tuple[float, float]], ...]:
+        """Get the transformations in the order they are applied."""
+        return self._steps
+
+    def __call__(self, point: Tuple[float, float]) -> Tuple[float, float]:
+        """Transform a single (x, y) point."""
+        x, y = self.transform_points(np.array([point], dtype=float))[0].tolist()
+        return (x, y)
+
+    def transform_points(self, points: np.ndarray) -> np.ndarray:
+        """Transform an array of points by all steps.
+
+        Args:
+            points: Array of shape (N, 2).
+
+        Returns:
+            Array of shape (N, 2) with the transformed points.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        for step in self._steps:
+            points = transform_points(step, points)
+        return points
+
+
+def chain_transformations(
+    transformations: Iterable[Callable[[Tuple[float, float]], Tuple[float, float]]]
+) -> Callable[[Tuple[float, float]], Tuple[float, float]]:
+    """Compose transformations applied one after another into one transformation.
+
+    Consecutive AffineTransforms are fused into a single matrix. If only one
+    step remains, it is returned as is (an AffineTransform for purely affine
+    chains); otherwise the steps are wrapped in a TransformationChain.
+
+    Args:
+        transformations: Transformations in the order they are applied.
+
+    Returns:
+        The composed transformation; the identity AffineTransform if no
+        transformations are given.
+    """
+    steps: List[Callable[[Tuple[float, float]], Tuple[float, float]]] = []
+    for transformation in transformations:
+        if isinstance(transformation, TransformationChain):
+            candidates = transformation.steps
+        else:
+            candidates = (transformation,)
+        for candidate in candidates:
+            if (
+                isinstance(candidate, AffineTransform)
+                and steps
+                and isinstance(steps[-1], AffineTransform)
+            ):
+                steps[-1] = candidate @ steps[-1]
+            else:
+                steps.append(candidate)
+
+    if not steps:
+        return AffineTransform()
+    if len(steps) == 1:
+        return steps[0]
+    return TransformationChain(steps)
+
+
+class GridApproximation:
+    """Transformation interpolated from samples on a regular grid.
+
+    The wrapped transformation is evaluated once at the nodes of a grid
+    over a bounding box; every transformed point is then interpolated from
+    the neighbouring nodes with vectorized NumPy code, so expensive
+    transformations cost a fixed number of calls regardless of the number
+    of points. Bilinear and bicubic (Catmull-Rom) interpolation reproduce
+    affine transformations exactly. Points outside the bounding box are
+    extrapolated from the border cells.
+
+    Example:
+        >>> approximation = GridApproximation.from_svg(
+        ...     projection, svg, resolution=128, method='bicubic'
+        ... )
+        >>> approximation.max_error
+        0.0021
+        >>> svg.transform(approximation)
+    """
+
+    def __init__(
+        self,
+        transformation: Callable[[Tuple[float, float]], Tuple[float, float]],
+        bbox: Tuple[float, float, float, float],
+        resolution: Union[int, Tuple[int, int]] = 64,
+        method: str = 'bilinear'
+    ) -> None:
+        """Sample a transformation on a grid.
+
+        Args:
+            transformation: The transformation to approximate. Vectorized
+                transformations are evaluated at all nodes at once.
+            bbox: (x_min, y_min, x_max, y_max) of the approximated region.
+            resolution: Number of grid cells along both axes, or a tuple
+                (cells along x, cells along y). Defaults to 64.
+            method: 'bilinear' or 'bicubic'. Defaults to 'bilinear'.
+
+        Raises:
+            ValueError: If the method is unknown, the bounding box is empty
+                or the resolution is not positive.
+        """
+        if method not in _GRID_METHODS:
+            raise ValueError(f'Unknown interpolation method: {method}')
+        x_min, y_min, x_max, y_max = (float(value) for value in bbox)
+        if not (x_max > x_min and y_max > y_min):
+            raise ValueError(f'Invalid bounding box: {bbox}')
+        columns, rows = (
+            (resolution, resolution) if isinstance(resolution, int) else resolution
+        )
+        if columns < 1 or rows < 1:
+            raise ValueError(f'Invalid resolution: {resolution}')
+
+        self._transformation = transformation
+        self._bbox = (x_min, y_min, x_max, y_max)
+        self._resolution = (int(columns), int(rows))
+        self._method = method
+        self._cell_size = ((x_max - x_min) / columns, (y_max - y_min) / rows)
+        self._max_error: Optional[float] = None
+
+        # Bicubic interpolation needs one ring of nodes outside the bounding box
+        padding = 1 if method == 'bicubic' else 0
+        xs = x_min + np.arange(-padding, columns + padding + 1) * self._cell_size[0]
+        ys = y_min + np.arange(-padding, rows + padding + 1) * self._cell_size[1]
+        nodes = np.stack(np.meshgrid(xs, ys), axis=-1)
+        self._values = transform_points(transformation, nodes.reshape(-1, 2)).reshape(
+            nodes.shape
+        )
+
+    @classmethod
+    def from_svg(
+        cls,
+        transformation: Callable[[Tuple[float, float]], Tuple[float, float]],
+        svg: Any,
+        resolution: Union[int, Tuple[int, int]] = 64,
+        method: str = 'bilinear',
+        arc_tolerance: float = DEFAULT_ARC_TOLERANCE
+    ) -> GridApproximation:
+        """Sample a transformation on a grid over the coordinates of a document.
+
+        Args:
+            transformation: The transformation to approximate.
+            svg: The SVG object whose coordinates (in the element coordinate
+                systems the transformation is applied in) the grid covers.
+            resolution: Number of grid cells (see __init__). Defaults to 64.
+            method: 'bilinear' or 'bicubic'. Defaults to 'bilinear'.
+            arc_tolerance: Maximum deviation of the flattened arcs whose
+                points are covered. Defaults to DEFAULT_ARC_TOLERANCE.
+
+        Returns:
+            The GridApproximation.
+
+        Raises:
+            ValueError: If the document has no coordinates.
+        """
+        from svgecko.coordinates import DocumentCoordinates
+
+        points = DocumentCoordinates.from_element(svg._xml, arc_tolerance).points
+        if len(points) == 0:
+            raise ValueError(
+                'The document has no coordinates to approximate the transformation '
+                'over.'
+            )
+        lower = points.min(axis=0)
+        upper = points.max(axis=0)
+        # Widen degenerate extents, e.g., of a single vertical line
+        padding = np.where(upper > lower, 0.0, 0.5)
+        return cls(
+            transformation,
+            (*(lower - padding).tolist(), *(upper + padding).tolist()),
+            resolution,
+            method,
+        )
+
+    @property
+    def bbox(self) -> Tuple[float, float, float, float]:
+        """Get (x_min, y_min, x_max, y_max) of the grid."""
+        return self._bbox
+
+    @property
+    def resolution(self) -> Tuple[int, int]:
+        """Get the number of grid cells along x and y."""
+        return self._resolution
+
+    @property
+    def method(self) -> str:
+        """Get the interpolation method."""
+        return self._method
+
+    @property
+    def max_error(self) -> float:
+        """Estimate the maximum distance between approximation and transformation.
+
+        The transformation is evaluated at the center of every grid cell,
+        where interpolation errors are largest, once on first access.
+        """
+        if self._max_error is None:
+            x_min, y_min = self._bbox[:2]
+            columns, rows = self._resolution
+            xs = x_min + (np.arange(columns) + 0.5) * self._cell_size[0]
+            ys = y_min + (np.arange(rows) + 0.5) * self._cell_size[1]
+            centers = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)
+            exact = transform_points(self._transformation, centers)
+            self._max_error = float(
+                np.max(np.linalg.norm(self.transform_points(centers) - exact, axis=1))
+            )
+        return self._max_error
+
+    def __call__(self, point: Tuple[float, float]) -> Tuple[float, float]:
+        """Transform a single (x, y) point."""
+        x, y = self.transform_points(np.array([point], dtype=float))[0].tolist()
+        return (x, y)
+
+    def transform_points(self, points: np.ndarray) -> np.ndarray:
+        """Interpolate the transformation at an array of points.
+
+        Args:
+            points: Array of shape (N, 2).
+
+        Returns:
+            Array of shape (N, 2) with the transformed points.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        grid = (points - self._bbox[:2]) / self._cell_size
+        cells = np.clip(np.floor(grid), 0, np.array(self._resolution) - 1).astype(int)
+        fractions = grid - cells
+        columns, rows = cells[:, 0], cells[:, 1]
+        if self._method == 'bilinear':
+            u, v = fractions[:, :1], fractions[:, 1:]
+            values = self._values
+            top = (1.0 - u) * values[rows, columns] + u * values[rows, columns + 1]
+            bottom = (1.0 - u) * values[rows + 1, columns] + u * values[
+                rows + 1, columns + 1
+            ]
+            interpolated: np.ndarray = (1.0 - v) * top + v * bottom
+            return interpolated
+
+        x_weights = _catmull_rom_weights(fractions[:, 0])
+        y_weights = _catmull_rom_weights(fractions[:, 1])
+        result = np.zeros_like(points)
+        for j in range(4):
+            for k in range(4):
+                weights = (y_weights[:, j] * x_weights[:, k])[:, np.newaxis]
+                result += weights * self._values[rows + j, columns + k]
+        return result
+
+
+def _catmull_rom_weights(t: np.ndarray) -> np.ndarray:
+    """Weights of the four nodes around fractional positions t (Catmull-Rom)."""
+    t2 = t * t
+    t3 = t2 * t
+    return 0.5 * np.stack([
+        -t3 + 2.0 * t2 - t,
+        3.0 * t3 - 5.0 * t2 + 2.0,
+        -3.0 * t3 + 4.0 * t2 + t,
+        t3 - t2,
+    ], axis=1)
+
+
+def is_vectorized(transformation: Any) -> bool:
+    """Check whether a transformation can transform whole point arrays."""
+    return callable(getattr(transformation, 'transform_points', None))
+
+
+def transform_points(
+    transformation: Callable[[Tuple[float, float]], Tuple[float, float]],
+    points: np.ndarray,
+) -> np.ndarray:
+    """Apply any transformation to an array of points.
+
+    Vectorized transformations (AffineTransform, VectorizedTransformation or
+    any object with a transform_points method) process the array at once;
+    plain functions are called once per point.
+
+    Args:
+        transformation: The transformation to apply.
+        points: Array of shape (N, 2).
+
+    Returns:
+        Array of shape (N, 2) with the transformed points.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if is_vectorized(transformation):
+        transformed = getattr(transformation, 'transform_points')(points)
+    else:
+        transformed = [transformation((x, y)) for x, y in points.tolist()]
+    transformed_points: np.ndarray = np.asarray(transformed, dtype=float).reshape(-1, 2)
+    return transformed_points
+
+
+def parse_transform_list(value: str) -> AffineTransform:
+    """Parse an SVG transform attribute or CSS transform value.
+
+    Supports matrix, translate, translateX, translateY, scale, scaleX, scaleY,
+    rotate (with optional center), skewX and skewY. Functions are composed
+    from left to right as defined by SVG. Unknown functions are ignored.
+
+    Args:
+        value: Transform list (e.g., "translate(10 20) rotate(45)").
+
+    Returns:
+        The composed AffineTransform.
+
+    Raises:
+        ValueError: If a function has the wrong number of arguments.
+    """
+    result = AffineTransform()
+    for match in _TRANSFORM_FUNCTION_RE.finditer(value or ''):
+        function_name = match.group('func')
+        values = parse_numbers(match.group('values'))
+        result = result @ _transform_function(function_name, values)
+    return result
+
+
+def _transform_function(function_name: str, values: Iterable[float]) -> AffineTransform:
+    """Create the transformation of a single transform-list function."""
+    values = list(values)
+    counts = {
+        'matrix': (6,),
+        'translate': (1, 2),
+        'translateX': (1,),
+        'translateY': (1,),
+        'scale': (1, 2),
+        'scaleX': (1,),
+        'scaleY': (1,),
+        'rotate': (1, 3),
+        'skewX': (1,),
+        'skewY': (1,),
+    }
+    if len(values) not in counts[function_name]:
+        raise ValueError(f'Invalid argument count for {function_name}: {values}')
+
+    if function_name == 'matrix':
+        return AffineTransform(*values)
+    if function_name == 'translate':
+        return AffineTransform.translation(
+            values[0], values[1] if len(values) > 1 else 0.0
+        )
+    if function_name == 'translateX':
+        return AffineTransform.translation(values[0], 0.0)
+    if function_name == 'translateY':
+        return AffineTransform.translation(0.0, values[0])
+    if function_name == 'scale':
+        return AffineTransform.scaling(
+            values[0], values[1] if len(values) > 1 else None
+        )
+    if function_name == 'scaleX':
+        return AffineTransform.scaling(values[0], 1.0)
+    if function_name == 'scaleY':
+        return AffineTransform.scaling(1.0, values[0])
+    if function_name == 'rotate':
+        return AffineTransform.rotation(*values)
+    if function_name == 'skewX':
+        return AffineTransform.skew_x(values[0])
+    return AffineTransform.skew_y(values[0])
+
+
+def local_transform(element: ElementBase) -> AffineTransform:
+    """Get the transformation an element applies to its own coordinate system.
+
+    Combines the transform attribute with a transform declaration in the
+    style attribute (applied after the attribute).
+
+    Args:
+        element: The XML element.
+
+    Returns:
+        The element's local AffineTransform.
+    """
+    transformation = parse_transform_list(element.attrib.get('transform', ''))
+    style_match = _STYLE_TRANSFORM_RE.search(element.attrib.get('style', ''))
+    if style_match:
+        transformation = transformation @ parse_transform_list(
+            style_match.group('value')
+        )
+    return transformation
+
+
+def compute_ctms(root: ElementBase) -> Dict[ElementBase, AffineTransform]:
+    """Compute the cumulative transformation matrix (CTM) of every element.
+
+    The tree is traversed once; each element's CTM is its parent's CTM
+    composed with its own local transformation.
+
+    Args:
+        root: Root element of the document.
+
+    Returns:
+        Mapping from element to the transformation from the element's
+        coordinate system to the root coordinate system.
+    """
+    ctms: Dict[ElementBase, AffineTransform] = {root: local_transform(root)}
+    stack = [root]
+    while stack:
+        parent = stack.pop()
+        parent_ctm = ctms[parent]
+        for child in parent:
+            if not isinstance(child.tag, str):
+                continue
+            has_transform = (
+                'transform' in child.attrib
+                or 'transform' in child.attrib.get('style', '')
+            )
+            ctms[child] = (
+                parent_ctm @ local_transform(child) if has_transform else parent_ctm
+            )
+            stack.append(child)
+    return ctms
+
+
+def remove_style_transform(style: str) -> str:
+    """Remove transform declarations from a CSS style string.
+
+    Args:
+        style: CSS style string (e.g., "fill: red; transform: rotate(45)").
+
+    Returns:
+        The style string without transform declarations.
+    """
+    declarations = [
+        declaration for declaration in style.split(';') if declaration.strip()
+    ]
+    kept = [
+        declaration
+        for declaration in declarations
+        if declaration.split(':', 1)[0].strip() != 'transform'
+    ]
+    return ';'.join(kept)
+
+
+def transform_translate_functions(
+    value: str, transformation: Callable[[Tuple[float, float]], Tuple[float, float]]
+) -> str:
+    """Transform the translate() functions of a style or transform value.
+
+    Args:
+        value: Attribute value that may contain translate(), translateX() or
+            translateY() functions.
+        transformation: The transformation applied to each translation.
+
+    Returns:
+        The value with every translation replaced by its transformed
+        translate(x, y) function.
+    """
+
+    def transform_translate(match: re.Match[str]) -> str:
+        values = parse_numbers(match.group('values'))
+        if not values:
+            return match.group(0)
+
+        function_name = match.group('func')
+        if function_name == 'translate':
+            x, y = values[0], values[1] if len(values) > 1 else 0.0
+        elif function_name == 'translateX':
+            x, y = values[0], 0.0
+        else:
+            x, y = 0.0, values[0]
+
+        transformed_x, transformed_y = transformation((x, y))
+        return f'translate({transformed_x}, {transformed_y})'
+
+    return _TRANSLATE_FUNCTION_RE.sub(transform_translate, value)
@@ -0,0 +1,237 @@
+"""Tests for the batch module."""
+
+import numpy as np
+import pytest
+
+from svgecko.batch import (
+    DocumentScan,
+    pipeline_files,
+    scan,
+    schedule,
+    transform_batch,
+    transform_files,
+    transform_path_command_strings,
+)
+from svgecko.svg import SVG
+from svgecko.svg_path import parse_numbers, transform_path_command_string
+from svgecko.transformations import AffineTransform, vectorized
+from svgecko.utils import CROSS_PATH, PYTHON_LOGO_PATH, load_python_logo
+
+
+def _write_svg(path, svg_string: str) -> str:
+    path.write_text(svg_string, encoding='utf-8')
+    return str(path)
+
+
+def test_scan_cross():
+    """Test size estimates of a small document."""
+    document_scan = scan(str(CROSS_PATH))
+    assert document_scan.element_count == 2
+    assert document_scan.point_count == 6
+    assert document_scan.arc_count == 0
+    assert (document_scan.width, document_scan.height) == (5.0, 5.0)
+    assert document_scan.path_data_bytes == len(
+        'M2 1 H3 V2 H4 V3 H3 V4 H2 V3 H1 V2 H2 Z'
+    )
+
+
+def test_scan_svgz(tmp_path):
+    """Test scanning of compressed files."""
+    file_path = tmp_path / 'logo.svgz'
+    SVG.from_file(str(PYTHON_LOGO_PATH)).to_file(str(file_path))
+    assert scan(str(file_path))[2:] == scan(str(PYTHON_LOGO_PATH))[2:]
+
+
+def test_schedule_largest_first():
+    """Test that the most expensive documents are scheduled first."""
+    scans = [
+        DocumentScan('small', 10, 1, 0, 1, 0, None, None),
+        DocumentScan('large', 10, 1, 0, 100, 0, None, None),
+        DocumentScan('arcs', 10, 1, 0, 10, 10, None, None),
+    ]
+    assert schedule(scans) == [2, 1, 0]
+
+
+@pytest.mark.parametrize('split_points', [None, 1])
+def test_transform_files(tmp_path, split_points):
+    """Test transforming files with and without splitting documents."""
+    svg_string = """<svg viewBox="0 0 5 5" xmlns="http://www.w3.org/2000/svg">
+    <path d="M0 0 L1 1" /><path d="M2 2 L3 3" /><circle cx="1" cy="1" r="1" />
+    </svg>"""
+    input_paths = [_write_svg(tmp_path / 'first.svg', svg_string), str(CROSS_PATH)]
+    output_paths = [str(tmp_path / 'first-out.svg'), str(tmp_path / 'cross-out.svg')]
+    transformation = AffineTransform.translation(1, 1)
+
+    scans = transform_files(input_paths, output_paths, transformation, max_workers=2,
+                            max_in_flight_bytes=1, split_points=split_points)
+
+    assert [document_scan.path for document_scan in scans] == input_paths
+    transformed = SVG.from_file(output_paths[0])
+    assert [path.attrib['d'] for path in transformed.xml.xpath('//*[@d]')] == [
+        'M 1.0 1.0 L 2.0 2.0', 'M 3.0 3.0 L 4.0 4.0'
+    ]
+    assert transformed.xml.xpath('//*[@cx]')[0].attrib['cx'] == '2.0'
+    expected = SVG.from_file(str(CROSS_PATH)).transform(transformation)
+    assert SVG.from_file(output_paths[1]).to_string() == expected.to_string()
+
+
+@pytest.mark.parametrize('split_points', [None, 1])
+def test_transform_files_select(tmp_path, split_points):
+    """Only path data inside the selection is transformed, also in split documents."""
+    svg_string = """<svg viewBox="0 0 5 5" xmlns="http://www.w3.org/2000/svg">
+    <g id="a"><path d="M0 0 L1 1" /></g><g id="b"><path d="M2 2 L3 3" /></g>
+    <path d="M4 4 L5 5" />
+    </svg>"""
+    input_paths = [_write_svg(tmp_path / 'groups.svg', svg_string)]
+    output_paths = [str(tmp_path / 'groups-out.svg')]
+
+    transform_files(
+        input_paths,
+        output_paths,
+        AffineTransform.translation(1, 1),
+        max_workers=1,
+        split_points=split_points,
+        select=['a'],
+        simplify=0.1,
+    )
+
+    transformed = SVG.from_file(output_paths[0])
+    assert [path.attrib['d'] for path in transformed.xml.xpath('//*[@d]')] == [
+        'M 1.0 1.0 L 2.0 2.0', 'M2 2 L3 3', 'M4 4 L5 5'
+    ]
+
+
+@pytest.mark.parametrize('split_points', [None, 1])
+def test_transform_files_cull(tmp_path, split_points):
+    """Paths moved out of the viewport are culled, also when documents are split."""
+    svg_string = """<svg width="10" height="10" xmlns="http://www.w3.org/2000/svg">
+    <path id="a" d="M0 0 L1 1" /><path id="b" d="M-20 0 L-19 1" />
+    </svg>"""
+    input_paths = [_write_svg(tmp_path / 'paths.svg', svg_string)]
+    output_paths = [str(tmp_path / 'paths-out.svg')]
+
+    transform_files(input_paths, output_paths, AffineTransform.translation(20, 0),
+                    max_workers=1, split_points=split_points, cull=True)
+
+    transformed = SVG.from_file(output_paths[0])
+    assert [path.get('id') for path in transformed.xml.xpath('//*[@d]')] == ['b']
+
+
+def test_transform_files_budgets_split_documents(tmp_path, monkeypatch):
+    """Split documents are scheduled against the memory budget like whole documents."""
+    import svgecko.batch
+
+    tasks = []
+    run_bounded = svgecko.batch._run_bounded
+
+    def record(executor, bounded_tasks, submit, max_in_flight_bytes):
+        tasks.extend(bounded_tasks)
+        run_bounded(executor, bounded_tasks, submit, max_in_flight_bytes)
+
+    monkeypatch.setattr(svgecko.batch, '_run_bounded', record)
+    input_paths = [str(CROSS_PATH), str(PYTHON_LOGO_PATH)]
+    output_paths = [str(tmp_path / 'cross-out.svg'), str(tmp_path / 'logo-out.svg')]
+    scans = transform_files(
+        input_paths,
+        output_paths,
+        AffineTransform.translation(1, 1),
+        max_workers=2,
+        max_in_flight_bytes=1,
+        split_points=10,
+    )
+
+    assert sorted(index for index, _memory in tasks) == [0, 1]
+    assert dict(tasks)[1] == scans[1].memory
+    expected = (
+        load_python_logo()
+        .transform(AffineTransform.translation(1, 1))
+        .xml.xpath('//*[@d]')
+    )
+    transformed = SVG.from_file(output_paths[1]).xml.xpath('//*[@d]')
+    for element, expected_element in zip(transformed, expected):
+        assert parse_numbers(element.attrib['d']) == pytest.approx(
+            parse_numbers(expected_element.attrib['d'])
+        )
+
+
+def test_transform_files_mismatched_paths():
+    """Test that input and output paths must match."""
+    with pytest.raises(ValueError):
+        transform_files([str(CROSS_PATH)], [], AffineTransform())
+
+
+def test_pipeline_files(tmp_path):
+    """Test the threaded pipeline with queues smaller than the batch."""
+    input_paths = [str(CROSS_PATH), str(PYTHON_LOGO_PATH)] * 3
+    output_paths = [
+        str(tmp_path / f'out-{index}.svg') for index in range(len(input_paths))
+    ]
+    transformation = AffineTransform.scaling(2)
+
+    pipeline_files(
+        input_paths,
+        output_paths,
+        transformation,
+        parse_threads=2,
+        transform_threads=3,
+        write_threads=2,
+        queue_size=1,
+    )
+
+    for input_path, output_path in zip(input_paths, output_paths):
+        expected = SVG.from_file(input_path).transform(transformation)
+        assert SVG.from_file(output_path).to_string() == expected.to_string()
+
+
+def test_pipeline_files_propagates_errors(tmp_path):
+    """Test that a failing document raises after the pipeline drained."""
+    input_paths = [str(CROSS_PATH), str(tmp_path / 'missing.svg'), str(CROSS_PATH)]
+    output_paths = [
+        str(tmp_path / f'out-{index}.svg') for index in range(len(input_paths))
+    ]
+    with pytest.raises(OSError):
+        pipeline_files(input_paths, output_paths, AffineTransform(), queue_size=1)
+    with pytest.raises(ValueError):
+        pipeline_files(input_paths, output_paths, AffineTransform(), write_threads=0)
+
+
+def test_transform_batch():
+    """All documents are transformed with one call of a vectorized transformation."""
+    calls = []
+
+    @vectorized
+    def shift(points):
+        calls.append(len(points))
+        return points + [1.0, 2.0]
+
+    svgs = [load_python_logo(), SVG.from_file(str(CROSS_PATH)), load_python_logo()]
+    originals = [svg.to_string() for svg in svgs]
+    results = transform_batch(svgs, shift)
+    assert len(calls) == 1
+    assert [svg.to_string() for svg in svgs] == originals
+    for svg, result in zip(svgs, results):
+        assert result is not svg
+        assert result.to_string() == svg.transform(shift).to_string()
+
+    inplace = transform_batch(svgs[:1], AffineTransform.translation(1, 0), inplace=True)
+    assert inplace[0] is svgs[0]
+    assert svgs[0].to_string() != originals[0]
+    assert transform_batch([], shift) == []
+
+
+def test_transform_path_command_strings():
+    """Batched path strings match transforming them one by one."""
+    path_strings = [
+        'M 0 0 L 10 10 A 5 5 0 0 1 20 0 Z',
+        'm 1 1 h 3 v 3 s 1 1 2 2 t 4 4',
+        '',
+    ]
+    transformation = AffineTransform.rotation(30)
+    transformed = transform_path_command_strings(path_strings, transformation)
+    assert len(transformed) == 3
+    for path_string, result in zip(path_strings, transformed):
+        expected = transform_path_command_string(path_string, transformation)
+        assert [token for token in result.split() if token.isalpha()] == [
+            token for token in expected.split() if token.isalpha()
+        ]
+        assert np.allclose(parse_numbers(result), parse_numbers(expected))
@@ -0,0 +1,118 @@
+"""Tests for the cache module."""
+
+import os
+
+import pytest
+
+from svgecko.batch import pipeline_files, transform_files
+from svgecko.cache import TransformCache, fingerprint_transformation
+from svgecko.svg import SVG
+from svgecko.transformations import AffineTransform
+from svgecko.utils import CROSS_PATH, load_python_logo
+
+
+def test_fingerprint_transformation():
+    """Affine transforms are fingerprinted by value, other callables need a version."""
+    assert fingerprint_transformation(
+        AffineTransform.scaling(2)
+    ) == fingerprint_transformation(AffineTransform(2, 0, 0, 2, 0, 0))
+    assert fingerprint_transformation(lambda point: point, 'v1') == 'user:v1'
+    with pytest.raises(ValueError):
+        fingerprint_transformation(lambda point: point)
+
+
+def test_cache_keys_depend_on_all_inputs(tmp_path):
+    """Keys change with the input, the transformation and the options."""
+    cache = TransformCache(str(tmp_path))
+    transformation = AffineTransform.translation(1, 1)
+    key = cache.key(b'<svg/>', transformation, simplify=None)
+    assert key == cache.key(b'<svg/>', AffineTransform.translation(1, 1), simplify=None)
+    assert key != cache.key(b'<svg />', transformation, simplify=None)
+    assert key != cache.key(b'<svg/>', AffineTransform.translation(1, 2), simplify=None)
+    assert key != cache.key(b'<svg/>', transformation, simplify=0.1)
+
+
+def test_cache_lru_eviction(tmp_path):
+    """The least recently used entries are evicted beyond max_bytes."""
+    cache = TransformCache(str(tmp_path), max_bytes=20)
+    cache.put('aa01', b'0123456789')
+    cache.put('bb02', b'0123456789')
+    os.utime(cache._entry_path('aa01'), (1, 1))
+    os.utime(cache._entry_path('bb02'), (2, 2))
+    assert cache.get('aa01') == b'0123456789'
+    cache.put('cc03', b'0123456789')
+    assert cache.get('bb02') is None
+    assert cache.get('aa01') is not None and cache.get('cc03') is not None
+    assert cache.size == 20
+    cache.clear()
+    assert cache.size == 0
+
+
+def test_svg_transform_cache(tmp_path):
+    """A cache hit returns the stored document without transforming."""
+    cache = TransformCache(str(tmp_path))
+    svg = load_python_logo()
+    calls = []
+
+    def shift(point):
+        calls.append(point)
+        return point[0] + 1, point[1]
+
+    first = svg.transform(shift, cache=cache, fingerprint='shift-v1')
+    call_count = len(calls)
+    second = svg.transform(shift, cache=cache, fingerprint='shift-v1')
+    assert len(calls) == call_count
+    assert second.to_string() == first.to_string()
+    with pytest.raises(ValueError):
+        svg.transform(shift, cache=cache)
+
+
+@pytest.mark.parametrize('run', [transform_files, pipeline_files])
+def test_batch_cache(tmp_path, run):
+    """Batch functions restore cached outputs and store new ones."""
+    cache = TransformCache(str(tmp_path / 'cache'))
+    output_path = str(tmp_path / 'out.svgz')
+    transformation = AffineTransform.scaling(3)
+
+    run([str(CROSS_PATH)], [output_path], transformation, cache=cache)
+    expected = SVG.from_file(str(CROSS_PATH)).transform(transformation).to_string()
+    assert SVG.from_file(output_path).to_string() == expected
+    assert cache.size > 0
+
+    os.remove(output_path)
+    run([str(CROSS_PATH)], [output_path], transformation, cache=cache)
+    assert SVG.from_file(output_path).to_string() == expected
+
+
+def test_transform_files_scans_cache_misses_only(tmp_path, monkeypatch):
+    """Inputs whose outputs are restored from the cache are not scanned."""
+    import svgecko.batch
+
+    cache = TransformCache(str(tmp_path / 'cache'))
+    input_paths = [str(CROSS_PATH), str(CROSS_PATH)]
+    output_paths = [str(tmp_path / 'first.svg'), str(tmp_path / 'second.svgz')]
+    transformation = AffineTransform.scaling(3)
+    transform_files(input_paths[:1], output_paths[:1], transformation, cache=cache)
+
+    scanned = []
+    scan = svgecko.batch.scan
+    monkeypatch.setattr(
+        svgecko.batch, 'scan', lambda path: scanned.append(path) or scan(path)
+    )
+    scans = transform_files(input_paths, output_paths, transformation, cache=cache)
+    assert scans[0] is None and scans[1] is not None
+    assert scanned == [str(CROSS_PATH)]
+
+
+def test_cache_tracks_size_between_puts(tmp_path, monkeypatch):
+    """Puts below the size limit do not list the cache directory."""
+    cache = TransformCache(str(tmp_path), max_bytes=25)
+    cache.put('aa01', b'0123456789')
+    listings = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, '_entries', lambda: listings.append(1) or entries())
+    cache.put('aa01', b'01234')
+    cache.put('bb02', b'0123456789')
+    assert listings == []
+    cache.put('cc03', b'01234567890123456789')
+    assert len(listings) == 1 and cache.size <= 25
@@ -0,0 +1,63 @@
+"""Tests for the coordinates module."""
+
+import numpy as np
+from lxml import etree
+
+from svgecko.coordinates import DocumentCoordinates, format_path_data
+
+SVG_TEXT = (
+    '<svg xmlns="http://www.w3.org/2000/svg">'
+    '<path d="M 0 0 l 10 0 Z"/>'
+    '<rect x="1" y="2" width="3" height="4"/>'
+    '<polygon points="0,0 5,0 5,5"/>'
+    '<g transform="translate(7, 8)"/>'
+    '</svg>'
+)
+
+
+def test_document_coordinates_extraction():
+    """All transformable coordinates are collected in document order."""
+    coordinates = DocumentCoordinates.from_element(etree.fromstring(SVG_TEXT))
+    assert coordinates.points.tolist() == [
+        [0.0, 0.0], [10.0, 0.0],
+        [1.0, 2.0],
+        [0.0, 0.0], [5.0, 0.0], [5.0, 5.0],
+        [7.0, 8.0],
+    ]
+    assert [slot.kind for slot in coordinates.slots] == [
+        'd',
+        'xy',
+        'points',
+        'transform',
+    ]
+
+
+def test_document_coordinates_apply():
+    """Transformed points are written back into the document."""
+    root = etree.fromstring(SVG_TEXT)
+    coordinates = DocumentCoordinates.from_element(root)
+    coordinates.apply(root, coordinates.points + 1.0)
+    path, rect, polygon, group = root
+    assert path.attrib['d'] == 'M 1.0 1.0 L 11.0 1.0 Z'
+    assert (rect.attrib['x'], rect.attrib['y']) == ('2.0', '3.0')
+    assert rect.attrib['width'] == '3'
+    assert polygon.attrib['points'] == '1.0,1.0 6.0,1.0 6.0,6.0'
+    assert group.attrib['transform'] == 'translate(8.0, 9.0)'
+
+
+def test_format_path_data():
+    """Command letters and points are joined into path data."""
+    points = np.array([[0.0, 0.0], [1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+    assert format_path_data('MCZ', points) == 'M 0.0 0.0 C 1.0 2.0 3.0 4.0 5.0 6.0 Z'
+
+
+def test_document_coordinates_serialize_many():
+    """Every set of points is serialized like a document it was applied to."""
+    root = etree.fromstring(SVG_TEXT)
+    coordinates = DocumentCoordinates.from_element(root)
+    batch = [coordinates.points + offset for offset in (1.0, -2.5)]
+    for points, serialized in zip(batch, coordinates.serialize_many(root, batch)):
+        expected = etree.fromstring(SVG_TEXT)
+        coordinates.apply(expected, points)
+        assert serialized == etree.tostring(expected, encoding='utf-8')
+    assert etree.tostring(root) == etree.tostring(etree.fromstring(SVG_TEXT))
@@ -0,0 +1,66 @@
+"""Tests for the dataset module."""
+
+import numpy as np
+import pytest
+
+from svgecko.dataset import augmented_batches, sample_generator
+from svgecko.transformations import AffineTransform
+from svgecko.utils import CROSS_PATH, load_python_logo
+
+
+def _require_cairosvg() -> None:
+    try:
+        import cairosvg  # noqa: F401
+    except (ModuleNotFoundError, OSError):
+        pytest.skip('cairosvg is required for rendering tests')
+
+
+def _random_rotation(generator: np.random.Generator) -> AffineTransform:
+    return AffineTransform.rotation(
+        float(generator.uniform(0.0, 360.0)), cx=50.0, cy=50.0
+    )
+
+
+def test_sample_generator_is_reproducible():
+    """Sample generators depend only on the seed and the sample index."""
+    assert sample_generator(3, 5).random() == sample_generator(3, 5).random()
+    assert sample_generator(3, 5).random() != sample_generator(3, 6).random()
+    assert sample_generator(3, 5).random() != sample_generator(4, 5).random()
+
+
+def test_augmented_batches_validation():
+    """Invalid arguments are rejected before any worker starts."""
+    with pytest.raises(ValueError):
+        next(augmented_batches([], _random_rotation, 2, (8, 8)))
+    with pytest.raises(ValueError):
+        next(augmented_batches([load_python_logo()], _random_rotation, 0, (8, 8)))
+    with pytest.raises(ValueError):
+        next(
+            augmented_batches(
+                [load_python_logo()], _random_rotation, 2, (8, 8), channels=2
+            )
+        )
+
+
+def test_augmented_batches_are_reproducible():
+    """Batches have the requested shape and do not depend on the worker count."""
+    _require_cairosvg()
+    sources = [load_python_logo(), str(CROSS_PATH)]
+    first = list(
+        augmented_batches(
+            sources, _random_rotation, 3, (16, 12), num_batches=2, seed=7, max_workers=1
+        )
+    )
+    second = list(
+        augmented_batches(
+            sources, _random_rotation, 3, (16, 12), num_batches=2, seed=7, max_workers=3
+        )
+    )
+    assert len(first) == 2
+    assert first[0].shape == (3, 16, 12, 4) and first[0].dtype == np.uint8
+    for first_batch, second_batch in zip(first, second):
+        assert np.array_equal(first_batch, second_batch)
+    rgb = next(
+        augmented_batches(sources, _random_rotation, 2, (16, 12), seed=7, channels=3)
+    )
+    assert rgb.shape == (2, 16, 12, 3)
@@ -0,0 +1,174 @@
+"""Tests for the geometry module."""
+
+import math
+
+import numpy as np
+import pytest
+
+from svgecko.geometry import (
+    ArcLengthTable,
+    arc_center_parameters,
+    cubic_bezier_points,
+    douglas_peucker_mask,
+    fit_cubic_beziers,
+    flatten_arcs,
+    flatten_cubic_beziers,
+    point_segment_distances,
+    simplify_polyline,
+)
+
+
+def test_point_segment_distances():
+    """Test distances to a segment including beyond its end points."""
+    points = np.array([[5.0, 3.0], [-4.0, 3.0], [13.0, 4.0]])
+    distances = point_segment_distances(
+        points, np.array([0.0, 0.0]), np.array([10.0, 0.0])
+    )
+    assert np.allclose(distances, [3.0, 5.0, 5.0])
+
+
+def test_douglas_peucker_mask_drops_collinear_vertices():
+    """Collinear vertices are dropped, corners are kept."""
+    points = np.array([[0, 0], [1, 0], [2, 0], [2, 1], [2, 2]], dtype=float)
+    mask = douglas_peucker_mask(points, tolerance=0.01)
+    assert mask.tolist() == [True, False, True, False, True]
+
+
+def test_simplify_polyline_closed():
+    """Closed polygons keep their corners and drop edge midpoints."""
+    square = np.array([[0, 0], [1, 0], [2, 0], [2, 2], [0, 2]], dtype=float)
+    simplified = simplify_polyline(square, tolerance=0.01, closed=True)
+    assert simplified.tolist() == [[0, 0], [2, 0], [2, 2], [0, 2]]
+
+
+def test_fit_cubic_beziers_recovers_single_curve():
+    """Samples of one cubic curve are fitted by a single curve."""
+    control_points = np.array([[0, 0], [0, 10], [10, 10], [10, 0]], dtype=float)
+    samples = cubic_bezier_points(control_points, np.linspace(0.0, 1.0, 16))
+    beziers = fit_cubic_beziers(
+        samples,
+        tolerance=1e-3,
+        left_tangent=np.array([0.0, 1.0]),
+        right_tangent=np.array([0.0, 1.0]),
+    )
+    assert len(beziers) == 1
+    assert np.allclose(beziers[0], control_points, atol=1e-2)
+
+
+def test_fit_cubic_beziers_within_tolerance():
+    """A sampled circle is fitted within the tolerance by a few curves."""
+    angles = np.linspace(0.0, 2.0 * np.pi, 64)
+    samples = np.column_stack([np.cos(angles), np.sin(angles)]) * 10.0
+    beziers = fit_cubic_beziers(samples, tolerance=0.01)
+    assert 2 <= len(beziers) <= 8
+    assert np.allclose(beziers[0][0], samples[0])
+    assert np.allclose(beziers[-1][-1], samples[-1])
+    fitted = np.vstack(
+        [cubic_bezier_points(bezier, np.linspace(0.0, 1.0, 50)) for bezier in beziers]
+    )
+    assert np.allclose(np.hypot(fitted[:, 0], fitted[:, 1]), 10.0, atol=0.05)
+
+
+def test_flatten_arcs_batch():
+    """Several arcs are flattened at once within the tolerance."""
+    points, offsets = flatten_arcs(
+        starts=np.array([[10.0, 0.0], [0.0, 0.0], [1.0, 1.0]]),
+        ends=np.array([[-10.0, 0.0], [0.0, 4.0], [1.0, 1.0]]),
+        radii=np.array([[10.0, 10.0], [2.0, 2.0], [5.0, 5.0]]),
+        rotations=np.zeros(3),
+        large_arcs=np.array([False, False, False]),
+        sweeps=np.array([True, False, True]),
+        tolerance=0.01,
+    )
+    assert offsets[0] == 0 and offsets[-1] == len(points)
+    assert offsets[-1] - offsets[-2] == 1
+    assert points[offsets[1] - 1].tolist() == [-10.0, 0.0]
+    assert points[offsets[2] - 1].tolist() == [0.0, 4.0]
+    assert points[-1].tolist() == [1.0, 1.0]
+
+    first_arc = np.vstack([[10.0, 0.0], points[:offsets[1]]])
+    assert np.allclose(np.hypot(first_arc[:, 0], first_arc[:, 1]), 10.0)
+    assert np.all(first_arc[:, 1] >= -1e-9)
+    chord_midpoints = (first_arc[1:] + first_arc[:-1]) / 2.0
+    assert np.all(10.0 - np.hypot(chord_midpoints[:, 0], chord_midpoints[:, 1]) <= 0.01)
+
+
+def test_flatten_arcs_segment_count_depends_on_radius():
+    """Larger arcs need more segments for the same tolerance."""
+    def segment_count(radius):
+        _points, offsets = flatten_arcs(
+            np.array([[radius, 0.0]]),
+            np.array([[-radius, 0.0]]),
+            np.array([[radius, radius]]),
+            np.zeros(1),
+            np.array([False]),
+            np.array([True]),
+            tolerance=0.05,
+        )
+        return offsets[1]
+
+    assert segment_count(1.0) < segment_count(10.0) < segment_count(100.0)
+
+
+def test_arc_center_parameters():
+    """Test the center parameterization of a half circle."""
+    centers, radii, phi, theta1, delta, degenerate = arc_center_parameters(
+        np.array([[0.0, 0.0]]), np.array([[10.0, 0.0]]), np.array([[5.0, 5.0]]),
+        np.array([0.0]), np.array([False]), np.array([True]),
+    )
+    assert np.allclose(centers, [[5.0, 0.0]])
+    assert np.allclose(radii, [[5.0, 5.0]])
+    assert np.allclose([theta1[0], delta[0]], [math.pi, math.pi])
+    assert not degenerate[0]
+
+
+def test_arc_length_table():
+    """Test lengths and uniform lookups of a Bezier curve and an arc."""
+    controls = np.zeros((2, 4, 2))
+    controls[0] = [[0.0, 0.0], [1.0, 0.0], [2.0, 0.0], [3.0, 0.0]]
+    arcs = np.zeros((2, 7))
+    arcs[1] = [3.0, 1.0, 1.0, 1.0, 0.0, -math.pi / 2, math.pi]
+    table = ArcLengthTable(controls, arcs, np.array([False, True]))
+    assert table.length == pytest.approx(3.0 + math.pi)
+    assert np.allclose(table.segment_lengths, [3.0, math.pi])
+    points = table.points_at(np.array([1.5, 3.0 + math.pi / 2, 100.0]))
+    assert np.allclose(points, [[1.5, 0.0], [4.0, 1.0], [3.0, 2.0]])
+
+
+def test_arc_length_table_uneven_parameterization():
+    """Points at equal distances are equally spaced on a curved cubic."""
+    controls = np.array([[[0.0, 0.0], [0.0, 10.0], [1.0, 10.0], [10.0, 0.0]]])
+    table = ArcLengthTable(controls, np.zeros((1, 7)), np.array([False]))
+    samples = np.linspace(0.0, table.length, 201)
+    points = table.points_at(samples)
+    dense = cubic_bezier_points(controls[0], np.linspace(0.0, 1.0, 100001))
+    assert table.length == pytest.approx(
+        np.sum(np.linalg.norm(np.diff(dense, axis=0), axis=1)), rel=1e-6
+    )
+    spacing = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    assert np.allclose(spacing, table.length / 200, rtol=1e-3)
+
+
+def test_flatten_cubic_beziers():
+    """Flattened curves stay within the tolerance and end at their end points."""
+    controls = np.array([
+        [[0.0, 0.0], [0.0, 10.0], [10.0, 10.0], [10.0, 0.0]],
+        [[0.0, 0.0], [1.0, 0.0], [2.0, 0.0], [3.0, 0.0]],
+    ])
+    points, offsets = flatten_cubic_beziers(controls, 0.01)
+    assert offsets[0] == 0 and offsets[-1] == len(points)
+    assert offsets[2] - offsets[1] == 1
+    assert np.array_equal(points[offsets[1:] - 1], controls[:, 3])
+
+    chords = np.concatenate([controls[0, :1], points[offsets[0]:offsets[1]]])
+    dense = cubic_bezier_points(controls[0], np.linspace(0.0, 1.0, 2001))
+    distances = np.min(
+        [
+            point_segment_distances(dense, start, end)
+            for start, end in zip(chords[:-1], chords[1:])
+        ],
+        axis=0,
+    )
+    assert np.max(distances) <= 0.01
+    with pytest.raises(ValueError):
+        flatten_cubic_beziers(controls, 0.0)
@@ -0,0 +1,87 @@
+"""Tests for the geometry_cache module."""
+
+import numpy as np
+import pytest
+
+from svgecko.geometry_cache import GeometryCache
+from svgecko.svg import SVG
+from svgecko.transformations import AffineTransform
+
+SVG_STRING = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="20" height="20">'
+    '<path id="a" d="M 1 2 L 3 4 A 2 2 0 0 1 7 4 Z"/>'
+    '<g><path id="b" d="m 5 5 c 1 1 2 1 3 0 s 1 -1 2 0"/></g>'
+    '</svg>'
+)
+
+
+@pytest.fixture
+def svg_file(tmp_path):
+    file_path = tmp_path / 'drawing.svg'
+    file_path.write_text(SVG_STRING)
+    return file_path
+
+
+def test_geometry_cache_round_trip(svg_file, tmp_path):
+    """Documents loaded with a geometry cache transform like uncached documents."""
+    cache_path = str(tmp_path / 'drawing.geometry')
+    SVG.from_file(str(svg_file)).save_geometry_cache(cache_path)
+
+    svg = SVG.from_file(str(svg_file), geometry_cache=cache_path)
+    assert isinstance(svg._geometry_cache.points, np.memmap)
+
+    expected = SVG.from_file(str(svg_file))
+    transformation = AffineTransform.rotation(30)
+    assert (
+        svg.transform(transformation).to_string()
+        == expected.transform(transformation).to_string()
+    )
+    assert svg.transform(lambda p: (p[0] + p[1], p[1])).to_string() == (
+        expected.transform(lambda p: (p[0] + p[1], p[1])).to_string()
+    )
+
+
+def test_geometry_cache_invalidation(svg_file, tmp_path):
+    """Sidecars of changed or different files are ignored."""
+    cache_path = str(tmp_path / 'drawing.geometry')
+    SVG.from_file(str(svg_file)).save_geometry_cache(cache_path)
+
+    svg_file.write_text(SVG_STRING.replace('M 1 2', 'M 1 3'))
+    assert (
+        SVG.from_file(str(svg_file), geometry_cache=cache_path)._geometry_cache is None
+    )
+    assert (
+        SVG.from_file(
+            str(svg_file), geometry_cache=str(tmp_path / 'missing')
+        )._geometry_cache
+        is None
+    )
+
+    (tmp_path / 'corrupt').write_bytes(b'not a geometry cache')
+    assert (
+        SVG.from_file(
+            str(svg_file), geometry_cache=str(tmp_path / 'corrupt')
+        )._geometry_cache
+        is None
+    )
+
+
+def test_geometry_cache_lookup():
+    """Entries are only used for unchanged path data and the same arc tolerance."""
+    svg = SVG.from_string(SVG_STRING)
+    cache = GeometryCache.from_element(svg.xml, arc_tolerance=0.1)
+    letters, points = cache.lookup(1, 'M 1 2 L 3 4 A 2 2 0 0 1 7 4 Z', 0.1)
+    assert letters[:2] == 'ML' and letters[-1] == 'Z'
+    assert points[:2].tolist() == [[1, 2], [3, 4]]
+
+    assert cache.lookup(1, 'M 1 2 L 3 4 A 2 2 0 0 1 7 4 Z', 0.2) is None
+    assert cache.lookup(1, 'M 0 0', 0.1) is None
+    assert cache.lookup(2, 'M 0 0', 0.1) is None
+
+
+def test_save_geometry_cache_requires_file(tmp_path):
+    """Only SVGs loaded from a file can save a sidecar."""
+    with pytest.raises(ValueError):
+        SVG.from_string(SVG_STRING).save_geometry_cache(
+            str(tmp_path / 'drawing.geometry')
+        )
@@ -0,0 +1,96 @@
+"""Tests for the hit_test module."""
+
+import numpy as np
+import pytest
+
+from svgecko.hit_test import HitTestIndex
+from svgecko.svg import SVG
+
+SVG_STRING = (
+    '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">'
+    '<defs><path id="unused" d="M 0 0 H 100 V 100 H 0 Z"/></defs>'
+    '<path id="ring" d="M 10 10 H 90 V 90 H 10 Z M 30 30 H 70 V 70 H 30 Z"/>'
+    '<path id="frame" fill-rule="evenodd" transform="translate(60 60)"'
+    ' d="M 0 0 H 30 V 30 H 0 Z M 5 5 H 25 V 25 H 5 Z"/>'
+    '<g transform="scale(2)"><polygon id="triangle" points="40 0 50 0 50 10"/></g>'
+    '<path id="half-disk" d="M 0 50 A 5 5 0 0 1 10 50 Z"/>'
+    '<path d="M 0 95 L 5 95 L 5 100 Z L 0 90 L 2 90 Z"/>'
+    '</svg>'
+)
+
+
+def test_hit_test():
+    """Points resolve to the topmost containing element in root coordinates."""
+    svg = SVG.from_string(SVG_STRING)
+    points = np.array(
+        [
+            [5, 5],
+            [20, 20],
+            [50, 50],
+            [62, 62],
+            [75, 75],
+            [95, 5],
+            [5, 48],
+            [5, 52],
+            [1, 91],
+            [500, 0],
+        ]
+    )
+    assert svg.hit_test(points) == [
+        None,
+        'ring',
+        'ring',
+        'frame',
+        'ring',
+        'triangle',
+        'half-disk',
+        None,
+        None,
+        None,
+    ]
+    assert svg.hit_test(points, fill_rule='evenodd')[2] is None
+    assert svg.hit_test(np.zeros((0, 2))) == []
+
+
+def test_hit_test_index_rows():
+    """Queries return rows into the indexed elements, -1 for misses."""
+    svg = SVG.from_string(SVG_STRING)
+    index = HitTestIndex.from_element(svg.xml)
+    assert index.ids == ['ring', 'frame', 'triangle', 'half-disk', None]
+    rows = index.query(np.array([[1.0, 91.0], [1.0, 94.0], [200.0, 200.0]]))
+    assert rows.tolist() == [4, -1, -1]
+    assert index.element_indices[4] == 8
+
+    with pytest.raises(ValueError):
+        index.query(np.zeros((3, 3)))
+    with pytest.raises(ValueError):
+        index.query(np.zeros((3, 2)), fill_rule='winding')
+
+
+def test_hit_test_after_modification():
+    """The cached index is rebuilt after the tree is modified."""
+    svg = SVG.from_string(SVG_STRING)
+    assert svg.hit_test(np.array([[20.0, 20.0]])) == ['ring']
+    svg.xml.xpath('//*[@id="ring"]')[0].set('transform', 'translate(200 0)')
+    assert svg.hit_test(np.array([[20.0, 20.0]])) == [None]
+
+    shifted = SVG.from_string(SVG_STRING).transform(lambda p: (p[0] + 100, p[1]))
+    assert shifted.hit_test(np.array([[20.0, 20.0], [120.0, 20.0]])) == [None, 'ring']
+
+
+def test_hit_test_nested_viewports_and_empty_documents():
+    """Nested <svg> viewports are applied; documents without outlines hit nothing."""
+    svg = SVG.from_string(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="200" height="100">'
+        '<svg x="100"><path id="a" d="M0 0H10V10H0Z"/></svg>'
+        '<svg x="150" width="10" height="10" viewBox="0 0 100 100">'
+        '<path id="b" d="M0 0H100V100H0Z"/></svg></svg>'
+    )
+    assert svg.hit_test(np.array([[105, 5], [5, 5], [155, 5], [155, 50]])) == [
+        'a', None, 'b', None,
+    ]
+
+    empty = SVG.from_string(
+        '<svg xmlns="http://www.w3.org/2000/svg"><rect width="10" height="10"/></svg>'
+    )
+    assert empty.hit_test(np.array([[5.0, 5.0], [50.0, 50.0]])) == [None, None]
@@ -0,0 +1,26 @@
+"""Tests for the parallel module."""
+
+import numpy as np
+
+from svgecko.parallel import transform_points_shared
+from svgecko.transformations import AffineTransform
+
+
+def _double(point):
+    return point[0] * 2, point[1] * 2
+
+
+def test_transform_points_shared():
+    """Workers transform all slices of the shared buffer."""
+    points = np.arange(20, dtype=float).reshape(-1, 2)
+    transformation = AffineTransform.translation(1, -1)
+    result = transform_points_shared(points, transformation, processes=3)
+    assert np.allclose(result, points + [1, -1])
+    assert np.allclose(
+        transform_points_shared(points, _double, processes=2), points * 2
+    )
+
+
+def test_transform_points_shared_empty():
+    """An empty array needs no workers."""
+    assert transform_points_shared(np.empty((0, 2)), _double).shape == (0, 2)
@@ -0,0 +1,223 @@
+"""Tests for the render module."""
+
+import numpy as np
+import pytest
+from lxml import etree
+
+from svgecko.render import (
+    cull_elements,
+    element_bounding_boxes,
+    rasterize_into,
+    tile_boxes,
+    tile_document,
+    viewport_ctms,
+    viewport_transform,
+)
+from svgecko.transformations import AffineTransform
+from svgecko.svg import SVG
+from svgecko.utils import load_python_logo
+
+SVG_TEXT = """<svg xmlns="http://www.w3.org/2000/svg"
+    width="200" height="100" viewBox="0 0 100 50">
+    <rect x="0" y="0" width="10" height="10" stroke-width="4"/>
+    <g transform="translate(80, 0)"><circle cx="5" cy="5" r="5"/></g>
+    <path d="M 0 40 L 10 40" style="marker-end: url(#arrow)"/>
+    <defs><path d="M 90 40 L 100 40"/></defs>
+</svg>"""
+
+
+def _require_cairosvg() -> None:
+    try:
+        import cairosvg  # noqa: F401
+    except (ModuleNotFoundError, OSError):
+        pytest.skip('cairosvg is required for rendering tests')
+
+
+def test_tile_boxes_cover_image():
+    """Tiles cover the image exactly, with smaller tiles at the edges."""
+    assert tile_boxes(5, 3, 2) == [
+        (0, 0, 2, 2), (2, 0, 4, 2), (4, 0, 5, 2),
+        (0, 2, 2, 3), (2, 2, 4, 3), (4, 2, 5, 3),
+    ]
+
+
+def test_viewport_transform():
+    """viewBox and preserveAspectRatio map user units to pixels."""
+    root = etree.fromstring(SVG_TEXT)
+    assert viewport_transform(root, 200, 100)((10.0, 10.0)) == (20.0, 20.0)
+    root.set('viewBox', '0 0 100 100')
+    assert viewport_transform(root, 200, 100)((0.0, 0.0)) == (50.0, 0.0)
+    root.set('preserveAspectRatio', 'none')
+    assert viewport_transform(root, 200, 100)((100.0, 100.0)) == (200.0, 100.0)
+
+
+def test_element_bounding_boxes():
+    """Boxes include transforms and strokes; unsafe elements are never culled."""
+    root = etree.fromstring(SVG_TEXT)
+    boxes = element_bounding_boxes(root, 200, 100, margin=0.0)
+    elements = list(root.iter(etree.Element))
+    box_by_tag = {
+        etree.QName(element).localname: box for element, box in zip(elements, boxes)
+    }
+    assert box_by_tag['rect'].tolist() == [-4.0, -4.0, 24.0, 24.0]
+    assert box_by_tag['circle'].tolist() == [159.0, -1.0, 181.0, 21.0]
+    assert np.isnan(box_by_tag['svg']).all()
+    assert np.isnan(
+        boxes[[index for index, element in enumerate(elements) if element.get('style')]]
+    ).all()
+    assert np.isnan(boxes[-1]).all()
+
+
+def test_tile_document_culls_outside_elements():
+    """A tile document keeps the elements intersecting the tile only."""
+    root = etree.fromstring(SVG_TEXT)
+    boxes = element_bounding_boxes(root, 200, 100)
+    tile = tile_document(root, (200, 100), (100, 0, 200, 50), boxes)
+    assert tile.get('viewBox') == '100 0 100 50'
+    inner = tile[0]
+    assert (inner.get('width'), inner.get('height')) == ('200', '100')
+    tags = [etree.QName(element).localname for element in inner.iter(etree.Element)]
+    assert 'rect' not in tags
+    assert tags.count('path') == 2 and 'circle' in tags
+
+
+def test_tile_document_keeps_nested_viewport_and_used_content():
+    """Tiles map nested <svg> content through its viewport and keep used elements."""
+    svg = SVG.from_string(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">'
+        '<rect id="shape" x="10" y="10" width="20" height="20"/></svg>'
+    )
+    composed = SVG.compose([svg, svg], layout=[(0, 0), (100, 0)], deduplicate=False)
+    root = composed.xml
+    boxes = element_bounding_boxes(root, 200, 100)
+    tile = tile_document(root, (200, 100), (100, 0, 200, 100), boxes)
+    assert len(list(tile.iter('{*}rect'))) == 1
+
+    root = etree.fromstring(
+        '<svg xmlns="http://www.w3.org/2000/svg"'
+        ' xmlns:xlink="http://www.w3.org/1999/xlink" width="100" height="100">'
+        '<rect id="used" x="0" y="0" width="10" height="10"/>'
+        '<use xlink:href="#used" x="80" y="80"/></svg>'
+    )
+    boxes = element_bounding_boxes(root, 100, 100)
+    tile = tile_document(root, (100, 100), (50, 50, 100, 100), boxes)
+    assert tile.find('.//{*}rect') is not None
+
+
+def test_cull_elements():
+    """Elements outside the viewport are culled unless referenced or uncullable."""
+    root = etree.fromstring(
+        '<svg xmlns="http://www.w3.org/2000/svg"'
+        ' xmlns:xlink="http://www.w3.org/1999/xlink" width="100" height="100">'
+        '<rect id="inside" x="10" y="10" width="10" height="10"/>'
+        '<rect id="outside" x="150" y="10" width="10" height="10"/>'
+        '<rect id="margin" x="101" y="10" width="10" height="10" stroke-width="0"/>'
+        '<path id="referenced" d="M 200 200 L 210 210"/>'
+        '<use xlink:href="#referenced" x="-200" y="-200"/>'
+        '<text x="500" y="500">label</text>'
+        '</svg>'
+    )
+    hidden = etree.fromstring(etree.tostring(root))
+    assert cull_elements(root, 100, 100) == 1
+    assert [element.get('id') for element in root.iter('{*}rect')] == [
+        'inside',
+        'margin',
+    ]
+    assert root.find('{*}text') is not None
+
+    assert cull_elements(hidden, 100, 100, margin=0, mode='hide') == 2
+    assert [element.get('display') for element in hidden.iter('{*}rect')] == [
+        None,
+        'none',
+        'none',
+    ]
+    with pytest.raises(ValueError):
+        cull_elements(root, 100, 100, mode='clip')
+
+
+@pytest.mark.parametrize('nested', [
+    '<svg x="-100" width="200" height="50"><rect x="120" width="5" height="5"/></svg>',
+    '<svg width="50" height="50" viewBox="0 0 500 500">'
+    '<rect x="300" y="300" width="100" height="100"/></svg>',
+])
+def test_cull_elements_keeps_nested_viewport_content(nested):
+    """Content mapped into the viewport by a nested <svg> is not culled."""
+    root = etree.fromstring(
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="50" height="50">{nested}</svg>'
+    )
+    assert cull_elements(root, 50, 50) == 0
+    assert root.find('.//{*}rect') is not None
+
+
+def test_cull_elements_composed_document():
+    """Only content outside the viewport of a composed document is culled."""
+    svg = SVG.from_string(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">'
+        '<rect x="10" y="10" width="20" height="20"/></svg>'
+    )
+    composed = SVG.compose([svg, svg], layout=[(0, 0), (300, 0)], deduplicate=False)
+    composed.xml.set('viewBox', '250 0 150 100')
+    assert cull_elements(composed.xml, 150, 100) == 1
+    assert composed.xml[1].find('{*}rect') is not None
+
+
+def test_tiled_rendering_matches_full_rendering():
+    """Stitched tiles equal a rendering in one piece."""
+    _require_cairosvg()
+    svg = load_python_logo()
+    full = np.asarray(svg.to_pil_image(scale=2).convert('RGBA'))
+    tiled = np.asarray(svg.to_pil_image(scale=2, tile_size=64, max_workers=2))
+    assert tiled.shape == full.shape
+    assert np.abs(tiled.astype(int) - full.astype(int)).max() <= 1
+
+
+def test_tiled_rendering_scales_documents_without_view_box():
+    """Tiles of a document sized by width and height only are scaled."""
+    _require_cairosvg()
+    svg = SVG.from_string(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">'
+        '<rect x="10" y="20" width="50" height="30" fill="#00ff00"/></svg>'
+    )
+    full = np.asarray(svg.to_pil_image(scale=2).convert('RGBA'))
+    tiled = np.asarray(svg.to_pil_image(scale=2, tile_size=64, max_workers=2))
+    assert tiled.shape == full.shape == (200, 200, 4)
+    assert np.abs(tiled.astype(int) - full.astype(int)).max() <= 1
+
+
+def test_tile_document_scales_documents_without_view_box():
+    """Tile documents map user units to output pixels like the full rendering."""
+    root = etree.fromstring(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">'
+        '<rect x="10" y="20" width="50" height="30"/></svg>'
+    )
+    tile = tile_document(root, (200, 200), (0, 0, 100, 100))
+    rect = tile.find('.//{*}rect')
+    assert viewport_ctms(tile)[rect] == AffineTransform.scaling(2.0)
+    boxes = element_bounding_boxes(root, 200, 200, margin=0.0)
+    assert np.allclose(boxes[1], [19, 39, 121, 101])
+
+
+def test_tiled_rendering_rejects_output_size():
+    """Tiled rendering is sized by scale only."""
+    with pytest.raises(ValueError):
+        SVG.from_string(SVG_TEXT).to_pil_image(tile_size=64, width=10)
+
+
+def test_rasterize_into():
+    """Pixels are written into RGBA and RGB arrays of the requested size."""
+    with pytest.raises(ValueError):
+        rasterize_into(b'<svg/>', np.zeros((4, 4, 2), dtype=np.uint8))
+    _require_cairosvg()
+    document = (
+        b'<svg xmlns="http://www.w3.org/2000/svg" width="4" height="2">'
+        b'<rect x="0" y="0" width="2" height="2" fill="#ff0000" fill-opacity="0.5"/>'
+        b'</svg>'
+    )
+    rgba = np.full((2, 4, 4), 7, dtype=np.uint8)
+    rasterize_into(document, rgba)
+    assert np.allclose(rgba[0, 0], [255, 0, 0, 128], atol=2)
+    assert rgba[0, 3].tolist() == [0, 0, 0, 0]
+    rgb = np.zeros((2, 4, 3), dtype=np.uint8)
+    rasterize_into(document, rgb)
+    assert np.allclose(rgb[0, 0], [255, 127, 127], atol=2)
+    assert rgb[0, 3].tolist() == [255, 255, 255]
@@ -0,0 +1,48 @@
+"""Tests for the selection module."""
+
+import pytest
+from lxml import etree
+
+from svgecko.selection import css_to_xpath, select_elements
+
+SVG_TEXT = (
+    '<svg xmlns="http://www.w3.org/2000/svg">'
+    '<g id="roads"><path class="major road" d="M 0 0"/>'
+    '<g id="minor"><path class="road" d="M 1 1"/></g></g>'
+    '<rect id="frame" fill="red"/>'
+    '</svg>'
+)
+
+
+def _ids(elements):
+    return [element.get('id') or element.get('class') for element in elements]
+
+
+@pytest.mark.parametrize('select, expected', [
+    ('g#roads', ['roads']),
+    ('g', ['roads']),
+    ('.road', ['major road', 'road']),
+    ('#roads > path', ['major road']),
+    ('#roads path.road', ['major road', 'road']),
+    ('rect[fill="red"], #minor', ['minor', 'frame']),
+    ('//svg:g[@id="minor"]', ['minor']),
+    (['frame', 'roads'], ['roads', 'frame']),
+])
+def test_select_elements(select, expected):
+    """XPath, CSS and id selections return the outermost matching elements."""
+    root = etree.fromstring(SVG_TEXT)
+    assert _ids(select_elements(root, select)) == expected
+
+
+@pytest.mark.parametrize(
+    'select', ['g ~ path', 'svg|g', 'count(//*)', ['missing'], 'circle', '//svg:line']
+)
+def test_select_elements_invalid(select):
+    """Unsupported selectors, empty matches and unknown ids raise ValueError."""
+    with pytest.raises(ValueError):
+        select_elements(etree.fromstring(SVG_TEXT), select)
+
+
+def test_css_to_xpath_quotes():
+    """Attribute values containing quotes are quoted for XPath."""
+    assert css_to_xpath('[title="it\'s"]') == 'descendant-or-self::*[@title="it\'s"]'
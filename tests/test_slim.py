@@ -0,0 +1,74 @@
+"""Tests for the slim module."""
+
+import gzip
+
+import pytest
+from lxml import etree
+
+from svgecko.slim import (
+    SLIM_CATEGORIES,
+    slim_categories,
+    slim_parser,
+    strip_non_rendering,
+)
+from svgecko.svg import SVG
+
+INKSCAPE_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" '
+    'xmlns:sodipodi="http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd" '
+    'xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape" '
+    'xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" sodipodi:docname="a.svg">'
+    '<!-- exported --><?editor state?>'
+    '<metadata><rdf:RDF><rdf:Description/></rdf:RDF></metadata>'
+    '<sodipodi:namedview id="view" inkscape:zoom="2"/>'
+    '<g inkscape:label="Layer" inkscape:groupmode="layer" id="layer">'
+    '<path d="M 0 0 L 1 1"/></g>'
+    '</svg>'
+)
+
+
+def test_slim_categories():
+    """Test resolving slim options."""
+    assert slim_categories(False) == frozenset()
+    assert slim_categories(None) == frozenset()
+    assert slim_categories(True) == frozenset(SLIM_CATEGORIES)
+    assert slim_categories(['metadata']) == {'metadata'}
+    assert slim_categories('comments') == {'comments'}
+    with pytest.raises(ValueError):
+        slim_categories(['thumbnails'])
+
+
+def test_strip_non_rendering():
+    """Metadata and editor content is removed together with unused namespaces."""
+    categories = slim_categories(True)
+    root = etree.fromstring(INKSCAPE_SVG.encode('utf-8'), slim_parser(categories))
+    strip_non_rendering(root, categories)
+    assert etree.tostring(root, encoding='unicode') == (
+        '<svg xmlns="http://www.w3.org/2000/svg">'
+        '<g id="layer"><path d="M 0 0 L 1 1"/></g></svg>'
+    )
+
+
+def test_strip_selected_categories():
+    """Only the requested categories are removed."""
+    svg = SVG.from_string(INKSCAPE_SVG, slim=['editor'])
+    serialized = svg.to_string()
+    assert '<metadata>' in serialized and '<!-- exported -->' in serialized
+    assert 'inkscape' not in serialized and 'sodipodi' not in serialized
+
+    svg = SVG.from_string(INKSCAPE_SVG, slim=['comments', 'metadata'])
+    serialized = svg.to_string()
+    assert 'metadata' not in serialized and 'exported' not in serialized
+    assert '<?editor state?>' in serialized and 'inkscape:label' in serialized
+
+
+def test_slim_from_file(tmp_path):
+    """Plain and compressed files are slimmed while loading."""
+    svg_path = tmp_path / 'drawing.svg'
+    svg_path.write_text(INKSCAPE_SVG)
+    svgz_path = tmp_path / 'drawing.svgz'
+    svgz_path.write_bytes(gzip.compress(INKSCAPE_SVG.encode('utf-8')))
+    expected = SVG.from_string(INKSCAPE_SVG, slim=True).to_string()
+    assert SVG.from_file(str(svg_path), slim=True).to_string() == expected
+    assert SVG.from_file(str(svgz_path), slim=True).to_string() == expected
+    assert 'sodipodi' in SVG.from_file(str(svgz_path)).to_string()
@@ -5,8 +5,11 @@ import re
 
 import numpy as np
 import pytest
+from lxml import etree
 
 from svgecko.svg import SVG
+from svgecko.svg_path import parse_numbers
+from svgecko.transformations import AffineTransform
 from svgecko.utils import load_python_logo, CROSS_PATH
 
 
@@ -17,7 +20,7 @@ def _replace_whitespaces_with_space(string: str) -> str:
 def _require_cairosvg() -> None:
     try:
         import cairosvg  # noqa: F401
-    except ModuleNotFoundError:
+    except (ModuleNotFoundError, OSError):
         pytest.skip("cairosvg is required for rasterization tests")
 
 
@@ -387,3 +390,477 @@ def test_non_inplace_transform():
     # Should be different objects
     assert id(transformed_svg) != id(svg)
     assert transformed_svg is not svg
+
+
+def test_transform_with_simplify():
+    """Test simplification of paths and polygons after transformation."""
+    svg_string = """
+    <svg viewBox="0 0 10 10" xmlns="http://www.w3.org/2000/svg">
+        <path d="M0 0 L1 0 L2 0 L2 2" />
+        <polygon points="0,0 1,0 2,0 2,2 0,2" />
+    </svg>
+    """
+    svg = SVG.from_string(svg_string)
+    transformation = lambda point: (point[0] + 1, point[1] + 1)
+    transformed_svg = svg.transform(transformation, simplify=0.01)
+
+    path = transformed_svg.xml.xpath('//*[@d]')[0]
+    assert path.attrib['d'] == 'M 1.0 1.0 L 3.0 1.0 L 3.0 3.0'
+    polygon = transformed_svg.xml.xpath('//*[@points]')[0]
+    assert polygon.attrib['points'] == '1.0,1.0 3.0,1.0 3.0,3.0 1.0,3.0'
+
+
+def test_transform_with_fit_curves():
+    """Test refitting of arcs with cubic curves."""
+    svg_string = """
+    <svg viewBox="0 0 10 10" xmlns="http://www.w3.org/2000/svg">
+    <path d="M5 5 A2 2 0 0 1 9 5" />
+    </svg>
+    """
+    svg = SVG.from_string(svg_string)
+    transformation = lambda point: (point[0] + 1, point[1] + 1)
+    transformed_svg = svg.transform(transformation, fit_curves=0.01)
+
+    path_d = transformed_svg.xml.xpath('//*[@d]')[0].attrib['d']
+    assert 'C' in path_d
+    assert 'L' not in path_d
+
+
+def test_bake_transforms():
+    """Test baking nested transform attributes into coordinates."""
+    svg_string = """
+    <svg viewBox="0 0 10 10" xmlns="http://www.w3.org/2000/svg">
+    <g transform="translate(1 2)">
+        <g transform="scale(2)">
+            <path d="M0 0 L1 0" />
+            <rect x="1" y="1" width="2" height="3"
+                style="fill: red; transform: rotate(0)" />
+        </g>
+    </g>
+    </svg>
+    """
+    svg = SVG.from_string(svg_string)
+    baked_svg = svg.bake_transforms()
+
+    assert not baked_svg.xml.xpath('//*[@transform]')
+    path = baked_svg.xml.xpath('//*[@d]')[0]
+    assert path.attrib['d'] == 'M 1.0 2.0 L 3.0 2.0'
+    rect = baked_svg.xml.xpath('//*[@width]')[0]
+    assert (rect.attrib['x'], rect.attrib['y']) == ('3.0', '4.0')
+    assert (rect.attrib['width'], rect.attrib['height']) == ('4.0', '6.0')
+    assert rect.attrib['style'] == 'fill: red'
+
+
+def test_bake_transforms_rotated_and_mirrored_shapes():
+    """Rotated shapes become paths, mirrored ones keep their extent, strokes scale."""
+    svg = SVG.from_string(
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">'
+        '<g transform="rotate(90)"><rect id="rotated" width="10" height="5"/></g>'
+        '<g transform="scale(-1, 1)"><rect id="mirrored" width="10" height="10"/></g>'
+        '<g transform="scale(3)" stroke-width="2">'
+        '<rect id="scaled" width="1" height="1"/></g>'
+        '<g transform="rotate(45)"><use id="use" href="#mirrored"/></g>'
+        '</svg>'
+    )
+    baked = svg.bake_transforms()
+
+    rotated = baked.xml.xpath('//*[@id="rotated"]')[0]
+    assert etree.QName(rotated).localname == 'path'
+    points = np.array(parse_numbers(rotated.attrib['d'])).reshape(-1, 2)
+    assert points.min(axis=0) == pytest.approx([-5.0, 0.0])
+    assert points.max(axis=0) == pytest.approx([0.0, 10.0])
+
+    mirrored = baked.xml.xpath('//*[@id="mirrored"]')[0]
+    assert [float(mirrored.attrib[name]) for name in ('x', 'y', 'width', 'height')] == [
+        -10.0,
+        0.0,
+        10.0,
+        10.0,
+    ]
+
+    scaled = baked.xml.xpath('//*[@id="scaled"]')[0]
+    assert float(scaled.attrib['stroke-width']) == pytest.approx(6.0)
+
+    use = baked.xml.xpath('//*[@id="use"]')[0]
+    assert use.attrib['transform'].startswith('matrix(')
+
+
+def test_bake_transforms_keeps_content_references():
+    """Clipped and gradient-filled elements keep their CTM; missing sizes are 0."""
+    svg = SVG.from_string(
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">'
+        '<clipPath id="c" clipPathUnits="userSpaceOnUse"><rect width="1" height="1"/>'
+        '</clipPath>'
+        '<g transform="scale(2)"><g id="clipped" clip-path="url(#c)">'
+        '<rect id="inner" x="1" width="1" height="1"/></g>'
+        '<rect id="filled" width="1" height="1" fill="url(#gradient)"/>'
+        '<circle id="dot" cx="1" cy="1"/></g>'
+        '</svg>'
+    )
+    baked = svg.bake_transforms()
+
+    clipped = baked.xml.xpath('//*[@id="clipped"]')[0]
+    assert clipped.attrib['transform'] == AffineTransform.scaling(2.0).to_string()
+    inner = baked.xml.xpath('//*[@id="inner"]')[0]
+    assert 'transform' not in inner.attrib
+    assert (inner.attrib['x'], inner.attrib['width']) == ('1', '1')
+    filled = baked.xml.xpath('//*[@id="filled"]')[0]
+    assert filled.attrib['transform'] == clipped.attrib['transform']
+    dot = baked.xml.xpath('//*[@id="dot"]')[0]
+    assert 'transform' not in dot.attrib
+    assert float(dot.attrib['r']) == 0.0
+
+
+def test_transform_with_bake_transforms():
+    """Test applying a transformation in the root coordinate system."""
+    svg_string = """
+    <svg viewBox="0 0 10 10" xmlns="http://www.w3.org/2000/svg">
+    <g transform="rotate(90)"><circle cx="1" cy="0" r="1" /></g>
+    </svg>
+    """
+    svg = SVG.from_string(svg_string)
+    transformation = lambda point: (point[0] + 1, point[1] + 1)
+    transformed_svg = svg.transform(transformation, bake_transforms=True)
+
+    circle = transformed_svg.xml.xpath('//*[@cx]')[0]
+    assert float(circle.attrib['cx']) == pytest.approx(1.0)
+    assert float(circle.attrib['cy']) == pytest.approx(2.0)
+    assert svg.xml.xpath('//*[@transform]'), "Original SVG must not be modified"
+
+
+def test_svgz_round_trip(tmp_path):
+    """Test writing and reading gzip-compressed SVGZ files."""
+    svg = SVG.from_file(CROSS_PATH)
+    file_path = tmp_path / 'cross.svgz'
+    svg.to_file(str(file_path))
+
+    with open(file_path, 'rb') as file:
+        assert file.read(2) == b'\x1f\x8b'
+    svg_retrieved = SVG.from_file(str(file_path))
+    assert svg_retrieved.to_string() == svg.to_string()
+
+
+def test_svgz_compress_option(tmp_path):
+    """Test explicit compression with a custom level and a plain suffix."""
+    svg = SVG.from_file(CROSS_PATH)
+    compressed_path = tmp_path / 'compressed.svg'
+    plain_path = tmp_path / 'plain.svgz'
+    svg.to_file(str(compressed_path), compress=True, compresslevel=1)
+    svg.to_file(str(plain_path), compress=False)
+
+    with open(plain_path, 'rb') as file:
+        assert file.read(2) != b'\x1f\x8b'
+    assert SVG.from_file(str(compressed_path)).to_string() == svg.to_string()
+    assert SVG.from_file(str(plain_path)).to_string() == svg.to_string()
+
+
+def test_compose_shares_repeated_geometry():
+    """Test composing SVGs with deduplicated geometry and a layout."""
+    icon = SVG.from_file(CROSS_PATH)
+    svg = SVG.compose([icon, icon, icon], layout=[(0, 0), (5, 0), (10, 0)])
+
+    assert svg.shape == (15.0, 5.0)
+    definitions = svg.xml.xpath(
+        '//svg:defs/*', namespaces={'svg': 'http://www.w3.org/2000/svg'}
+    )
+    assert len(definitions) == 1
+    uses = svg.xml.xpath('//svg:use', namespaces={'svg': 'http://www.w3.org/2000/svg'})
+    assert len(uses) == 3
+    assert all(
+        use.attrib['{http://www.w3.org/1999/xlink}href'] == '#geometry-0'
+        for use in uses
+    )
+    nested = svg.xml.xpath(
+        '/svg:svg/svg:svg', namespaces={'svg': 'http://www.w3.org/2000/svg'}
+    )
+    assert [element.attrib['x'] for element in nested] == ['0', '5', '10']
+    assert len(icon.xml.xpath('//*[@d]')) == 1
+
+
+def test_compose_keeps_referenced_and_invalid_geometry():
+    """Referenced elements and elements with invalid path data are not shared."""
+    labeled = SVG.from_string(
+        '<svg xmlns="http://www.w3.org/2000/svg"'
+        ' xmlns:xlink="http://www.w3.org/1999/xlink" viewBox="0 0 5 5">'
+        '<path id="curve" d="M 0 4 Q 2 0 4 4"/>'
+        '<text><textPath xlink:href="#curve">label</textPath></text>'
+        '<path d="M 0 0 L 1"/>'
+        '</svg>'
+    )
+    svg = SVG.compose([labeled, labeled])
+
+    namespaces = {
+        'svg': 'http://www.w3.org/2000/svg',
+        'xlink': 'http://www.w3.org/1999/xlink',
+    }
+    for text_path in svg.xml.xpath('//svg:textPath', namespaces=namespaces):
+        target = text_path.attrib['{http://www.w3.org/1999/xlink}href'][1:]
+        assert (
+            svg.xml.xpath(f'//*[@id="{target}"]')[0].tag
+            == '{http://www.w3.org/2000/svg}path'
+        )
+    assert len(svg.xml.xpath('//*[@d="M 0 0 L 1"]')) == 2
+
+
+def test_compose_renames_conflicting_ids():
+    """Test that id collisions are resolved together with their references."""
+    svg_string = """
+    <svg viewBox="0 0 5 5" xmlns="http://www.w3.org/2000/svg">
+    <linearGradient id="fill"><stop offset="0" /></linearGradient>
+    <rect id="box" x="0" y="0" width="2" height="2" style="fill: url(#fill)" />
+    </svg>
+    """
+    first = SVG.from_string(svg_string)
+    second = SVG.from_string(svg_string.replace('width="2"', 'width="3"'))
+    svg = SVG.compose([first, second], deduplicate=False)
+
+    ids = svg.xml.xpath('//@id')
+    assert sorted(ids) == ['box', 'box-1', 'fill', 'fill-1']
+    rects = svg.xml.xpath('//*[@width="3"]')
+    assert rects[0].attrib['style'] == 'fill: url(#fill-1)'
+
+
+def test_compose_invalid_layout():
+    """Test that the layout must match the number of SVGs."""
+    icon = SVG.from_file(CROSS_PATH)
+    with pytest.raises(ValueError):
+        SVG.compose([icon, icon], layout=[(0, 0)])
+
+
+def test_transform_vectorized_matches_point_function():
+    """Vectorized and point-wise transformations give the same document."""
+    svg = load_python_logo()
+    transformation = AffineTransform.rotation(30) @ AffineTransform.scaling(2, 3)
+    vectorized_result = svg.transform(transformation)
+    pointwise_result = svg.transform(lambda point: transformation(point))
+    for vectorized_element, pointwise_element in zip(
+        vectorized_result.xml.iter(), pointwise_result.xml.iter()
+    ):
+        if 'd' in vectorized_element.attrib:
+            assert np.allclose(
+                parse_numbers(vectorized_element.attrib['d']),
+                parse_numbers(pointwise_element.attrib['d']),
+            )
+
+
+def test_transform_processes():
+    """Shared memory workers produce the same result as a single process."""
+    svg = load_python_logo()
+    transformation = AffineTransform.translation(5, 5)
+    expected = etree.tostring(svg.transform(transformation).xml)
+    assert etree.tostring(svg.transform(transformation, processes=2).xml) == expected
+    with pytest.raises(ValueError):
+        svg.transform(transformation, processes=2, fit_curves=0.1)
+
+
+def test_serialization_cache(monkeypatch):
+    """Unchanged documents are serialized once, mutations invalidate the cache."""
+    svg = load_python_logo()
+    calls = []
+    original_tostring = etree.tostring
+
+    def counting_tostring(*args, **kwargs):
+        calls.append(1)
+        return original_tostring(*args, **kwargs)
+
+    monkeypatch.setattr(etree, 'tostring', counting_tostring)
+    first = svg.to_string()
+    assert svg.to_string() == first
+    assert svg.__getstate__() == {'xml': first}
+    assert len(calls) == 1
+
+    svg.transform(lambda point: (point[0] + 1, point[1]), inplace=True)
+    assert svg.to_string() != first
+    assert len(calls) == 2
+
+    svg.xml.attrib['width'] = '10'
+    assert 'width="10"' in svg.to_string()
+    assert len(calls) == 3
+
+
+def test_serialization_cache_add_and_file(tmp_path):
+    """add invalidates both documents and to_file writes the cached bytes."""
+    svg = load_python_logo()
+    other = SVG.from_file(str(CROSS_PATH))
+    before, other_before = svg.to_string(), other.to_string()
+    svg.add(other)
+    assert svg.to_string() != before
+    assert other.to_string() != other_before
+
+    svg.to_file(str(tmp_path / 'out.svg'))
+    svg.to_file(str(tmp_path / 'out.svgz'))
+    assert SVG.from_file(str(tmp_path / 'out.svg')).to_string() == svg.to_string()
+    assert SVG.from_file(str(tmp_path / 'out.svgz')).to_string() == svg.to_string()
+
+
+@pytest.mark.parametrize('transformation', [
+    lambda point: (point[0] + 1, point[1] + 1),
+    AffineTransform.translation(1, 1),
+])
+def test_transform_select(transformation):
+    """Only the selected subtrees are transformed."""
+    svg = SVG.from_string("""<svg xmlns="http://www.w3.org/2000/svg">
+        <g id="roads"><path d="M 0 0 L 1 1"/><circle cx="0" cy="0" r="1"/></g>
+        <g id="rivers"><path d="M 0 0 L 1 1"/></g>
+    </svg>""")
+    transformed = svg.transform(transformation, select='g#roads')
+    roads_path, rivers_path = transformed.xml.xpath('//*[@d]')
+    assert roads_path.attrib['d'] == 'M 1.0 1.0 L 2.0 2.0'
+    assert rivers_path.attrib['d'] == 'M 0 0 L 1 1'
+    assert transformed.xml.xpath('//*[@cx]')[0].attrib['cx'] == '1.0'
+    assert (
+        svg.transform(transformation, select=['rivers'])
+        .xml.xpath('//*[@d]')[0]
+        .attrib['d']
+        == 'M 0 0 L 1 1'
+    )
+
+
+def test_sample_points():
+    """Every path is sampled, optionally in root coordinates."""
+    svg = SVG.from_string("""<svg xmlns="http://www.w3.org/2000/svg">
+        <path d="M 0 0 L 10 0"/>
+        <g transform="translate(5, 5)"><path d="M 0 0 L 0 10"/></g>
+        <path d=""/>
+    </svg>""")
+    samples = svg.sample_points(3)
+    assert samples.shape == (3, 3, 2)
+    assert np.allclose(samples[0], [[0, 0], [5, 0], [10, 0]])
+    assert np.isnan(samples[2]).all()
+    assert np.allclose(
+        svg.sample_points(2, apply_transforms=True)[1], [[5, 5], [5, 15]]
+    )
+
+
+def test_to_arrays_and_from_arrays():
+    """Test exporting geometry as arrays and writing it back."""
+    svg = SVG.from_string(
+        '<svg xmlns="http://www.w3.org/2000/svg">'
+        '<rect x="1" y="1" width="2" height="2"/>'
+        '<path id="p" d="M 0 0 L 10 0"/><polygon points="0,0 5,0 5,5"/>'
+        '<polyline points="1,1 2,2"/></svg>'
+    )
+    arrays = svg.to_arrays()
+    assert arrays.element_indices.tolist() == [2, 3, 4]
+    assert arrays.ids == ['p', None, None]
+    assert arrays.element_offsets.tolist() == [0, 2, 6, 8]
+    assert arrays.offsets[-1] == len(arrays.points) == 7
+    assert np.allclose(arrays.element(1).points, [[0, 0], [5, 0], [5, 5]])
+
+    arrays.points[:] *= 2
+    scaled = SVG.from_arrays(arrays, template=svg)
+    assert scaled.xml[1].attrib['d'] == 'M 0.0 0.0 L 20.0 0.0'
+    assert parse_numbers(scaled.xml[2].attrib['points']) == [0, 0, 10, 0, 10, 10]
+    assert parse_numbers(scaled.xml[3].attrib['points']) == [2, 2, 4, 4]
+    assert scaled.xml[0].attrib['x'] == '1'
+    assert svg.xml[1].attrib['d'] == 'M 0 0 L 10 0'
+
+    paths = SVG.from_arrays(arrays)
+    assert [element.get('id') for element in paths.xml] == ['p', None, None]
+    assert paths.xml[1].attrib['d'] == 'M 0.0 0.0 L 10.0 0.0 L 10.0 10.0 Z'
+
+
+def test_to_arrays_without_geometry():
+    """Documents without paths, polygons or polylines export empty arrays."""
+    svg = SVG.from_string(
+        '<svg xmlns="http://www.w3.org/2000/svg"><rect width="1" height="1"/></svg>'
+    )
+    arrays = svg.to_arrays()
+    assert arrays.codes.shape == (0,) and arrays.points.shape == (0, 2)
+    assert arrays.offsets.tolist() == [0] and arrays.element_offsets.tolist() == [0]
+    assert arrays.element_indices.tolist() == [] and arrays.ids == []
+    assert SVG.from_arrays(arrays, template=svg).xml[0].get('width') == '1'
+
+
+def test_iter_transform_matches_transform():
+    """Streamed chunks concatenate to the transformed document."""
+    svg = SVG.from_string(
+        '<svg xmlns="http://www.w3.org/2000/svg" xmlns:i="urn:i" x="1">'
+        '\n <!-- note -->\n'
+        ' <g i:a="1" transform="translate(1 1)">text'
+        '<g xmlns:k="urn:k" k:b="2"><rect x="1" y="2"/></g>tail'
+        '<path d="M 0 0 L 1 1"/></g>\n<g/>\n</svg>'
+    )
+    original = svg.to_string()
+    transformation = lambda point: (2 * point[0] + 1, point[1] - 3)
+    expected = svg.transform(transformation).to_string().encode('utf-8')
+    for chunk_depth in range(4):
+        chunks = list(svg.iter_transform(transformation, chunk_depth=chunk_depth))
+        assert b''.join(chunks) == expected
+    assert len(list(svg.iter_transform(transformation))) == 5
+    assert svg.to_string() == original
+
+    logo = load_python_logo()
+    scaling = AffineTransform.scaling(2)
+    assert b''.join(logo.iter_transform(scaling, chunk_depth=2)) == logo.transform(
+        scaling
+    ).to_string().encode('utf-8')
+    with pytest.raises(ValueError):
+        next(svg.iter_transform(transformation, chunk_depth=-1))
+
+
+def test_transform_many():
+    """Results equal separate transforms, for sequences and batched functions."""
+    svg = load_python_logo()
+    transformations = [
+        AffineTransform.rotation(angle, cx=50, cy=50) for angle in (0, 30, 90)
+    ]
+    results = svg.transform_many(transformations)
+    assert len(results) == 3
+    for result, transformation in zip(results, transformations):
+        assert result.to_string() == svg.transform(transformation).to_string()
+        assert result.xml.tag == svg.xml.tag
+
+    scales = np.array([1.0, 2.0])[:, np.newaxis, np.newaxis]
+    batched = svg.transform_many(batched=lambda points: points * scales, count=2)
+    assert (
+        batched[1].to_string() == svg.transform(AffineTransform.scaling(2)).to_string()
+    )
+    assert svg.transform_many(batched=lambda points: points, count=0) == []
+    with pytest.raises(ValueError):
+        svg.transform_many(batched=lambda points: points[:, :1], count=2)
+    with pytest.raises(ValueError):
+        svg.transform_many(batched=lambda points: points)
+    with pytest.raises(ValueError):
+        svg.transform_many(transformations, count=2)
+
+
+def test_pipeline():
+    """A pipeline transforms once with the composed transformation."""
+    svg = load_python_logo()
+    rotation = AffineTransform.rotation(30, cx=50, cy=50)
+    scaling = AffineTransform.scaling(2)
+    pipeline = svg.pipeline().transform(rotation).transform(scaling)
+    assert pipeline.transformations == (rotation, scaling)
+    assert pipeline.transformation == scaling @ rotation
+    assert pipeline.apply().to_string() == svg.transform(scaling @ rotation).to_string()
+
+    offset = lambda point: (point[0] + 1.0, point[1] - 1.0)
+    extended = pipeline.transform(offset)
+    assert len(pipeline.transformations) == 2
+    chained = svg.transform(rotation).transform(scaling).transform(offset)
+    first_path_data = lambda transformed: parse_numbers(
+        transformed.xml.xpath('//*[@d]')[0].attrib['d']
+    )
+    assert np.allclose(first_path_data(extended.apply()), first_path_data(chained))
+    assert svg.pipeline().apply(inplace=True) is svg
+
+
+def test_transform_cull():
+    """Elements moved outside the viewport are culled after the transformation."""
+    svg = SVG.from_string(
+        '<svg xmlns="http://www.w3.org/2000/svg"'
+        ' width="100" height="50" viewBox="0 0 50 25">'
+        '<path id="left" d="M 0 0 L 10 10"/>'
+        '<circle id="right" cx="40" cy="10" r="4"/></svg>'
+    )
+    shifted = svg.transform(AffineTransform.translation(30, 0), cull=True)
+    assert [
+        element.get('id') for element in shifted.xml.iter('{*}path', '{*}circle')
+    ] == ['left']
+    hidden = svg.transform(AffineTransform.translation(30, 0), cull='hide')
+    assert hidden.xml.find('{*}circle').get('display') == 'none'
+    assert len(svg.transform(AffineTransform.translation(30, 0)).xml) == 2
+
+    with pytest.raises(ValueError):
+        svg.transform(AffineTransform.translation(30, 0), cull='clip')
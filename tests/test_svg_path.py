@@ -1,11 +1,16 @@
 """Tests for the SVG path module."""
 
+import math
+
+import numpy as np
 import pytest
 
 from svgecko.svg_path import (
+    COMMAND_CODES,
     Path,
     PathCommand,
     flatten,
+    format_path_arrays,
     parse_coordinates,
     parse_commands,
     transform_path_command_string,
@@ -238,3 +243,159 @@ def test_complex_path_transformation():
     assert 'L 60.0 80.0' in transformed.command_string  # V40 -> L
     assert 'C 100.0 100.0 120.0 120.0 140.0 140.0' in transformed.command_string
     assert 'Z' in transformed.command_string
+
+
+def test_path_simplify():
+    """Test simplification of collinear line runs."""
+    path = Path.from_command_string('M0 0 L1 0 L2 0 L2 1 L2 2')
+    assert path.simplify(0.01).command_string == 'M 0.0 0.0 L 2.0 0.0 L 2.0 2.0'
+
+
+def test_path_simplify_preserves_closure_and_curves():
+    """Closing commands and curves are kept while lines are simplified."""
+    path = Path.from_command_string('M0 0 h1 h1 v2 h-2 L0 1 z C1 1 2 1 3 0')
+    simplified = path.simplify(0.01)
+    assert simplified.command_string == (
+        'M 0.0 0.0 L 2.0 0.0 L 2.0 2.0 L 0.0 2.0 Z C 1.0 1.0 2.0 1.0 3.0 0.0'
+    )
+
+
+def test_path_simplify_keeps_arcs():
+    """Arcs end a run of lines and are not flattened into chords."""
+    semicircle = Path.from_command_string('M 0 0 A 10 10 0 0 1 20 0')
+    assert semicircle.simplify(100).command_string == (
+        'M 0.0 0.0 A 10.0 10.0 0.0 0.0 1.0 20.0 0.0'
+    )
+    path = Path.from_command_string('M0 0 L1 0 L2 0 a1 1 0 0 0 2 0 L5 0 L6 0')
+    assert path.simplify(0.01).command_string == (
+        'M 0.0 0.0 L 2.0 0.0 A 1.0 1.0 0.0 0.0 0.0 4.0 0.0 L 6.0 0.0'
+    )
+
+
+def test_path_transform_fit_curves():
+    """Curves and arcs are refitted as cubic Bezier commands."""
+    path = Path.from_command_string('M0 0 C0 10 10 10 10 0 A5 5 0 0 1 20 0 L30 0')
+    translate = lambda point: (point[0] + 1, point[1] + 1)
+    transformed = path.transform(translate, fit_curves=0.01)
+
+    commands = transformed._commands
+    assert [command.type for command in commands[:2]] == ['M', 'C']
+    assert commands[1].coordinates == pytest.approx(
+        [1.0, 11.0, 11.0, 11.0, 11.0, 1.0], abs=0.01
+    )
+    assert all(command.type == 'C' for command in commands[2:-1])
+    assert commands[-2].coordinates[-2:] == pytest.approx([21.0, 1.0])
+    assert str(commands[-1]) == 'L 31.0 1.0'
+
+
+def test_path_transform_fit_curves_smooth_commands():
+    """Smooth curve commands use the reflected control points when refitted."""
+    path = Path.from_command_string('M0 0 Q5 5 10 0 T20 0')
+    identity = lambda point: (point[0], point[1])
+    transformed = path.transform(identity, fit_curves=1e-3)
+    assert all(command.type == 'C' for command in transformed._commands[1:])
+    assert transformed._commands[-1].coordinates[-2:] == pytest.approx([20.0, 0.0])
+
+
+def test_path_transform_fit_curves_after_close():
+    """A curve following Z starts at the start point of the closed subpath."""
+    path = Path.from_command_string('M0 0 L10 0 L10 10 Z C 0 5 5 5 5 0')
+    identity = lambda point: (point[0], point[1])
+    transformed = path.transform(identity, fit_curves=0.01)
+    assert [command.type for command in transformed._commands] == [
+        'M',
+        'L',
+        'L',
+        'Z',
+        'C',
+    ]
+    assert transformed._commands[-1].coordinates == pytest.approx(
+        [0.0, 5.0, 5.0, 5.0, 5.0, 0.0], abs=0.05
+    )
+    assert transformed.length() == pytest.approx(path.length(), abs=0.05)
+
+
+def test_path_transform_arc_tolerance():
+    """A coarser arc tolerance produces fewer line segments."""
+    path = Path.from_command_string('M10 10 A50 50 0 0 1 110 10')
+    identity = lambda point: (point[0], point[1])
+    fine = path.transform(identity, arc_tolerance=0.01)
+    coarse = path.transform(identity, arc_tolerance=1.0)
+    assert len(coarse._commands) < len(fine._commands)
+    assert fine._commands[-1].coordinates == [110.0, 10.0]
+    assert coarse._commands[-1].coordinates == [110.0, 10.0]
+
+
+def test_path_length():
+    """Test lengths of lines, closing commands, arcs and smooth curves."""
+    assert Path.from_command_string('M 0 0 h 10 v 10 z').length() == pytest.approx(
+        20.0 + math.hypot(10, 10)
+    )
+    assert Path.from_command_string('M 0 0 A 5 5 0 0 1 10 0').length() == pytest.approx(
+        5.0 * math.pi
+    )
+    assert Path.from_command_string(
+        'M 0 0 L 1 0 M 5 5 L 5 7'
+    ).length() == pytest.approx(3.0)
+    quadratic = Path.from_command_string('M 0 0 Q 5 10 10 0')
+    assert Path.from_command_string(
+        'M 0 0 Q 5 10 10 0 T 20 0'
+    ).length() == pytest.approx(2 * quadratic.length())
+
+
+def test_path_point_at_and_sample_uniform():
+    """Test arc length parameterized points."""
+    path = Path.from_command_string('M 0 0 L 10 0 L 10 10')
+    assert np.allclose(
+        path.point_at([0.0, 0.25, 0.75, 1.5]), [[0, 0], [5, 0], [10, 5], [10, 10]]
+    )
+    assert path.point_at(0.5).shape == (2,)
+    assert np.allclose(path.sample_uniform(3), [[0, 0], [10, 0], [10, 10]])
+    assert np.allclose(
+        Path.from_command_string('M 3 4').sample_uniform(2), [[3, 4], [3, 4]]
+    )
+    with pytest.raises(ValueError):
+        path.sample_uniform(0)
+    with pytest.raises(ValueError):
+        Path([]).sample_uniform(2)
+
+
+def test_path_to_arrays():
+    """Test exporting resolved absolute commands as arrays."""
+    path = Path.from_command_string('M 1 2 h 3 S 5 5 6 6 t 1 1 z')
+    arrays = path.to_arrays()
+    assert arrays.codes.tolist() == [COMMAND_CODES[letter] for letter in 'MLCQZ']
+    assert arrays.offsets.tolist() == [0, 1, 2, 5, 7, 7]
+    assert np.allclose(
+        arrays.points, [[1, 2], [4, 2], [4, 2], [5, 5], [6, 6], [6, 6], [7, 7]]
+    )
+
+
+def test_path_to_arrays_flattened():
+    """Flattening turns curves and arcs into lines that keep the end points."""
+    path = Path.from_command_string(
+        'M 0 0 C 0 10 10 10 10 0 Q 15 5 20 0 A 5 5 0 0 1 30 0'
+    )
+    arrays = path.to_arrays(tolerance=0.1)
+    assert set(arrays.codes.tolist()) == {COMMAND_CODES['M'], COMMAND_CODES['L']}
+    assert len(arrays.points) == len(arrays.codes)
+    for end_point in [[10, 0], [20, 0], [30, 0]]:
+        assert np.min(np.linalg.norm(arrays.points - end_point, axis=1)) < 1e-9
+    with pytest.raises(ValueError):
+        path.to_arrays(tolerance=-1.0)
+
+
+def test_path_from_arrays_round_trip():
+    """Test building path data from arrays."""
+    path = Path.from_command_string('M 0 0 C 1 1 2 2 3 3 Q 4 4 5 5 L 6 6 Z')
+    arrays = path.to_arrays()
+    assert (
+        Path.from_arrays(arrays.codes, arrays.points).command_string
+        == path.command_string
+    )
+    assert (
+        format_path_arrays(np.array([0, 1]), np.array([[0.5, 1.0], [2.0, 3.0]]))
+        == 'M 0.5 1.0 L 2.0 3.0'
+    )
+    with pytest.raises(ValueError):
+        format_path_arrays(np.array([0, 2]), np.array([[0.0, 0.0], [1.0, 1.0]]))
@@ -0,0 +1,201 @@
+"""Tests for the transformations module."""
+
+import math
+
+import numpy as np
+import pytest
+from lxml import etree
+
+from svgecko.svg import SVG
+from svgecko.transformations import (
+    AffineTransform,
+    GridApproximation,
+    TransformationChain,
+    chain_transformations,
+    compute_ctms,
+    is_vectorized,
+    parse_transform_list,
+    remove_style_transform,
+    transform_points,
+    vectorized,
+)
+
+
+def test_affine_transform_call_and_arrays():
+    """Single points and arrays are transformed consistently."""
+    transformation = AffineTransform(2, 0, 0, 3, 1, -1)
+    assert transformation((1.0, 1.0)) == (3.0, 2.0)
+    points = np.array([[1.0, 1.0], [0.0, 2.0]])
+    assert transformation.transform_points(points).tolist() == [[3.0, 2.0], [1.0, 5.0]]
+
+
+def test_affine_transform_composition():
+    """The right operand of @ is applied first."""
+    transformation = AffineTransform.rotation(90) @ AffineTransform.translation(1, 0)
+    assert transformation((0.0, 0.0)) == pytest.approx((0.0, 1.0))
+    assert (transformation.inverse() @ transformation).matrix == pytest.approx(
+        np.eye(3)
+    )
+
+
+def test_parse_transform_list():
+    """Test parsing of all transform functions."""
+    assert parse_transform_list('translate(10 20)')((1.0, 1.0)) == (11.0, 21.0)
+    assert parse_transform_list('scale(2)')((1.0, 3.0)) == (2.0, 6.0)
+    assert parse_transform_list('matrix(1 0 0 1 5 6)')((0.0, 0.0)) == (5.0, 6.0)
+    assert parse_transform_list('rotate(90 1 1)')((2.0, 1.0)) == pytest.approx(
+        (1.0, 2.0)
+    )
+    assert parse_transform_list('skewX(45)')((0.0, 1.0)) == pytest.approx((1.0, 1.0))
+    assert parse_transform_list('translateX(5px) translateY(2px)')((0.0, 0.0)) == (
+        5.0,
+        2.0,
+    )
+    assert parse_transform_list('translate(10,0) scale(2)')((1.0, 1.0)) == (12.0, 2.0)
+    assert parse_transform_list('').is_identity
+
+
+def test_parse_transform_list_invalid_arguments():
+    """Wrong argument counts raise errors."""
+    with pytest.raises(ValueError):
+        parse_transform_list('matrix(1 0 0)')
+
+
+def test_compute_ctms_nested_groups():
+    """CTMs accumulate transforms of attributes and styles down the tree."""
+    root = etree.fromstring(
+        '<svg xmlns="http://www.w3.org/2000/svg">'
+        '<g transform="translate(10 0)">'
+        '<g style="transform: scale(2)"><rect x="1" y="1"/></g></g>'
+        '<circle cx="0" cy="0"/>'
+        '</svg>'
+    )
+    ctms = compute_ctms(root)
+    rect = root.find('.//{http://www.w3.org/2000/svg}rect')
+    circle = root.find('{http://www.w3.org/2000/svg}circle')
+    assert ctms[rect]((1.0, 1.0)) == (12.0, 2.0)
+    assert ctms[circle].is_identity
+
+
+def test_remove_style_transform():
+    """Only transform declarations are removed."""
+    assert (
+        remove_style_transform('fill: red; transform: rotate(4); stroke: blue')
+        == 'fill: red; stroke: blue'
+    )
+    assert remove_style_transform('transform: rotate(4)') == ''
+
+
+def test_vectorized_transformation():
+    """Decorated array functions work on arrays and on single points."""
+
+    @vectorized
+    def swap(points):
+        return points[:, ::-1]
+
+    assert is_vectorized(swap)
+    assert is_vectorized(AffineTransform.translation(1, 1))
+    assert not is_vectorized(lambda point: point)
+    assert swap((1.0, 2.0)) == (2.0, 1.0)
+    assert swap.transform_points(np.array([[1.0, 2.0]])).tolist() == [[2.0, 1.0]]
+
+
+def test_transform_points_falls_back_to_point_loop():
+    """Plain callables are applied point by point."""
+    points = np.array([[1.0, 2.0], [3.0, 4.0]])
+    result = transform_points(lambda point: (point[0] * 2, point[1] + 1), points)
+    assert result.tolist() == [[2.0, 3.0], [6.0, 5.0]]
+    assert transform_points(lambda point: point, np.empty((0, 2))).shape == (0, 2)
+
+
+def _projection(point):
+    x, y = point
+    return (
+        100.0 * math.tan(x / 200.0),
+        100.0 * math.log(math.tan(math.pi / 4 + y / 400.0)),
+    )
+
+
+@pytest.mark.parametrize('method', ['bilinear', 'bicubic'])
+def test_grid_approximation_reproduces_affine_transforms(method):
+    """Affine transformations are interpolated exactly, also outside the grid."""
+    affine = AffineTransform.rotation(30) @ AffineTransform.scaling(2, 3)
+    approximation = GridApproximation(
+        affine, (0, 0, 10, 5), resolution=(7, 3), method=method
+    )
+    points = np.random.default_rng(0).uniform(-2, 12, (100, 2))
+    assert is_vectorized(approximation)
+    assert np.allclose(
+        approximation.transform_points(points), affine.transform_points(points)
+    )
+    assert np.allclose(approximation((1.0, 2.0)), affine((1.0, 2.0)))
+    assert approximation.max_error < 1e-9
+
+
+def test_grid_approximation_error_decreases_with_resolution():
+    """Finer grids and bicubic interpolation approximate a projection better."""
+    svg = SVG.from_string(
+        '<svg xmlns="http://www.w3.org/2000/svg">'
+        '<path d="M 0 0 L 100 20 L 40 90"/></svg>'
+    )
+    errors = {
+        (method, resolution): GridApproximation.from_svg(
+            _projection, svg, resolution, method
+        ).max_error
+        for method in ('bilinear', 'bicubic')
+        for resolution in (8, 32)
+    }
+    assert errors['bilinear', 32] < errors['bilinear', 8]
+    assert errors['bicubic', 32] < errors['bicubic', 8]
+    assert errors['bicubic', 32] < errors['bilinear', 32]
+
+    approximation = GridApproximation.from_svg(_projection, svg, 32, 'bicubic')
+    assert approximation.bbox == (0.0, 0.0, 100.0, 90.0)
+    transformed = approximation.transform_points(
+        np.array([[100.0, 20.0], [40.0, 90.0]])
+    )
+    assert np.allclose(
+        transformed,
+        [_projection((100.0, 20.0)), _projection((40.0, 90.0))],
+        atol=approximation.max_error,
+    )
+
+
+def test_grid_approximation_validation():
+    """Invalid methods, boxes and resolutions are rejected."""
+    with pytest.raises(ValueError):
+        GridApproximation(_projection, (0, 0, 1, 1), method='nearest')
+    with pytest.raises(ValueError):
+        GridApproximation(_projection, (0, 0, 0, 1))
+    with pytest.raises(ValueError):
+        GridApproximation(_projection, (0, 0, 1, 1), resolution=0)
+    with pytest.raises(ValueError):
+        GridApproximation.from_svg(
+            _projection, SVG.from_string('<svg xmlns="http://www.w3.org/2000/svg"/>')
+        )
+
+
+def test_chain_transformations_fuses_affine_runs():
+    """Consecutive affine steps become one matrix; other steps are chained."""
+    rotation = AffineTransform.rotation(30)
+    scaling = AffineTransform.scaling(2)
+    shift = vectorized(lambda points: points + 1.0)
+    assert chain_transformations([]) == AffineTransform()
+    assert chain_transformations([rotation, scaling]) == scaling @ rotation
+
+    chain = chain_transformations(
+        [rotation, scaling, shift, AffineTransform.translation(1), scaling]
+    )
+    assert isinstance(chain, TransformationChain)
+    assert len(chain.steps) == 3
+    assert chain.steps[2] == scaling @ AffineTransform.translation(1)
+    points = np.array([[1.0, 2.0], [3.0, -1.0]])
+    expected = scaling.transform_points(AffineTransform.translation(1).transform_points(
+        scaling.transform_points(rotation.transform_points(points)) + 1.0
+    ))
+    assert np.allclose(chain.transform_points(points), expected)
+    assert np.allclose(chain((1.0, 2.0)), expected[0])
+    assert (
+        len(chain_transformations([chain, AffineTransform.translation(0, 1)]).steps)
+        == 3
+    )